@@ -0,0 +1,217 @@
+"""
+Tablas de ataques precalculadas sobre bitboards.
+
+Las piezas de salto (caballo, rey y peones) usan una tabla por casilla. Las piezas deslizantes
+(torre, alfil y dama) usan tablas indexadas por la ocupación relevante de cada casilla: para cada
+casilla se enumeran todos los subconjuntos de su máscara de bloqueadores y se guarda el bitboard
+de ataques resultante. Es el mismo esquema que las magic bitboards o PEXT, pero usando la propia
+ocupación enmascarada como clave de un diccionario, de modo que no hace falta buscar números mágicos.
+"""
+from bitboards import ALFIL, BLANCAS, CABALLO, DAMA, PEON, REY, TORRE, bit
+
+DIRECCIONES_TORRE = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIRECCIONES_ALFIL = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+DESPLAZAMIENTOS_CABALLO = ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2))
+DESPLAZAMIENTOS_REY = DIRECCIONES_TORRE + DIRECCIONES_ALFIL
+
+
+def _tabla_saltos(desplazamientos: tuple) -> list:
+    """
+    Devuelve, para cada casilla, el bitboard de casillas alcanzables con los desplazamientos dados.
+    """
+    tabla = []
+    for casilla in range(64):
+        fila, columna = casilla >> 3, casilla & 7
+        ataques = 0
+        for df, dc in desplazamientos:
+            f, c = fila + df, columna + dc
+            if 0 <= f < 8 and 0 <= c < 8:
+                ataques |= bit(f * 8 + c)
+        tabla.append(ataques)
+    return tabla
+
+
+def _rayos(casilla: int, direcciones: tuple) -> list:
+    """
+    Devuelve los rayos desde la casilla como listas de bits en orden de alejamiento.
+    """
+    fila, columna = casilla >> 3, casilla & 7
+    rayos = []
+    for df, dc in direcciones:
+        rayo = []
+        f, c = fila + df, columna + dc
+        while 0 <= f < 8 and 0 <= c < 8:
+            rayo.append(bit(f * 8 + c))
+            f += df
+            c += dc
+        rayos.append(rayo)
+    return rayos
+
+
+def _ataques_deslizantes(rayos: list, ocupacion: int) -> int:
+    """
+    Calcula los ataques de una pieza deslizante recorriendo sus rayos hasta el primer bloqueador.
+    Solo se usa para construir las tablas.
+    """
+    ataques = 0
+    for rayo in rayos:
+        for casilla in rayo:
+            ataques |= casilla
+            if ocupacion & casilla:
+                break
+    return ataques
+
+
+def _tabla_deslizantes(direcciones: tuple) -> tuple[list, list]:
+    """
+    Construye las máscaras de bloqueadores y, para cada casilla, el diccionario ocupación -> ataques
+    enumerando todos los subconjuntos de la máscara (técnica carry-rippler). La máscara está formada
+    por los rayos sin la casilla del borde, ya que esta no bloquea nada.
+    """
+    mascaras = []
+    tablas = []
+    for casilla in range(64):
+        rayos = _rayos(casilla, direcciones)
+        mascara = 0
+        for rayo in rayos:
+            for bit_casilla in rayo[:-1]:
+                mascara |= bit_casilla
+        tabla = {}
+        subconjunto = 0
+        while True:
+            tabla[subconjunto] = _ataques_deslizantes(rayos, subconjunto)
+            subconjunto = (subconjunto - mascara) & mascara
+            if subconjunto == 0:
+                break
+        mascaras.append(mascara)
+        tablas.append(tabla)
+    return mascaras, tablas
+
+
+ATAQUES_CABALLO = _tabla_saltos(DESPLAZAMIENTOS_CABALLO)
+ATAQUES_REY = _tabla_saltos(DESPLAZAMIENTOS_REY)
+# Casillas atacadas por un peón de cada color situado en la casilla
+ATAQUES_PEON = (_tabla_saltos(((1, -1), (1, 1))), _tabla_saltos(((-1, -1), (-1, 1))))
+
+MASCARAS_TORRE, _TABLAS_TORRE = _tabla_deslizantes(DIRECCIONES_TORRE)
+MASCARAS_ALFIL, _TABLAS_ALFIL = _tabla_deslizantes(DIRECCIONES_ALFIL)
+
+
+def ataques_torre(casilla: int, ocupacion: int) -> int:
+    """
+    Devuelve el bitboard de casillas atacadas por una torre en la casilla con la ocupación dada.
+    """
+    return _TABLAS_TORRE[casilla][ocupacion & MASCARAS_TORRE[casilla]]
+
+
+def ataques_alfil(casilla: int, ocupacion: int) -> int:
+    """
+    Devuelve el bitboard de casillas atacadas por un alfil en la casilla con la ocupación dada.
+    """
+    return _TABLAS_ALFIL[casilla][ocupacion & MASCARAS_ALFIL[casilla]]
+
+
+def ataques_dama(casilla: int, ocupacion: int) -> int:
+    """
+    Devuelve el bitboard de casillas atacadas por una dama en la casilla con la ocupación dada.
+    """
+    return (_TABLAS_TORRE[casilla][ocupacion & MASCARAS_TORRE[casilla]]
+            | _TABLAS_ALFIL[casilla][ocupacion & MASCARAS_ALFIL[casilla]])
+
+
+def _tabla_entre() -> list:
+    """
+    Devuelve, para cada par de casillas alineadas en fila, columna o diagonal, el bitboard de las
+    casillas estrictamente entre ambas (0 si no están alineadas).
+    """
+    tabla = [[0] * 64 for _ in range(64)]
+    for origen in range(64):
+        for destino in range(64):
+            if origen == destino:
+                continue
+            if ataques_torre(origen, 0) & bit(destino):
+                tabla[origen][destino] = ataques_torre(origen, bit(destino)) & ataques_torre(destino, bit(origen))
+            elif ataques_alfil(origen, 0) & bit(destino):
+                tabla[origen][destino] = ataques_alfil(origen, bit(destino)) & ataques_alfil(destino, bit(origen))
+    return tabla
+
+
+ENTRE = _tabla_entre()
+
+
+def ataques_pieza(tipo: int, color: int, casilla: int, ocupacion: int) -> int:
+    """
+    Devuelve el bitboard de casillas atacadas por una pieza del tipo y color (índices de bitboards) dados.
+    """
+    if tipo == PEON:
+        return ATAQUES_PEON[color][casilla]
+    if tipo == CABALLO:
+        return ATAQUES_CABALLO[casilla]
+    if tipo == ALFIL:
+        return ataques_alfil(casilla, ocupacion)
+    if tipo == TORRE:
+        return ataques_torre(casilla, ocupacion)
+    if tipo == DAMA:
+        return ataques_dama(casilla, ocupacion)
+    return ATAQUES_REY[casilla]
+
+
+def destinos_pieza(tipo: int, color: int, casilla: int, ocupacion_propia: int, ocupacion_rival: int) -> int:
+    """
+    Devuelve el bitboard de casillas a las que puede ir una pieza sin tener en cuenta jaques, clavadas,
+    enroques ni capturas al paso: las que ataca y no tienen pieza propia y, para un peón, sus capturas
+    de piezas rivales y los avances simple y doble a casillas libres.
+    """
+    if tipo != PEON:
+        return ataques_pieza(tipo, color, casilla, ocupacion_propia | ocupacion_rival) & ~ocupacion_propia
+    ocupacion = ocupacion_propia | ocupacion_rival
+    destinos = ATAQUES_PEON[color][casilla] & ocupacion_rival
+    avance = 8 if color == BLANCAS else -8
+    siguiente = casilla + avance
+    if 0 <= siguiente < 64 and not ocupacion >> siguiente & 1:
+        destinos |= 1 << siguiente
+        if casilla >> 3 == (1 if color == BLANCAS else 6) and not ocupacion >> (siguiente + avance) & 1:
+            destinos |= 1 << (siguiente + avance)
+    return destinos
+
+
+def atacantes(bitboards: list, casilla: int, color: int, ocupacion: int) -> int:
+    """
+    Devuelve el bitboard de las piezas del color dado que atacan la casilla.
+
+    Args:
+        bitboards (list): Bitboards del tablero indexados por [color][tipo].
+        casilla (int): Índice 0..63 de la casilla atacada.
+        color (int): Índice del color atacante (BLANCAS o NEGRAS).
+        ocupacion (int): Bitboard de casillas ocupadas usado para los rayos de las piezas deslizantes.
+    """
+    piezas = bitboards[color]
+    diagonales = piezas[ALFIL] | piezas[DAMA]
+    rectas = piezas[TORRE] | piezas[DAMA]
+    # Un peón del color atacante ataca la casilla si un peón del color contrario en la casilla lo atacaría a él
+    return ((ATAQUES_PEON[color ^ 1][casilla] & piezas[PEON])
+            | (ATAQUES_CABALLO[casilla] & piezas[CABALLO])
+            | (ATAQUES_REY[casilla] & piezas[REY])
+            | (ataques_alfil(casilla, ocupacion) & diagonales if diagonales else 0)
+            | (ataques_torre(casilla, ocupacion) & rectas if rectas else 0))
+
+
+def casilla_atacada(bitboards: list, casilla: int, color: int, ocupacion: int) -> bool:
+    """
+    Devuelve True si alguna pieza del color dado ataca la casilla. Comprueba primero las piezas
+    de salto y termina en cuanto encuentra un atacante.
+    """
+    piezas = bitboards[color]
+    if ATAQUES_CABALLO[casilla] & piezas[CABALLO]:
+        return True
+    if ATAQUES_PEON[color ^ 1][casilla] & piezas[PEON]:
+        return True
+    if ATAQUES_REY[casilla] & piezas[REY]:
+        return True
+    diagonales = piezas[ALFIL] | piezas[DAMA]
+    if diagonales and ataques_alfil(casilla, ocupacion) & diagonales:
+        return True
+    rectas = piezas[TORRE] | piezas[DAMA]
+    if rectas and ataques_torre(casilla, ocupacion) & rectas:
+        return True
+    return False
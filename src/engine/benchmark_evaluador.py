@@ -0,0 +1,245 @@
+"""
+Banco de pruebas de rendimiento del Evaluador. Ejecuta la evaluación completa y cada término
+evaluar_* sobre un corpus fijo de posiciones y muestra las evaluaciones por segundo y la memoria
+reservada por llamada. Cada ronda repite el corpus hasta durar al menos TIEMPO_MINIMO_RONDA (como
+autorange de timeit), con evaluadores y reglas nuevos en cada vuelta para que ninguna caché llegue
+caliente. Los resultados se pueden guardar como referencia en JSON y comparar con ejecuciones
+posteriores para detectar empeoramientos. El umbral sale solo de la referencia (su dispersión entre
+rondas o la tolerancia); una ejecución más ruidosa que ese umbral no se da por buena, sino como no
+concluyente.
+
+Uso:
+    python benchmark_evaluador.py
+    python benchmark_evaluador.py --guardar referencia.json
+    python benchmark_evaluador.py --comparar referencia.json --tolerancia 0.15
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from evaluador import Evaluador
+from reglas import Reglas
+from tabla_peones import TablaPeones
+from tablero import FEN_INICIAL, Tablero
+
+# Corpus fijo: apertura, medio juego, posiciones tácticas y finales
+CORPUS = (
+    FEN_INICIAL,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8",
+    "2r3k1/pp3ppp/4p3/3n4/3P4/P4N2/1P3PPP/2R3K1 b - - 0 24",
+    "8/5pk1/6p1/7p/7P/6P1/5PK1/8 w - - 0 40",
+    "8/8/4k3/8/2K5/3P4/8/8 w - - 0 60",
+    "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1",
+)
+
+# Términos medidos además de la evaluación completa
+TERMINOS = (
+    "evaluar_material",
+    "evaluar_posicional",
+    "evaluar_movilidad",
+    "evaluar_estructura_peones",
+    "evaluar_seguridad_rey",
+    "evaluar_control_centro",
+)
+
+# Segundos mínimos de llamadas medidas en cada ronda
+TIEMPO_MINIMO_RONDA = 0.2
+
+# Las reservas del propio tracemalloc no cuentan
+_FILTROS_MEMORIA = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+
+def _preparar_posiciones(corpus: tuple) -> list:
+    """
+    Crea el tablero de cada posición del corpus.
+    """
+    return [Tablero.desde_fen(fen) for fen in corpus]
+
+
+def _nuevas_llamadas(posiciones: list, metodo: str) -> list:
+    """
+    Crea reglas y evaluadores nuevos, desde la perspectiva del color al que le toca mover, para que los
+    datos que guardan por posición (estados de la partida, evaluaciones, mapas de ataques) no se
+    reutilicen entre vueltas, y devuelve sus métodos. Los evaluadores de una vuelta comparten una tabla
+    de peones nueva del tamaño del corpus: reservar la tabla por defecto para cada llamada costaría más
+    que las propias llamadas y metería ruido en la medida.
+    """
+    tabla_peones = TablaPeones(len(posiciones))
+    return [getattr(Evaluador(tablero, Reglas(tablero), tablero.turno, tabla_peones=tabla_peones), metodo)
+            for tablero in posiciones]
+
+
+def _medir_ronda(posiciones: list, metodo: str, tiempo_minimo: float) -> float:
+    """
+    Recorre el corpus tantas veces como haga falta para sumar al menos tiempo_minimo segundos de
+    llamadas (una vuelta como mínimo) y devuelve los segundos por llamada. Crear los evaluadores de
+    cada vuelta no se mide.
+    """
+    segundos = 0.0
+    llamadas_hechas = 0
+    while True:
+        llamadas = _nuevas_llamadas(posiciones, metodo)
+        inicio = time.perf_counter()
+        for llamada in llamadas:
+            llamada()
+        segundos += time.perf_counter() - inicio
+        llamadas_hechas += len(llamadas)
+        if segundos >= tiempo_minimo:
+            return segundos / llamadas_hechas
+
+
+def _medir_tiempo(posiciones: list, metodo: str, repeticiones: int,
+                  tiempo_minimo: float = TIEMPO_MINIMO_RONDA) -> tuple:
+    """
+    Mide el número de rondas indicado.
+    Returns:
+        tuple: (segundos por llamada de la ronda más rápida, que es la menos afectada por el ruido del
+        sistema, igual que en timeit; dispersión relativa entre la ronda más lenta y la más rápida).
+    """
+    rondas = [_medir_ronda(posiciones, metodo, tiempo_minimo) for _ in range(repeticiones)]
+    mejor = min(rondas)
+    return mejor, max(rondas) / mejor - 1.0
+
+
+def _medir_memoria(posiciones: list, metodo: str) -> tuple:
+    """
+    Llama una vez al método en cada posición con tracemalloc activo.
+    Returns:
+        tuple: (pico medio de bytes reservados por llamada, bloques medios que siguen vivos tras la llamada).
+    """
+    llamadas = _nuevas_llamadas(posiciones, metodo)
+    tracemalloc.start()
+    try:
+        pico_total = 0
+        bloques_total = 0
+        for llamada in llamadas:
+            antes = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            llamada()
+            _, pico = tracemalloc.get_traced_memory()
+            despues = tracemalloc.take_snapshot()
+            pico_total += pico - base
+            diferencias = despues.filter_traces(_FILTROS_MEMORIA).compare_to(antes.filter_traces(_FILTROS_MEMORIA), "filename")
+            bloques_total += sum(diferencia.count_diff for diferencia in diferencias)
+    finally:
+        tracemalloc.stop()
+    return pico_total / len(llamadas), bloques_total / len(llamadas)
+
+
+def ejecutar(repeticiones: int = 5, corpus: tuple = CORPUS) -> dict:
+    """
+    Mide la evaluación completa y cada término sobre el corpus.
+    Args:
+        repeticiones (int): Rondas de medida del tiempo; se usa la más rápida.
+        corpus (tuple): Posiciones en notación FEN.
+    Returns:
+        dict: Resultados por método con evaluaciones por segundo, microsegundos por llamada, dispersión
+        entre rondas, pico de bytes por llamada y bloques retenidos por llamada.
+    """
+    posiciones = _preparar_posiciones(corpus)
+    resultados = {}
+    for metodo in ("evaluar",) + TERMINOS:
+        # Una vuelta previa para que las cachés de importación y las tablas no cuenten en la medida
+        _medir_ronda(posiciones, metodo, 0.0)
+        segundos, dispersion = _medir_tiempo(posiciones, metodo, repeticiones)
+        pico_bytes, bloques = _medir_memoria(posiciones, metodo)
+        resultados[metodo] = {
+            "evaluaciones_por_segundo": 1.0 / segundos if segundos > 0 else 0.0,
+            "microsegundos_por_llamada": 1e6 * segundos,
+            "dispersion": dispersion,
+            "pico_bytes_por_llamada": pico_bytes,
+            "bloques_retenidos_por_llamada": bloques,
+        }
+    return {
+        "python": platform.python_version(),
+        "posiciones": len(corpus),
+        "repeticiones": repeticiones,
+        "resultados": resultados,
+    }
+
+
+def comparar(actual: dict, referencia: dict, tolerancia: float) -> tuple:
+    """
+    Compara el tiempo por llamada de la ronda más rápida con el de la referencia. El umbral de cada
+    método es la tolerancia o, si es mayor, la dispersión entre rondas guardada en la referencia; la
+    ejecución comparada nunca fija su propio umbral. Si su dispersión supera el umbral, un resultado
+    que no llega a empeoramiento se considera no concluyente en lugar de correcto.
+    Returns:
+        tuple: (métodos cuyo tiempo por llamada ha empeorado más que su umbral, métodos no concluyentes).
+    """
+    empeorados = []
+    no_concluyentes = []
+    for metodo, medida in actual["resultados"].items():
+        medida_referencia = referencia["resultados"].get(metodo)
+        if medida_referencia is None:
+            continue
+        cambio = medida["microsegundos_por_llamada"] / medida_referencia["microsegundos_por_llamada"] - 1.0
+        medida["cambio_respecto_referencia"] = cambio
+        umbral = max(tolerancia, medida_referencia.get("dispersion", 0.0))
+        if cambio > umbral:
+            empeorados.append(metodo)
+        elif medida["dispersion"] > umbral:
+            no_concluyentes.append(metodo)
+    return empeorados, no_concluyentes
+
+
+def _mostrar(informe: dict) -> None:
+    """
+    Imprime los resultados en forma de tabla.
+    """
+    print(f"{informe['posiciones']} posiciones x {informe['repeticiones']} rondas (Python {informe['python']})")
+    print(f"{'método':<28}{'eval/s':>12}{'µs/llamada':>14}{'dispersión':>12}{'pico bytes':>13}{'bloques':>10}"
+          f"{'cambio':>10}")
+    for metodo, medida in informe["resultados"].items():
+        cambio = medida.get("cambio_respecto_referencia")
+        texto_cambio = f"{100 * cambio:+.1f}%" if cambio is not None else ""
+        print(f"{metodo:<28}{medida['evaluaciones_por_segundo']:>12.1f}{medida['microsegundos_por_llamada']:>14.1f}"
+              f"{100 * medida['dispersion']:>11.1f}%"
+              f"{medida['pico_bytes_por_llamada']:>13.0f}{medida['bloques_retenidos_por_llamada']:>10.1f}{texto_cambio:>10}")
+
+
+def main(argumentos: list = None) -> int:
+    """
+    Punto de entrada de la línea de comandos. Devuelve 1 si algún método ha empeorado respecto a la referencia
+    y 2 si ninguno ha empeorado pero la medida de alguno es demasiado ruidosa para concluirlo.
+    """
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento del Evaluador")
+    parser.add_argument("-r", "--repeticiones", type=int, default=5,
+                        help="Rondas de medida (se usa la más rápida)")
+    parser.add_argument("--guardar", help="Guarda los resultados como referencia en este fichero JSON")
+    parser.add_argument("--comparar", help="Compara los resultados con la referencia de este fichero JSON")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Empeoramiento máximo admitido respecto a la referencia (0.10 = 10 %%)")
+    args = parser.parse_args(argumentos)
+
+    informe = ejecutar(args.repeticiones)
+    empeorados, no_concluyentes = [], []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as fichero:
+            empeorados, no_concluyentes = comparar(informe, json.load(fichero), args.tolerancia)
+    _mostrar(informe)
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as fichero:
+            json.dump(informe, fichero, indent=2, ensure_ascii=False)
+    if empeorados:
+        print(f"Empeoramiento superior al {100 * args.tolerancia:.0f}% (o a la dispersión de la referencia) en: "
+              f"{', '.join(empeorados)}")
+        return 1
+    if no_concluyentes:
+        print(f"Medida no concluyente por ruido (dispersión mayor que el umbral) en: {', '.join(no_concluyentes)}")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
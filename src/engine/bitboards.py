@@ -0,0 +1,77 @@
+"""
+Utilidades para representar el tablero mediante bitboards: un entero de 64 bits por cada
+tipo de pieza y color. La casilla (fila, columna) corresponde al bit fila * 8 + columna,
+de modo que el bit 0 es A1 y el bit 63 es H8.
+"""
+from typing import Iterator
+
+from color import Color
+
+# Índices de color
+BLANCAS = 0
+NEGRAS = 1
+COLORES = (Color.BLANCA, Color.NEGRA)   # Color de cada índice
+
+# Índices de tipo de pieza
+PEON = 0
+CABALLO = 1
+ALFIL = 2
+TORRE = 3
+DAMA = 4
+REY = 5
+NUM_TIPOS = 6
+
+NUM_CASILLAS = 64
+TABLERO_COMPLETO = (1 << NUM_CASILLAS) - 1
+
+
+def indice_color(color: Color) -> int:
+    """
+    Devuelve el índice (0 para blancas, 1 para negras) asociado al color.
+    """
+    return BLANCAS if color == Color.BLANCA else NEGRAS
+
+
+def casilla(fila: int, columna: int) -> int:
+    """
+    Transforma una coordenada (fila, columna) en el índice de casilla 0..63.
+    """
+    return (fila << 3) | columna
+
+
+def fila_columna(indice_casilla: int) -> tuple[int, int]:
+    """
+    Transforma un índice de casilla 0..63 en la coordenada (fila, columna).
+    """
+    return indice_casilla >> 3, indice_casilla & 7
+
+
+def bit(indice_casilla: int) -> int:
+    """
+    Devuelve el bitboard con únicamente la casilla dada activa.
+    """
+    return 1 << indice_casilla
+
+
+def contar_bits(bitboard: int) -> int:
+    """
+    Devuelve el número de casillas activas del bitboard.
+    """
+    return bitboard.bit_count()
+
+
+def casilla_menos_significativa(bitboard: int) -> int:
+    """
+    Devuelve el índice de la casilla activa más baja. El bitboard no puede ser 0.
+    """
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def iterar_casillas(bitboard: int) -> Iterator[int]:
+    """
+    Recorre los índices de las casillas activas del bitboard en orden ascendente.
+    """
+    while bitboard:
+        menor = bitboard & -bitboard
+        yield menor.bit_length() - 1
+        bitboard ^= menor
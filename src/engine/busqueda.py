@@ -0,0 +1,352 @@
+"""
+Búsqueda alfa-beta (negamax) con profundización iterativa, ventanas de aspiración y búsqueda de
+variante principal (PVS). Usa la tabla de transposición para ordenar primero el mejor movimiento
+conocido y para cortar posiciones ya buscadas con suficiente profundidad; el resto de movimientos
+se ordena por etapas con killers, historia y respuestas (ver ordenacion.py). En las hojas sigue una
+búsqueda de quiescencia con solo capturas y coronaciones, descartando las que pierden material según
+la evaluación estática de intercambios (ver intercambio.py).
+"""
+import time
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from cache_evaluaciones import CacheEvaluaciones
+from color import Color
+from evaluador import Evaluador
+from generador_movimiento import Generador_movimientos
+from intercambio import evaluar_intercambio
+from bitboards import indice_color
+from movimiento import SIN_MOVIMIENTO, nueva_lista_movimientos
+from ordenacion import SelectorMovimientos, TablasOrdenacion, es_tranquilo
+from reglas import Reglas
+from tabla_peones import TablaPeones
+from tabla_transposicion import COTA_EXACTA, COTA_INFERIOR, COTA_SUPERIOR, TablaTransposicion
+from tablero import Tablero
+from utils import config
+
+PROFUNDIDAD_MAXIMA = 64
+PLY_MAXIMO = 2 * PROFUNDIDAD_MAXIMA     # Límite de ply contando la quiescencia
+VENTANA_ASPIRACION = 0.5        # Semiancho inicial de la ventana de aspiración (en peones)
+VENTANA_NULA = 1e-3             # Anchura de la ventana nula de PVS
+MARGEN_DELTA = 2.0              # Margen de la poda delta de la quiescencia (en peones)
+
+
+class ResultadoBusqueda(NamedTuple):
+    """
+    Resultado de una búsqueda. Los movimientos están codificados en 16 bits (ver movimiento.py).
+    """
+    mejor_movimiento: Optional[int]
+    puntuacion: float                       # Desde la perspectiva del color al que le toca mover
+    variante_principal: list
+    profundidad: int                        # Última profundidad completada
+    nodos: int
+    tiempo: float                           # Segundos
+    nodos_por_segundo: float
+
+
+class _BusquedaDetenida(Exception):
+    """
+    Se lanza cuando se agota el presupuesto de nodos o de tiempo para abandonar la iteración en curso.
+    """
+
+
+class Buscador:
+
+    def __init__(self, tablero: Tablero, reglas: Reglas = None, pesos: dict = None,
+                 tabla: TablaTransposicion = None, parada: np.ndarray = None):
+        """
+        Prepara la búsqueda sobre el tablero, que se modifica durante la búsqueda y se deja como estaba.
+        Args:
+            pesos (dict): Pesos de la evaluación (por defecto config.PESOS_POR_DEFECTO).
+            tabla (TablaTransposicion): Tabla a usar, por ejemplo una compartida entre procesos (ver busqueda_paralela.py).
+            parada (np.ndarray): Bandera de un elemento, normalmente en memoria compartida: la búsqueda se detiene
+                como al agotar el presupuesto en cuanto vale distinto de 0.
+        """
+        self._tablero = tablero
+        self._parada = parada
+        self._reglas = reglas if reglas is not None else Reglas(tablero)
+        # Los dos evaluadores comparten la tabla de peones y la caché de evaluaciones, que distinguen los colores
+        tabla_peones = TablaPeones()
+        cache_evaluaciones = CacheEvaluaciones()
+        self._evaluadores = {
+            Color.BLANCA: Evaluador(tablero, self._reglas, Color.BLANCA, pesos, tabla_peones, cache_evaluaciones),
+            Color.NEGRA: Evaluador(tablero, self._reglas, Color.NEGRA, pesos, tabla_peones, cache_evaluaciones),
+        }
+        self._tabla = tabla if tabla is not None else TablaTransposicion()
+        pesos_efectivos = pesos if pesos is not None else config.PESOS_POR_DEFECTO
+        self.valor_mate = float(pesos_efectivos.get("mate", 1e6))
+        # Toda puntuación a partir de aquí es un mate, incluidos los que encuentra la quiescencia hasta PLY_MAXIMO
+        self.umbral_mate = self.valor_mate - PLY_MAXIMO
+        self._peso_material = float(pesos_efectivos.get("material", 1.0))
+        self.nodos = 0
+        self._limite_nodos = None
+        self._limite_tiempo = None
+        self._inicio = 0.0
+        self._variantes: list[list[int]] = []
+        self._listas_movimientos: list = []             # Una lista de movimientos reutilizable por ply
+        self._listas_tranquilos: list = []              # Y otra para los movimientos tranquilos del selector
+        self._jugados: list[int] = []                   # Movimiento hecho en cada ply de la variante actual
+        self._ordenacion = TablasOrdenacion(PLY_MAXIMO)
+
+    def __repr__(self) -> str:
+        return f"Buscador (tabla={self._tabla!r})"
+
+    def buscar(self, profundidad_maxima: int = PROFUNDIDAD_MAXIMA, limite_nodos: int = None,
+               limite_tiempo: float = None, profundidades: Sequence[int] = None) -> ResultadoBusqueda:
+        """
+        Busca el mejor movimiento para el color al que le toca mover con profundización iterativa.
+        Se detiene al completar profundidad_maxima o al agotar el presupuesto de nodos o de tiempo; en
+        ese caso devuelve el resultado de la última iteración completa.
+        Args:
+            profundidad_maxima (int): Profundidad máxima en medios movimientos.
+            limite_nodos (int): Número máximo de nodos a visitar (None para no limitar).
+            limite_tiempo (float): Tiempo máximo en segundos (None para no limitar).
+            profundidades (Sequence[int]): Profundidades de las iteraciones, de menor a mayor (por defecto
+                todas hasta profundidad_maxima). Los procesos auxiliares de la búsqueda paralela se saltan algunas.
+        """
+        self.nodos = 0
+        self._limite_nodos = limite_nodos
+        self._limite_tiempo = limite_tiempo
+        self._inicio = time.perf_counter()
+        self._tabla.nueva_busqueda()
+        self._ordenacion.nueva_busqueda()
+
+        mejor_puntuacion = 0.0
+        variante: list[int] = []
+        profundidad_completada = 0
+        if profundidades is None:
+            profundidades = range(1, profundidad_maxima + 1)
+        for profundidad in profundidades:
+            if profundidad > min(profundidad_maxima, PROFUNDIDAD_MAXIMA):
+                break
+            try:
+                puntuacion = self._buscar_con_aspiracion(profundidad, mejor_puntuacion)
+            except _BusquedaDetenida:
+                break
+            mejor_puntuacion = puntuacion
+            variante = list(self._variantes[0])
+            profundidad_completada = profundidad
+            # No tiene sentido seguir profundizando si ya se ha encontrado un mate
+            if abs(puntuacion) >= self.umbral_mate:
+                break
+
+        # Si no se ha completado ninguna iteración se devuelve cualquier movimiento legal
+        if not variante:
+            movimientos = Generador_movimientos(self._tablero, self._reglas, self._tablero.turno).generar_movimientos_codificados()
+            variante = list(movimientos[:1])
+
+        tiempo = time.perf_counter() - self._inicio
+        return ResultadoBusqueda(
+            variante[0] if variante else None,
+            mejor_puntuacion,
+            variante,
+            profundidad_completada,
+            self.nodos,
+            tiempo,
+            self.nodos / tiempo if tiempo > 0 else 0.0,
+        )
+
+    def _buscar_con_aspiracion(self, profundidad: int, puntuacion_previa: float) -> float:
+        """
+        Busca la raíz con una ventana estrecha alrededor de la puntuación de la iteración anterior y
+        la ensancha mientras el resultado caiga fuera de ella.
+        """
+        infinito = 2 * self.valor_mate
+        if profundidad < 3 or abs(puntuacion_previa) >= self.umbral_mate:
+            return self._negamax(profundidad, -infinito, infinito, 0)
+
+        delta = VENTANA_ASPIRACION
+        alfa, beta = puntuacion_previa - delta, puntuacion_previa + delta
+        while True:
+            puntuacion = self._negamax(profundidad, alfa, beta, 0)
+            if puntuacion <= alfa:
+                alfa = max(puntuacion - delta, -infinito)
+            elif puntuacion >= beta:
+                beta = min(puntuacion + delta, infinito)
+            else:
+                return puntuacion
+            delta *= 2
+            if delta > self.valor_mate:
+                alfa, beta = -infinito, infinito
+
+    def _comprobar_presupuesto(self) -> None:
+        """
+        Lanza _BusquedaDetenida si se ha superado el límite de nodos o de tiempo, o si se ha activado la
+        bandera de parada.
+        """
+        if self._parada is not None and self._parada[0]:
+            raise _BusquedaDetenida()
+        if self._limite_nodos is not None and self.nodos >= self._limite_nodos:
+            raise _BusquedaDetenida()
+        if self._limite_tiempo is not None and time.perf_counter() - self._inicio >= self._limite_tiempo:
+            raise _BusquedaDetenida()
+
+    def _negamax(self, profundidad: int, alfa: float, beta: float, ply: int) -> float:
+        """
+        Negamax con poda alfa-beta y PVS. Devuelve la puntuación desde la perspectiva del color al que
+        le toca mover.
+        """
+        if profundidad <= 0:
+            return self._quiescencia(alfa, beta, ply)
+        self._entrar_nodo(ply)
+        tablero = self._tablero
+
+        # Tablas por repetición o por la regla de los 50 movimientos dentro del árbol
+        if ply > 0 and (tablero.es_repeticion(2) or tablero.reloj_medio_movimientos >= 100):
+            return 0.0
+
+        # Consulta de la tabla de transposición
+        clave = tablero.clave_hash
+        alfa_original = alfa
+        movimiento_tabla = SIN_MOVIMIENTO
+        entrada = self._tabla.buscar(clave)
+        if entrada is not None:
+            movimiento_tabla, puntuacion_tabla, profundidad_tabla, tipo = entrada
+            if ply > 0 and profundidad_tabla >= profundidad:
+                puntuacion_tabla = self._puntuacion_desde_tabla(puntuacion_tabla, ply)
+                if (tipo == COTA_EXACTA
+                        or (tipo == COTA_INFERIOR and puntuacion_tabla >= beta)
+                        or (tipo == COTA_SUPERIOR and puntuacion_tabla <= alfa)):
+                    return puntuacion_tabla
+
+        color = indice_color(tablero.turno)
+        movimiento_previo = self._jugados[ply - 1] if ply > 0 else SIN_MOVIMIENTO
+        selector = SelectorMovimientos(tablero, self._reglas, self._ordenacion, ply, movimiento_tabla,
+                                       movimiento_previo, self._listas_movimientos[ply], self._listas_tranquilos[ply])
+        tranquilos_probados = []
+        mejor_puntuacion = -2 * self.valor_mate
+        mejor_movimiento = SIN_MOVIMIENTO
+        indice = -1
+        for indice, codigo in enumerate(selector):
+            tranquilo = es_tranquilo(tablero, codigo)
+            self._jugados[ply] = codigo
+            tablero.hacer_movimiento_codificado(codigo)
+            try:
+                if indice == 0:
+                    puntuacion = -self._negamax(profundidad - 1, -beta, -alfa, ply + 1)
+                else:
+                    # Ventana nula: solo se comprueba si el movimiento mejora alfa
+                    puntuacion = -self._negamax(profundidad - 1, -alfa - VENTANA_NULA, -alfa, ply + 1)
+                    if alfa < puntuacion < beta:
+                        puntuacion = -self._negamax(profundidad - 1, -beta, -alfa, ply + 1)
+            finally:
+                tablero.deshacer_movimiento()
+
+            if puntuacion > mejor_puntuacion:
+                mejor_puntuacion = puntuacion
+                mejor_movimiento = codigo
+                if puntuacion > alfa:
+                    alfa = puntuacion
+                    self._variantes[ply] = [codigo] + self._variantes[ply + 1]
+                    if alfa >= beta:
+                        if tranquilo:
+                            self._ordenacion.registrar_corte(codigo, color, ply, profundidad, movimiento_previo,
+                                                             tranquilos_probados)
+                        break
+            if tranquilo:
+                tranquilos_probados.append(codigo)
+
+        if indice < 0:
+            # Sin movimientos legales: jaque mate o ahogado
+            return -(self.valor_mate - ply) if self._reglas.es_jaque(tablero.turno) else 0.0
+
+        if mejor_puntuacion <= alfa_original:
+            tipo = COTA_SUPERIOR
+        elif mejor_puntuacion >= beta:
+            tipo = COTA_INFERIOR
+        else:
+            tipo = COTA_EXACTA
+        self._tabla.guardar(clave, profundidad, tipo, self._puntuacion_a_tabla(mejor_puntuacion, ply), mejor_movimiento)
+        return mejor_puntuacion
+
+    def _quiescencia(self, alfa: float, beta: float, ply: int) -> float:
+        """
+        Busca solo capturas y coronaciones hasta llegar a una posición tranquila, para no evaluar en
+        mitad de un intercambio. Sin jaque, el bando que mueve puede quedarse con la evaluación estática;
+        las capturas se ordenan por su evaluación de intercambio y se descartan las que pierden material.
+        En jaque se buscan todas las evasiones.
+        """
+        self._entrar_nodo(ply)
+        tablero = self._tablero
+        if ply > 0 and (tablero.es_repeticion(2) or tablero.reloj_medio_movimientos >= 100):
+            return 0.0
+        if ply >= PLY_MAXIMO:
+            return self._evaluar(ply, alfa, beta)
+
+        generador = Generador_movimientos(tablero, self._reglas, tablero.turno)
+        if self._reglas.es_jaque(tablero.turno):
+            movimientos = generador.generar_movimientos_codificados(self._listas_movimientos[ply])
+            if not movimientos:
+                return -(self.valor_mate - ply)
+            mejor_puntuacion = -2 * self.valor_mate
+        else:
+            mejor_puntuacion = self._evaluar(ply, alfa, beta)
+            if mejor_puntuacion >= beta:
+                return mejor_puntuacion
+            alfa = max(alfa, mejor_puntuacion)
+            capturas = generador.generar_capturas_codificadas(self._listas_movimientos[ply])
+            # Poda delta: tampoco se buscan las capturas que, ganando el intercambio, no llegarían a alfa
+            umbral = max(0.0, (alfa - mejor_puntuacion - MARGEN_DELTA) / self._peso_material)
+            ganancias = [(evaluar_intercambio(tablero, codigo), codigo) for codigo in capturas]
+            movimientos = [codigo for ganancia, codigo in sorted(ganancias, reverse=True) if ganancia >= umbral]
+
+        for codigo in movimientos:
+            tablero.hacer_movimiento_codificado(codigo)
+            try:
+                puntuacion = -self._quiescencia(-beta, -alfa, ply + 1)
+            finally:
+                tablero.deshacer_movimiento()
+            if puntuacion > mejor_puntuacion:
+                mejor_puntuacion = puntuacion
+                if puntuacion > alfa:
+                    alfa = puntuacion
+                    if alfa >= beta:
+                        break
+        return mejor_puntuacion
+
+    def _entrar_nodo(self, ply: int) -> None:
+        """
+        Cuenta el nodo, comprueba el presupuesto y prepara la variante y la lista de movimientos del ply.
+        """
+        self.nodos += 1
+        self._comprobar_presupuesto()
+        while len(self._variantes) <= ply:
+            self._variantes.append([])
+            self._listas_movimientos.append(nueva_lista_movimientos())
+            self._listas_tranquilos.append(nueva_lista_movimientos())
+            self._jugados.append(SIN_MOVIMIENTO)
+        self._variantes[ply] = []
+
+    def _evaluar(self, ply: int, alfa: float, beta: float) -> float:
+        """
+        Evaluación estática desde la perspectiva del color al que le toca mover. Se le pasa la ventana
+        para que pueda cortar la evaluación en cuanto el resultado quede fuera de ella. Los mates que
+        detecta el evaluador se ajustan a la distancia a la raíz para preferir los mates más cortos.
+        """
+        puntuacion = self._evaluadores[self._tablero.turno].evaluar(alfa, beta)
+        if puntuacion >= self.umbral_mate:
+            return self.valor_mate - ply
+        if puntuacion <= -self.umbral_mate:
+            return -(self.valor_mate - ply)
+        return puntuacion
+
+    def _puntuacion_a_tabla(self, puntuacion: float, ply: int) -> float:
+        """
+        Las puntuaciones de mate se guardan relativas a la posición y no a la raíz.
+        """
+        if puntuacion >= self.umbral_mate:
+            return puntuacion + ply
+        if puntuacion <= -self.umbral_mate:
+            return puntuacion - ply
+        return puntuacion
+
+    def _puntuacion_desde_tabla(self, puntuacion: float, ply: int) -> float:
+        """
+        Inversa de _puntuacion_a_tabla.
+        """
+        if puntuacion >= self.umbral_mate:
+            return puntuacion - ply
+        if puntuacion <= -self.umbral_mate:
+            return puntuacion + ply
+        return puntuacion
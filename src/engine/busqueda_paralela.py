@@ -0,0 +1,228 @@
+"""
+Búsqueda paralela Lazy SMP: varios procesos buscan a la vez la misma raíz y solo se comunican a
+través de la tabla de transposición, que está en memoria compartida (ver tabla_transposicion.py).
+El proceso principal recorre todas las profundidades; cada proceso auxiliar se salta algunas con un
+patrón distinto, de modo que en cada momento se buscan profundidades diferentes y la tabla se llena
+con posiciones que a los demás les sirven para ordenar y cortar. El primer proceso que termina activa
+la bandera de parada y se devuelve la variante principal del que haya completado más profundidad.
+
+Uso (banco de escalado con el número de procesos):
+    python busqueda_paralela.py
+    python busqueda_paralela.py --procesos 1 2 4 8 -p 5
+    python busqueda_paralela.py --fen "<FEN>" --procesos 1 4 -p 6
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from busqueda import PROFUNDIDAD_MAXIMA, Buscador, ResultadoBusqueda
+from tabla_transposicion import TablaTransposicion
+from tablero import FEN_INICIAL, Tablero
+from utils import config
+
+# Patrones de salto de los procesos auxiliares: el auxiliar i se salta la profundidad p si
+# (p + FASES_SALTO[j]) // TAMANOS_SALTO[j] es impar, con j = (i - 1) % len(TAMANOS_SALTO)
+TAMANOS_SALTO = (1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4)
+FASES_SALTO = (0, 1, 0, 1, 2, 3, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5, 6, 7)
+
+# Posiciones del banco de escalado: apertura, medio juego táctico, medio juego cerrado y final
+POSICIONES_BANCO = (
+    FEN_INICIAL,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP3PPP/R2QKB1R w KQ - 0 8",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+)
+
+
+def profundidades_proceso(indice: int, profundidad_maxima: int) -> list[int]:
+    """
+    Devuelve las profundidades que busca el proceso: todas el principal (índice 0) y, los auxiliares, las
+    que no se salta su patrón, terminando siempre en la profundidad máxima.
+    """
+    profundidades = list(range(1, profundidad_maxima + 1))
+    if indice == 0:
+        return profundidades
+    patron = (indice - 1) % len(TAMANOS_SALTO)
+    profundidades = [profundidad for profundidad in profundidades
+                     if not (profundidad + FASES_SALTO[patron]) // TAMANOS_SALTO[patron] % 2]
+    if not profundidades or profundidades[-1] != profundidad_maxima:
+        profundidades.append(profundidad_maxima)
+    return profundidades
+
+
+def _buscar_auxiliar(argumentos: tuple) -> ResultadoBusqueda:
+    """
+    Tarea de un proceso auxiliar del pool: abre la tabla y la bandera compartidas, reconstruye la posición
+    (con las claves de la partida, para detectar repeticiones) y busca hasta terminar o hasta que se active
+    la bandera.
+    """
+    (indice, fen, historial_claves, nombre_tabla, num_cubos, edad, nombre_parada,
+     profundidad_maxima, limite_nodos, limite_tiempo, pesos) = argumentos
+    tabla = TablaTransposicion.abrir_compartida(nombre_tabla, num_cubos, edad)
+    memoria_parada = shared_memory.SharedMemory(name=nombre_parada)
+    parada = np.ndarray((1,), dtype=np.uint8, buffer=memoria_parada.buf)
+    try:
+        tablero = Tablero.desde_fen(fen)
+        tablero.historial_claves = list(historial_claves)
+        tablero.recalcular_clave()
+        resultado = Buscador(tablero, pesos=pesos, tabla=tabla, parada=parada).buscar(
+            profundidad_maxima, limite_nodos, limite_tiempo, profundidades_proceso(indice, profundidad_maxima))
+        parada[0] = 1
+        return resultado
+    finally:
+        del parada
+        memoria_parada.close()
+        tabla.cerrar()
+
+
+class BuscadorParalelo:
+    """
+    Búsqueda Lazy SMP sobre un tablero. El proceso que llama hace de proceso principal y los auxiliares
+    se quedan en un pool entre búsquedas. La tabla compartida y el pool se liberan con cerrar() (o al
+    salir de un bloque with).
+    """
+
+    def __init__(self, tablero: Tablero, procesos: int = None, pesos: dict = None,
+                 tamano_tabla_mb: float = config.TAMANO_TABLA_TRANSPOSICION_MB):
+        """
+        Args:
+            tablero (Tablero): Posición a buscar; se lee de nuevo en cada búsqueda.
+            procesos (int): Número total de procesos, incluido el principal (por defecto, uno por núcleo).
+            pesos (dict): Pesos de la evaluación (por defecto config.PESOS_POR_DEFECTO).
+            tamano_tabla_mb (float): Tamaño de la tabla de transposición compartida en MB.
+        """
+        procesos = procesos if procesos is not None else os.cpu_count() or 1
+        if procesos < 1:
+            raise ValueError(f"Error, número de procesos inválido: {procesos}")
+        self._tablero = tablero
+        self._procesos = procesos
+        self._pesos = pesos
+        self._tabla = TablaTransposicion.compartida(tamano_tabla_mb)
+        self._memoria_parada = shared_memory.SharedMemory(create=True, size=1)
+        self._parada = np.ndarray((1,), dtype=np.uint8, buffer=self._memoria_parada.buf)
+        self._buscador = Buscador(tablero, pesos=pesos, tabla=self._tabla, parada=self._parada)
+        self._pool = ProcessPoolExecutor(max_workers=procesos - 1) if procesos > 1 else None
+
+    def __repr__(self) -> str:
+        return f"BuscadorParalelo (procesos={self._procesos}, tabla={self._tabla!r})"
+
+    def __enter__(self) -> "BuscadorParalelo":
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+    @property
+    def tabla(self) -> TablaTransposicion:
+        return self._tabla
+
+    @property
+    def tablero(self) -> Tablero:
+        return self._tablero
+
+    @tablero.setter
+    def tablero(self, tablero: Tablero) -> None:
+        """
+        Cambia la posición a buscar conservando el pool de procesos y la tabla compartida (que se puede
+        vaciar con tabla.limpiar() si las búsquedas deben ser independientes).
+        """
+        self._tablero = tablero
+        self._buscador = Buscador(tablero, pesos=self._pesos, tabla=self._tabla, parada=self._parada)
+
+    def buscar(self, profundidad_maxima: int = PROFUNDIDAD_MAXIMA, limite_nodos: int = None,
+               limite_tiempo: float = None) -> ResultadoBusqueda:
+        """
+        Busca con todos los procesos y devuelve la variante principal del proceso que haya completado más
+        profundidad (el principal en caso de empate), con los nodos sumados de todos los procesos.
+        Args:
+            profundidad_maxima (int): Profundidad máxima en medios movimientos.
+            limite_nodos (int): Número máximo de nodos de cada proceso (None para no limitar).
+            limite_tiempo (float): Tiempo máximo en segundos (None para no limitar).
+        """
+        inicio = time.perf_counter()
+        self._parada[0] = 0
+        futuros = []
+        if self._pool is not None:
+            tablero = self._tablero
+            argumentos_comunes = (tablero.a_fen(), tuple(tablero.historial_claves), self._tabla.nombre_memoria,
+                                  self._tabla.num_cubos, self._tabla.edad, self._memoria_parada.name,
+                                  profundidad_maxima, limite_nodos, limite_tiempo, self._pesos)
+            futuros = [self._pool.submit(_buscar_auxiliar, (indice,) + argumentos_comunes)
+                       for indice in range(1, self._procesos)]
+
+        resultados = [self._buscador.buscar(profundidad_maxima, limite_nodos, limite_tiempo)]
+        self._parada[0] = 1
+        resultados.extend(futuro.result() for futuro in futuros)
+
+        # max se queda con el primero de los empatados, que es el del proceso principal
+        mejor = max(resultados, key=lambda resultado: resultado.profundidad)
+        nodos = sum(resultado.nodos for resultado in resultados)
+        tiempo = time.perf_counter() - inicio
+        return mejor._replace(nodos=nodos, tiempo=tiempo, nodos_por_segundo=nodos / tiempo if tiempo > 0 else 0.0)
+
+    def cerrar(self) -> None:
+        """
+        Detiene el pool de procesos auxiliares y libera la memoria compartida.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._memoria_parada is not None:
+            self._buscador = self._parada = None
+            self._memoria_parada.close()
+            self._memoria_parada.unlink()
+            self._memoria_parada = None
+        self._tabla.cerrar()
+
+
+def _medir(fens: list, procesos: int, profundidad: int, tamano_tabla_mb: float) -> tuple:
+    """
+    Busca cada posición hasta la profundidad dada con una tabla vacía y devuelve (nodos, segundos) totales.
+    El pool se crea una sola vez y se calienta con una búsqueda previa que no se mide, para que el
+    arranque de los procesos auxiliares no cuente como tiempo de búsqueda.
+    """
+    nodos, segundos = 0, 0.0
+    with BuscadorParalelo(Tablero.desde_fen(fens[0]), procesos, tamano_tabla_mb=tamano_tabla_mb) as buscador:
+        buscador.buscar(1)
+        for fen in fens:
+            buscador.tablero = Tablero.desde_fen(fen)
+            buscador.tabla.limpiar()
+            resultado = buscador.buscar(profundidad)
+            nodos += resultado.nodos
+            segundos += resultado.tiempo
+    return nodos, segundos
+
+
+def main(argumentos: list = None) -> int:
+    """
+    Punto de entrada de la línea de comandos: mide el tiempo hasta la profundidad y los nodos por segundo
+    con cada número de procesos, y su escalado respecto al primero.
+    """
+    parser = argparse.ArgumentParser(description="Escalado de la búsqueda paralela Lazy SMP")
+    parser.add_argument("--fen", help="Posición en notación FEN (por defecto, las posiciones del banco)")
+    parser.add_argument("-p", "--profundidad", type=int, default=4, help="Profundidad en medios movimientos")
+    parser.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4], help="Números de procesos a medir")
+    parser.add_argument("--tabla", type=float, default=16, help="Tamaño de la tabla compartida en MB")
+    args = parser.parse_args(argumentos)
+
+    fens = [args.fen] if args.fen else list(POSICIONES_BANCO)
+    print(f"{len(fens)} posiciones, profundidad {args.profundidad}, {os.cpu_count()} núcleos")
+    referencia = None
+    for procesos in args.procesos:
+        nodos, segundos = _medir(fens, procesos, args.profundidad, args.tabla)
+        nodos_por_segundo = nodos / segundos if segundos > 0 else 0.0
+        if referencia is None:
+            referencia = (segundos, nodos_por_segundo)
+        print(f"{procesos} procesos: {segundos:.2f} s hasta la profundidad, {nodos} nodos, "
+              f"{nodos_por_segundo:.0f} nodos/s | tiempo x{referencia[0] / segundos:.2f}, "
+              f"nodos/s x{nodos_por_segundo / referencia[1]:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Caché de evaluaciones estáticas con capacidad fija y reemplazo por reloj (CLOCK, una aproximación
+de LRU). Cada ranura tiene un bit de referencia que se activa al leerla; al insertar con la caché
+llena, la manecilla recorre las ranuras dando una segunda oportunidad a las referenciadas y
+desaloja la primera que no lo está.
+"""
+from typing import Hashable, Optional
+
+from utils import config
+
+
+class CacheEvaluaciones:
+
+    def __init__(self, capacidad: int = config.CAPACIDAD_CACHE_EVALUACIONES):
+        """
+        Args:
+            capacidad (int): Número máximo de evaluaciones guardadas.
+        """
+        if capacidad <= 0:
+            raise ValueError(f"Error, capacidad inválida para la caché de evaluaciones: {capacidad}")
+        self.capacidad = capacidad
+        # Las ranuras se crean a medida que se llenan, hasta la capacidad
+        self._ranuras: dict = {}                        # Clave -> ranura
+        self._claves: list = []
+        self._valores: list[float] = []
+        self._referenciadas = bytearray()
+        self._manecilla = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def __len__(self) -> int:
+        return len(self._ranuras)
+
+    def __repr__(self) -> str:
+        return (f"CacheEvaluaciones (capacidad={self.capacidad}, ocupadas={len(self._ranuras)}, "
+                f"aciertos={self.aciertos}, fallos={self.fallos}, desalojos={self.desalojos})")
+
+    def limpiar(self) -> None:
+        """
+        Vacía la caché y reinicia los contadores sin cambiar la capacidad.
+        """
+        self._ranuras.clear()
+        self._claves = []
+        self._valores = []
+        self._referenciadas = bytearray()
+        self._manecilla = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def buscar(self, clave: Hashable) -> Optional[float]:
+        """
+        Devuelve la evaluación guardada con la clave, o None si no está.
+        """
+        ranura = self._ranuras.get(clave)
+        if ranura is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        self._referenciadas[ranura] = 1
+        return self._valores[ranura]
+
+    def guardar(self, clave: Hashable, valor: float) -> None:
+        """
+        Guarda la evaluación con la clave. Si la caché está llena desaloja la primera ranura no
+        referenciada que encuentra la manecilla.
+        """
+        ranura = self._ranuras.get(clave)
+        if ranura is not None:
+            self._valores[ranura] = valor
+            return
+        if len(self._claves) < self.capacidad:
+            ranura = len(self._claves)
+            self._claves.append(clave)
+            self._valores.append(valor)
+            self._referenciadas.append(0)
+        else:
+            ranura = self._ranura_a_desalojar()
+            del self._ranuras[self._claves[ranura]]
+            self.desalojos += 1
+            self._claves[ranura] = clave
+            self._valores[ranura] = valor
+            self._referenciadas[ranura] = 0
+        self._ranuras[clave] = ranura
+
+    def _ranura_a_desalojar(self) -> int:
+        """
+        Avanza la manecilla quitando el bit de referencia de las ranuras que lo tienen hasta encontrar
+        una sin él.
+        """
+        referenciadas = self._referenciadas
+        while referenciadas[self._manecilla]:
+            referenciadas[self._manecilla] = 0
+            self._manecilla = (self._manecilla + 1) % self.capacidad
+        ranura = self._manecilla
+        self._manecilla = (self._manecilla + 1) % self.capacidad
+        return ranura
@@ -0,0 +1,129 @@
+"""
+Codificación de posiciones en planos de 8x8 para la red del agente. Los planos se escriben en un
+buffer que da quien llama (float32 o uint8), de modo que en el autojuego se puede reservar una vez
+un array (N, NUM_PLANOS, 8, 8) y rellenarlo en cada paso sin crear objetos intermedios.
+
+Planos de cada posición ([fila][columna], con la fila 0 la primera de las blancas):
+- 0..11: piezas, el plano color * 6 + tipo con los índices de bitboards (BLANCAS/NEGRAS y PEON..REY),
+- PLANO_TURNO: todo a 1 si mueven las blancas,
+- PLANOS_ENROQUE: un plano por derecho de enroque, en el orden de los bits de Tablero.derechos_enroque,
+- PLANO_AL_PASO: un 1 en la casilla donde se puede capturar al paso,
+- PLANOS_REPETICION: todo a 1 si la posición ya ha aparecido al menos 2 (y 3) veces,
+- PLANO_REGLA_50: el reloj de medios movimientos en todas las casillas (saturado a 255).
+"""
+from typing import Sequence
+
+import numpy as np
+
+from bitboards import BLANCAS, NEGRAS, NUM_TIPOS
+from color import Color
+from tablero import Tablero
+
+DIM = 8
+NUM_PLANOS_PIEZAS = 2 * NUM_TIPOS
+PLANO_TURNO = NUM_PLANOS_PIEZAS
+PLANOS_ENROQUE = PLANO_TURNO + 1
+NUM_ENROQUES = 4
+PLANO_AL_PASO = PLANOS_ENROQUE + NUM_ENROQUES
+PLANOS_REPETICION = PLANO_AL_PASO + 1
+NUM_REPETICIONES = 2
+PLANO_REGLA_50 = PLANOS_REPETICION + NUM_REPETICIONES
+NUM_PLANOS = PLANO_REGLA_50 + 1
+
+MAX_RELOJ = 255     # Valor máximo del plano del reloj, para que quepa en un buffer uint8
+
+# Bits (columna 0 primero) de cada valor de un byte de bitboard; una copia por tipo de buffer
+_BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1, bitorder="little")
+_TABLAS_BITS: dict = {}
+
+
+def _tabla_bits(tipo: np.dtype) -> np.ndarray:
+    """
+    Devuelve la tabla byte -> 8 casillas con el tipo del buffer, para que np.take escriba en él sin conversiones.
+    """
+    tabla = _TABLAS_BITS.get(tipo)
+    if tabla is None:
+        tabla = _TABLAS_BITS[tipo] = _BITS_POR_BYTE.astype(tipo)
+    return tabla
+
+
+def _comprobar_salida(salida: np.ndarray, num_posiciones: int, num_planos: int, tipo: type) -> np.ndarray:
+    """
+    Crea el buffer (N, planos, 8, 8) si no se da y, si se da, comprueba su forma.
+    """
+    if salida is None:
+        return np.empty((num_posiciones, num_planos, DIM, DIM), dtype=tipo)
+    if salida.shape != (num_posiciones, num_planos, DIM, DIM):
+        raise ValueError(f"Error, se esperaba un buffer de forma {(num_posiciones, num_planos, DIM, DIM)} "
+                         f"y se recibió {salida.shape}")
+    return salida
+
+
+def codificar_piezas_lote(tableros: Sequence[Tablero], salida: np.ndarray = None,
+                          tipo: type = np.uint8) -> np.ndarray:
+    """
+    Escribe los 12 planos de piezas de cada tablero a partir de sus bitboards.
+    Args:
+        tableros (Sequence[Tablero]): Posiciones a codificar.
+        salida (np.ndarray): Buffer (N, 12, 8, 8), o una vista de los 12 primeros planos de uno mayor.
+        tipo (type): Tipo del buffer que se crea si salida es None.
+    Returns:
+        np.ndarray: El buffer con los planos de piezas.
+    """
+    salida = _comprobar_salida(salida, len(tableros), NUM_PLANOS_PIEZAS, tipo)
+    bitboards = np.empty((len(tableros), NUM_PLANOS_PIEZAS), dtype="<u8")
+    for indice, tablero in enumerate(tableros):
+        bitboards[indice, :NUM_TIPOS] = tablero.bitboards[BLANCAS]
+        bitboards[indice, NUM_TIPOS:] = tablero.bitboards[NEGRAS]
+    # Cada byte de un bitboard es una fila del tablero: la tabla lo expande a sus 8 casillas
+    filas = bitboards.view(np.uint8).reshape(len(tableros), NUM_PLANOS_PIEZAS, DIM)
+    np.take(_tabla_bits(salida.dtype), filas, axis=0, out=salida)
+    return salida
+
+
+def codificar_lote(tableros: Sequence[Tablero], salida: np.ndarray = None, tipo: type = np.float32) -> np.ndarray:
+    """
+    Escribe todos los planos (ver el docstring del módulo) de cada tablero en el buffer.
+    Args:
+        tableros (Sequence[Tablero]): Posiciones a codificar.
+        salida (np.ndarray): Buffer (N, NUM_PLANOS, 8, 8), por ejemplo un trozo de un array reservado una vez.
+        tipo (type): Tipo del buffer que se crea si salida es None.
+    Returns:
+        np.ndarray: El buffer con los planos.
+    """
+    salida = _comprobar_salida(salida, len(tableros), NUM_PLANOS, tipo)
+    codificar_piezas_lote(tableros, salida[:, :NUM_PLANOS_PIEZAS])
+
+    # Estado de cada tablero en una fila: turno, derechos de enroque, casilla al paso (-1 si no hay),
+    # repetida 2 veces, repetida 3 veces y reloj
+    estados = np.empty((len(tableros), 6), dtype=np.int32)
+    for indice, tablero in enumerate(tableros):
+        al_paso = tablero.casilla_al_paso
+        estados[indice] = (tablero.turno == Color.BLANCA,
+                           tablero.derechos_enroque,
+                           -1 if al_paso is None else al_paso[0] * DIM + al_paso[1],
+                           tablero.es_repeticion(2),
+                           tablero.es_repeticion(3),
+                           min(tablero.reloj_medio_movimientos, MAX_RELOJ))
+    turnos, derechos, al_paso, _, _, relojes = estados.T
+
+    salida[:, PLANO_TURNO] = turnos[:, np.newaxis, np.newaxis]
+    enroques = derechos[:, np.newaxis] >> np.arange(NUM_ENROQUES) & 1
+    salida[:, PLANOS_ENROQUE:PLANOS_ENROQUE + NUM_ENROQUES] = enroques[:, :, np.newaxis, np.newaxis]
+    salida[:, PLANO_AL_PASO] = 0
+    con_al_paso = np.flatnonzero(al_paso >= 0)
+    salida[con_al_paso, PLANO_AL_PASO, al_paso[con_al_paso] // DIM, al_paso[con_al_paso] % DIM] = 1
+    repeticiones = estados[:, 3:3 + NUM_REPETICIONES]
+    salida[:, PLANOS_REPETICION:PLANOS_REPETICION + NUM_REPETICIONES] = repeticiones[:, :, np.newaxis, np.newaxis]
+    salida[:, PLANO_REGLA_50] = relojes[:, np.newaxis, np.newaxis]
+    return salida
+
+
+def codificar_tablero(tablero: Tablero, salida: np.ndarray = None, tipo: type = np.float32) -> np.ndarray:
+    """
+    Escribe los planos de una posición en un buffer (NUM_PLANOS, 8, 8).
+    """
+    if salida is None:
+        salida = np.empty((NUM_PLANOS, DIM, DIM), dtype=tipo)
+    codificar_lote((tablero,), salida[np.newaxis])
+    return salida
@@ -0,0 +1,217 @@
+"""
+Evaluación vectorizada de lotes de posiciones para etiquetar datos y ajustar pesos sin pasar por
+los objetos del tablero. Cada posición se describe con 12 planos de 8x8 (N, 12, 8, 8): el plano
+color * 6 + tipo tiene un 1 en [fila][columna] si hay una pieza de ese color y tipo, con los
+índices de bitboards (BLANCAS/NEGRAS y PEON..REY).
+
+Los términos de material, tablas posicionales y estructura de peones dan el mismo valor que los del
+Evaluador. El control del centro solo cuenta la ocupación de las casillas centrales, porque las
+casillas alcanzables necesitan generar movimientos; tampoco se detectan los casos terminales (mate,
+ahogado o tablas), así que las posiciones del lote deben estar en juego.
+"""
+from typing import Union
+
+import numpy as np
+
+from bitboards import BLANCAS, NEGRAS, NUM_TIPOS, PEON, indice_color
+from codificacion import DIM, NUM_PLANOS_PIEZAS, codificar_piezas_lote
+from color import Color
+from tabla_peones import AISLADOS, DOBLADOS, PASADOS
+from tablas_posicionales import TABLAS_POSICIONALES
+from tablero import TIPO_POR_CLASE, Tablero
+from utils import config
+
+# Valor de material de cada tipo de pieza, el mismo valor_relativo que suma el tablero
+VALORES_MATERIAL = np.zeros(NUM_TIPOS, dtype=np.int32)
+for _clase, _tipo in TIPO_POR_CLASE.items():
+    VALORES_MATERIAL[_tipo] = _clase(Color.BLANCA).valor_relativo
+VALORES_MATERIAL.flags.writeable = False
+
+# Coeficientes de la estructura de peones (los mismos que Evaluador.evaluar_estructura_peones)
+PENALIZACION_AISLADO = 0.5
+PENALIZACION_DOBLADO = 0.5
+BONO_PASADO = 1.0
+
+# Número de bits activos de cada valor de un byte
+_BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1, dtype=np.int32)
+
+# Bloque 2x2 central de un tablero de 8x8 (d4, e4, d5 y e5)
+_CENTRO = slice(DIM // 2 - 1, DIM // 2 + 1)
+
+
+def planos_desde_tablero(tablero: Tablero, salida: np.ndarray = None) -> np.ndarray:
+    """
+    Escribe los 12 planos de piezas del tablero a partir de sus bitboards.
+    Args:
+        tablero (Tablero): Posición a codificar.
+        salida (np.ndarray): Array (12, 8, 8) donde escribir; si es None se crea uno de uint8.
+    Returns:
+        np.ndarray: Los planos de piezas.
+    """
+    if salida is None:
+        salida = np.empty((NUM_PLANOS_PIEZAS, DIM, DIM), dtype=np.uint8)
+    codificar_piezas_lote((tablero,), salida[np.newaxis])
+    return salida
+
+
+def _preparar_lote(planos: np.ndarray) -> np.ndarray:
+    """
+    Comprueba la forma del lote y devuelve los planos como (N, 2, 6, 8, 8). Una sola posición (12, 8, 8)
+    se trata como un lote de tamaño 1.
+    """
+    planos = np.asarray(planos)
+    if planos.ndim == 3:
+        planos = planos[np.newaxis]
+    if planos.ndim != 4 or planos.shape[1:] != (NUM_PLANOS_PIEZAS, DIM, DIM):
+        raise ValueError(f"Error, se esperaban planos de forma (N, 12, 8, 8) y se recibió {planos.shape}")
+    return planos.reshape(len(planos), 2, NUM_TIPOS, DIM, DIM)
+
+
+def _indices_colores(colores: Union[Color, np.ndarray], num_posiciones: int) -> np.ndarray:
+    """
+    Devuelve el índice (BLANCAS o NEGRAS) del color evaluado en cada posición del lote.
+    """
+    if isinstance(colores, Color):
+        return np.full(num_posiciones, indice_color(colores), dtype=np.intp)
+    indices = np.asarray(colores, dtype=np.intp)
+    if indices.shape != (num_posiciones,) or np.any((indices != BLANCAS) & (indices != NEGRAS)):
+        raise ValueError("Error, se esperaba un índice de color (0 o 1) por posición del lote")
+    return indices
+
+
+def _diferencia(valores: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Dado un array (N, 2) con un valor por color, devuelve el valor del color evaluado menos el del oponente.
+    """
+    filas = np.arange(len(valores))
+    return valores[filas, indices] - valores[filas, indices ^ 1]
+
+
+def material_lote(planos: np.ndarray) -> np.ndarray:
+    """
+    Devuelve el material (suma de valor_relativo) de cada color, con forma (N, 2).
+    """
+    return _material(_preparar_lote(planos))
+
+
+def _material(piezas: np.ndarray) -> np.ndarray:
+    recuentos = piezas.sum(axis=(3, 4), dtype=np.int32)                            # (N, 2, 6)
+    return recuentos @ VALORES_MATERIAL
+
+
+def posicional_lote(planos: np.ndarray) -> np.ndarray:
+    """
+    Devuelve la puntuación de las tablas posicionales en centipeones de cada color, con forma (N, 2).
+    """
+    return _posicional(_preparar_lote(planos))
+
+
+def _posicional(piezas: np.ndarray) -> np.ndarray:
+    casillas = piezas.reshape(len(piezas), 2, NUM_TIPOS * DIM * DIM)
+    tablas = TABLAS_POSICIONALES.reshape(2, NUM_TIPOS * DIM * DIM).astype(np.int32)
+    return np.einsum("nck,ck->nc", casillas, tablas, dtype=np.int32)
+
+
+def recuentos_peones_lote(planos: np.ndarray) -> np.ndarray:
+    """
+    Devuelve los recuentos de peones aislados, doblados y pasados de cada color, con forma (N, 2, 3)
+    e índices de tabla_peones (AISLADOS, DOBLADOS y PASADOS).
+    """
+    return _recuentos_peones(_preparar_lote(planos))
+
+
+def _recuentos_peones(piezas: np.ndarray) -> np.ndarray:
+    # Cada fila de peones se empaqueta en un byte cuyo bit c es la columna c: (N, 2, fila)
+    filas = np.packbits(piezas[:, :, PEON].astype(bool), axis=3, bitorder="little")[..., 0]
+    columnas = np.bitwise_or.reduce(filas, axis=2)                                  # Columnas con peones (N, 2)
+    total = _contar_bits(filas).sum(axis=2)
+
+    # Doblados: peones que sobran en columnas con más de uno
+    doblados = total - _contar_bits(columnas)
+
+    # Aislados: peones de columnas sin peones propios en las columnas adyacentes
+    sin_vecinas = columnas & ~_columnas_adyacentes(columnas)
+    aislados = _contar_bits(filas & sin_vecinas[..., np.newaxis]).sum(axis=2)
+
+    # Pasados: ningún peón rival por delante en la misma columna o en las adyacentes. Por delante de
+    # la fila f están las filas mayores para las blancas y las menores para las negras.
+    negras_detras = np.bitwise_or.accumulate(filas[:, NEGRAS, ::-1], axis=1)[:, ::-1]    # Filas >= f
+    blancas_delante = np.bitwise_or.accumulate(filas[:, BLANCAS], axis=1)                # Filas <= f
+    bloqueo_blancas = np.zeros_like(negras_detras)
+    bloqueo_blancas[:, :-1] = negras_detras[:, 1:]
+    bloqueo_negras = np.zeros_like(blancas_delante)
+    bloqueo_negras[:, 1:] = blancas_delante[:, :-1]
+    bloqueo_blancas |= _columnas_adyacentes(bloqueo_blancas)
+    bloqueo_negras |= _columnas_adyacentes(bloqueo_negras)
+    pasados = np.stack([_contar_bits(filas[:, BLANCAS] & ~bloqueo_blancas).sum(axis=1),
+                        _contar_bits(filas[:, NEGRAS] & ~bloqueo_negras).sum(axis=1)], axis=1)
+
+    recuentos = np.empty((len(piezas), 2, 3), dtype=np.int32)
+    recuentos[..., AISLADOS] = aislados
+    recuentos[..., DOBLADOS] = doblados
+    recuentos[..., PASADOS] = pasados
+    return recuentos
+
+
+def _columnas_adyacentes(columnas: np.ndarray) -> np.ndarray:
+    """
+    Devuelve, para bytes de columnas (bit c = columna c), las columnas vecinas de las marcadas.
+    """
+    return (columnas << 1) | (columnas >> 1)
+
+
+def _contar_bits(bytes_columnas: np.ndarray) -> np.ndarray:
+    """
+    Cuenta los bits activos de cada byte.
+    """
+    return _BITS_POR_BYTE[bytes_columnas]
+
+
+def ocupacion_centro_lote(planos: np.ndarray) -> np.ndarray:
+    """
+    Devuelve el número de casillas centrales ocupadas por piezas de cada color, con forma (N, 2).
+    """
+    return _ocupacion_centro(_preparar_lote(planos))
+
+
+def _ocupacion_centro(piezas: np.ndarray) -> np.ndarray:
+    return piezas[..., _CENTRO, _CENTRO].sum(axis=(2, 3, 4), dtype=np.int32)
+
+
+def evaluar_lote(planos: np.ndarray, colores: Union[Color, np.ndarray] = Color.BLANCA,
+                 pesos: dict = None) -> np.ndarray:
+    """
+    Evalúa un lote de posiciones con los términos que no necesitan generar movimientos y los combina
+    igual que Evaluador.evaluar: material, tablas posicionales, estructura de peones (del color
+    evaluado, multiplicada dos veces por su peso) y ocupación del centro (normalizada entre -1 y 1 y
+    multiplicada dos veces por su peso).
+    Args:
+        planos (np.ndarray): Planos de piezas (N, 12, 8, 8), o (12, 8, 8) para una sola posición.
+        colores (Color | np.ndarray): Color evaluado en todo el lote, o un índice de color por posición.
+        pesos (dict): Pesos de los términos; por defecto config.PESOS_POR_DEFECTO.
+    Returns:
+        np.ndarray: Evaluación (float64) de cada posición desde el punto de vista de su color evaluado.
+    """
+    piezas = _preparar_lote(planos)
+    pesos = pesos if pesos is not None else config.PESOS_POR_DEFECTO
+    indices = _indices_colores(colores, len(piezas))
+
+    peso_material = float(pesos.get("material", 1.0))
+    peso_posicional = float(pesos.get("posicional", 1.0))
+    peso_estructura = float(pesos.get("estructura_peones", 0.2))
+    peso_centro = float(pesos.get("control_centro", 0.1))
+
+    material = _diferencia(_material(piezas), indices)
+    posicional = _diferencia(_posicional(piezas), indices) / 100.0
+
+    propios = _recuentos_peones(piezas)[np.arange(len(piezas)), indices]           # (N, 3)
+    estructura = (propios[:, PASADOS] * BONO_PASADO
+                  - propios[:, DOBLADOS] * PENALIZACION_DOBLADO
+                  - propios[:, AISLADOS] * PENALIZACION_AISLADO) * peso_estructura
+
+    centro = _diferencia(_ocupacion_centro(piezas), indices) / 4.0 * peso_centro
+
+    return (material * peso_material
+            + posicional * peso_posicional
+            + estructura * peso_estructura
+            + centro * peso_centro)
@@ -1,17 +1,35 @@
 from array import array
+import math
 
-from generador_movimiento import Generador_movimientos
+import numpy as np
+
+import evaluacion_lote
+
+from bitboards import PEON, casilla, indice_color, iterar_casillas
+from cache_evaluaciones import CacheEvaluaciones
+from mapa_ataques import MapaAtaques
+from tabla_peones import AISLADOS, DOBLADOS, NUM_RECUENTOS, PASADOS, TablaPeones
 from tablero import Tablero
 from color import Color
 from piezas.pieza import Pieza
 from piezas.peon import Peon
 # from piezas.rey import Rey
 from utils import config
-from reglas import Reglas
+from reglas import EstadoPartida, Reglas
+
+# Coeficientes de la seguridad del rey
+BONO_PEON_ESCUDO = 0.25
+PENALIZACION_ATACANTE = 0.6
+PENALIZACION_REY_CENTRAL = 0.5
+
+# Cotas usadas por la evaluación perezosa
+MAX_MOVIMIENTOS_LEGALES = 218       # Máximo de movimientos legales conocido en una posición de ajedrez
+MAX_PEONES_ESCUDO = 8               # Casillas adyacentes al rey
 
 class Evaluador:
 
-    def __init__(self, tablero: Tablero, reglas: Reglas, color_a_evaluar: Color = Color.BLANCA, pesos: dict = None):
+    def __init__(self, tablero: Tablero, reglas: Reglas, color_a_evaluar: Color = Color.BLANCA, pesos: dict = None,
+                 tabla_peones: TablaPeones = None, cache_evaluaciones: CacheEvaluaciones = None):
         self._tablero = tablero
         self._reglas = reglas
         self._color = color_a_evaluar
@@ -19,6 +37,12 @@ class Evaluador:
             self._pesos = pesos.copy()
         else:
             self._pesos = config.PESOS_POR_DEFECTO.copy()
+        self._huella_pesos = self._calcular_huella_pesos(self._pesos)
+        # Evaluaciones ya calculadas por (clave Zobrist, color, huella de los pesos); se puede compartir
+        self._cache = cache_evaluaciones if cache_evaluaciones is not None else CacheEvaluaciones()
+        self._mapa: MapaAtaques = None          # Mapa de ataques de la última posición evaluada
+        # Recuentos de estructuras de peones ya evaluadas; se puede compartir entre evaluadores del mismo tablero
+        self._tabla_peones = tabla_peones if tabla_peones is not None else TablaPeones()
 
     def __str__(self) -> str:
         return f"Evaluador para {self._color.name} (pesos: {len(self._pesos)})"
@@ -26,73 +50,171 @@ class Evaluador:
     def __repr__(self) -> str:
         return f"Evaluador (color={self._color.name}, pesos_llaves:  {list(self._pesos.keys())})"
 
-    def evaluar(self) -> float:
+    @property
+    def pesos(self) -> dict:
+        """
+        Devuelve una copia de los pesos del evaluador.
+        """
+        return self._pesos.copy()
+
+    @pesos.setter
+    def pesos(self, pesos: dict) -> None:
+        """
+        Sustituye los pesos del evaluador. Si cambian, las evaluaciones de la caché dejan de ser válidas
+        y se vacía.
+        """
+        huella = self._calcular_huella_pesos(pesos)
+        self._pesos = pesos.copy()
+        if huella != self._huella_pesos:
+            self._huella_pesos = huella
+            self._cache.limpiar()
+
+    @property
+    def cache(self) -> CacheEvaluaciones:
+        """
+        Devuelve la caché de evaluaciones (con sus contadores de aciertos, fallos y desalojos).
+        """
+        return self._cache
+
+    @staticmethod
+    def _calcular_huella_pesos(pesos: dict) -> int:
+        """
+        Devuelve una huella del conjunto de pesos para distinguir en la caché las evaluaciones hechas con pesos distintos.
+        """
+        return hash(tuple(sorted((clave, float(valor)) for clave, valor in pesos.items())))
+
+    def evaluar(self, alfa: float = -math.inf, beta: float = math.inf) -> float:
         """
         Combina las métricas parciales y devuelve una evaluación para el color a evaluar.
-        Casos terminales:
+        Casos terminales (según el estado de la partida para el color al que le toca mover):
         - si el rey del color a evaluar está en jaque mate -> valor muy negativo
         - si el rey del oponente está en jaque mate -> valor muy positivo
+        - ahogado o tablas -> 0
 
         Las métricas parciales se combinan usando los pesos que se introducen en el constructor.
+        Evaluación perezosa: primero se suman los términos baratos (material, tablas posicionales y
+        estructura de peones) y, si ni el mayor ni el menor valor posible de los términos restantes
+        pueden devolver la puntuación a la ventana (alfa, beta), se devuelve esa cota sin calcularlos.
+        Dentro de la ventana el resultado es el mismo que el de la evaluación completa.
+        Las evaluaciones completas se guardan en la caché por posición, color y pesos; los cortes
+        perezosos no se guardan porque solo son cotas.
+        Args:
+            alfa (float): Cota inferior de la ventana de búsqueda.
+            beta (float): Cota superior de la ventana de búsqueda.
+        Returns:
+            float: La evaluación exacta, o una cota superior <= alfa o una cota inferior >= beta.
         """
-        # colores
-        color_oponente = Color.BLANCA if self._color == Color.NEGRA else Color.NEGRA
-
         # valores terminales
         mate_valor = float(self._pesos.get("mate", 1e6))    # Se escoge un valor muy grande
 
         # Casos terminales gestionados por Reglas
-        if self._reglas.es_jaque_mate(self._color):
-            return -mate_valor
-        if self._reglas.es_jaque_mate(color_oponente):
-            return mate_valor
-        if self._reglas.es_tablas():
+        estado = self._reglas.estado_partida()
+        if estado == EstadoPartida.JAQUE_MATE:
+            return -mate_valor if self._tablero.turno == self._color else mate_valor
+        if estado != EstadoPartida.EN_JUEGO:
             return 0.0
 
+        # La evaluación no terminal solo depende de la posición, el color y los pesos
+        clave_cache = (self._tablero.clave_hash, self._color, self._huella_pesos)
+        puntuacion_guardada = self._cache.buscar(clave_cache)
+        if puntuacion_guardada is not None:
+            return puntuacion_guardada
+
         # Pesos
         peso_material = float(self._pesos.get("material", 1.0))
+        peso_posicional = float(self._pesos.get("posicional", 1.0))
         peso_movilidad = float(self._pesos.get("movilidad", 0.05))
         peso_estructura = float(self._pesos.get("estructura_peones", 0.2))
         peso_seguridad = float(self._pesos.get("seguridad_rey", 0.5))
         peso_centro = float(self._pesos.get("control_centro", 0.1))
 
-        # Métricas parciales (todas desde la perspectiva de self._color)
+        # Métricas baratas (todas desde la perspectiva de self._color)
         material = self.evaluar_material()
-        movilidad = self.evaluar_movilidad()
+        posicional = self.evaluar_posicional()
         estructura = self.evaluar_estructura_peones()
+        puntuacion_parcial = (
+            material * peso_material
+            + posicional * peso_posicional
+            + estructura * peso_estructura
+        )
+
+        # Corte perezoso si los términos caros no pueden devolver la puntuación a la ventana
+        minimo_restante, maximo_restante = self._cotas_terminos_caros()
+        if puntuacion_parcial + maximo_restante <= alfa:
+            return float(puntuacion_parcial + maximo_restante)
+        if puntuacion_parcial + minimo_restante >= beta:
+            return float(puntuacion_parcial + minimo_restante)
+
+        # Métricas que necesitan el mapa de ataques
+        movilidad = self.evaluar_movilidad()
         seguridad = self.evaluar_seguridad_rey()
         centro = self.evaluar_control_centro()
 
         # Combinación lineal de las puntuaciones parciales
         puntuacion_global = (
-            material * peso_material
+            puntuacion_parcial
             + movilidad * peso_movilidad
-            + estructura * peso_estructura
             + seguridad * peso_seguridad
             + centro * peso_centro
         )
 
-        return float(puntuacion_global)
+        puntuacion_global = float(puntuacion_global)
+        self._cache.guardar(clave_cache, puntuacion_global)
+        return puntuacion_global
+
+    def evaluar_lote(self, planos: np.ndarray) -> np.ndarray:
+        """
+        Evalúa con NumPy un lote de posiciones dadas como planos de piezas (N, 12, 8, 8), usando los pesos
+        y el color de este evaluador. Solo incluye los términos que no necesitan generar movimientos
+        (ver evaluacion_lote.evaluar_lote), así que no sustituye a evaluar en la búsqueda.
+        Returns:
+            np.ndarray: Evaluación de cada posición del lote.
+        """
+        return evaluacion_lote.evaluar_lote(planos, self._color, self._pesos)
+
+    def _cotas_terminos_caros(self) -> tuple[float, float]:
+        """
+        Devuelve el mínimo y el máximo que pueden sumar a la evaluación los términos de movilidad,
+        seguridad del rey y control del centro, ya multiplicados por sus pesos.
+        """
+        peso_movilidad = abs(float(self._pesos.get("movilidad", 0.05)))
+        peso_seguridad = float(self._pesos.get("seguridad_rey", 0.5))
+        peso_centro = float(self._pesos.get("control_centro", 0.1))
+        movilidad_maxima = float(self._pesos.get("max_movilidad", 40.0)) or 1.0
+
+        # Movilidad: la diferencia de movimientos legales está acotada por el máximo de una posición
+        cota_movilidad = peso_movilidad * MAX_MOVIMIENTOS_LEGALES / abs(movilidad_maxima)
+        # Seguridad del rey: como mucho todos los peones escudo y, como poco, todas las piezas rivales
+        # atacando la zona del rey con el rey en el centro. El término se multiplica dos veces por su peso.
+        atacantes_maximos = self._tablero.ocupacion[indice_color(self._color.opuesto())].bit_count()
+        seguridad_maxima = MAX_PEONES_ESCUDO * BONO_PEON_ESCUDO
+        seguridad_minima = -atacantes_maximos * PENALIZACION_ATACANTE - PENALIZACION_REY_CENTRAL
+        extremos_seguridad = (seguridad_maxima * peso_seguridad * peso_seguridad,
+                              seguridad_minima * peso_seguridad * peso_seguridad)
+        # Control del centro: diferencia normalizada entre -1 y 1, multiplicada dos veces por su peso
+        cota_centro = abs(peso_centro * peso_centro)
+
+        minimo = -cota_movilidad + min(extremos_seguridad) - cota_centro
+        maximo = cota_movilidad + max(extremos_seguridad) + cota_centro
+        return minimo, maximo
     
     def evaluar_material(self) -> float:
         """
-        Calcula la diferencia de material entre el color evaluado y el oponente.
+        Calcula la diferencia de material entre el color evaluado y el oponente. El tablero mantiene el
+        material de cada color al colocar, quitar y mover piezas, por lo que no hace falta recorrerlas.
         """
-        color_propio = self._color
-        color_oponente = Color.BLANCA if self._color == Color.NEGRA else Color.NEGRA
-
-        piezas_propias = self._tablero.listar_piezas_por_color(color_propio)
-        piezas_oponente = self._tablero.listar_piezas_por_color(color_oponente)
+        material = self._tablero.material
+        propio = indice_color(self._color)
+        return float(material[propio] - material[propio ^ 1])
 
-        valor_propio = 0
-        for pieza_propia in piezas_propias:
-            valor_propio += pieza_propia.valor_relativo
-
-        valor_oponente = 0
-        for pieza_oponente in piezas_oponente:
-            valor_oponente += pieza_oponente.valor_relativo
-        
-        return float(valor_propio - valor_oponente)
+    def evaluar_posicional(self) -> float:
+        """
+        Calcula la diferencia de puntuación de las tablas posicionales (en peones) entre el color evaluado
+        y el oponente. Como el material, el tablero la actualiza de forma incremental.
+        """
+        puntuacion = self._tablero.puntuacion_posicional
+        propio = indice_color(self._color)
+        return (puntuacion[propio] - puntuacion[propio ^ 1]) / 100.0
 
     def evaluar_movilidad(self) -> float:
         """
@@ -115,16 +237,11 @@ class Evaluador:
         """
         peso = float(self._pesos.get("estructura_peones", 0.2))
 
-        color_propio = self._color
-        color_oponente = Color.BLANCA if color_propio == Color.NEGRA else Color.NEGRA
-
-        # Obtener diccionarios columna -> [filas]
-        peones_propios = self._peones_por_columna(color_propio)
-        peones_oponente = self._peones_por_columna(color_oponente)
-
-        cantidad_peones_aislados_propios = self._contar_peones_aislados(peones_propios)
-        cantidad_peones_doblados_propios = self._contar_peones_doblados(peones_propios)
-        cantidad_peones_pasados_propios = self._contar_peones_pasados(peones_propios, peones_oponente, color_propio)
+        # Recuentos de la estructura de peones, guardados en la tabla de peones
+        recuentos = self._recuentos_peones()[indice_color(self._color)]
+        cantidad_peones_aislados_propios = recuentos[AISLADOS]
+        cantidad_peones_doblados_propios = recuentos[DOBLADOS]
+        cantidad_peones_pasados_propios = recuentos[PASADOS]
 
         # Coeficientes
         penalizacion_aislado = 0.5
@@ -156,19 +273,19 @@ class Evaluador:
         fila_rey, columna_rey = int(pos_rey[0]), int(pos_rey[1])
 
         # Penalización por exposición en el centro del tablero
-        penalizacion_central = 0.5 if (2 <= fila_rey <= dim - 3 and 2 <= columna_rey <= dim - 3) else 0.0
+        penalizacion_central = PENALIZACION_REY_CENTRAL if (2 <= fila_rey <= dim - 3 and 2 <= columna_rey <= dim - 3) else 0.0
 
         # Casillas críticas: casillas del rey + adyacentes
         casillas_criticas = self._casillas_criticas_rey(pos_rey, dim)
 
         # Shields: peones propios adyacentes que protegen al rey
         shields_contador = self._contar_shields(pos_rey, casillas_criticas)
-        shield_bonus = shields_contador * 0.25  # Cada peón escudo aporta este bono
+        shield_bonus = shields_contador * BONO_PEON_ESCUDO  # Cada peón escudo aporta este bono
 
         # Atacantes enemigos a las casillas críticas
         color_oponente = Color.BLANCA if self._color == Color.NEGRA else Color.NEGRA
         contador_atacante = self._contar_atacantes_casillas(casillas_criticas, color_oponente)
-        penalizacion_atacante = contador_atacante * 0.6
+        penalizacion_atacante = contador_atacante * PENALIZACION_ATACANTE
 
         # Combinar factores
         puntuacion = shield_bonus - penalizacion_atacante - penalizacion_central
@@ -200,6 +317,15 @@ class Evaluador:
         return puntuacion * peso
 
         
+    def mapa_ataques(self) -> MapaAtaques:
+        """
+        Devuelve el mapa de ataques y movilidad de la posición actual. Se calcula una vez por posición
+        y lo comparten todos los términos de la evaluación.
+        """
+        if self._mapa is None or self._mapa.clave_hash != self._tablero.clave_hash:
+            self._mapa = MapaAtaques(self._tablero, self._reglas)
+        return self._mapa
+
     def _centros_tablero(self, dim: int) -> list:
         """
         Devuelve la lista de coordenadas que se consideran centrales en un tablero de dimension genérica.
@@ -227,7 +353,7 @@ class Evaluador:
     def _casilla_controlada_por(self, casilla: tuple[int, int], color: Color) -> bool:
         """
         Devuelve True si la casila está ocupada por el color a evaluar o si alguna pieza del color 
-        a evaluar puede legalmente mover/atacar allí.
+        a evaluar puede legalmente mover/atacar allí (según el mapa de ataques de la posición).
         """
         fila, columna = casilla
         # Validación de los límites
@@ -240,22 +366,13 @@ class Evaluador:
             return True
         
         # Comprobar si alguna pieza del color puede mover a la casilla
-        for pieza in self._tablero.listar_piezas_por_color(color):
-            try:
-                if self._reglas.es_movimiento_legal(pieza, array('i', [fila, columna])):
-                    return True
-            # Ignorar comprobaciones que fallen y continuar con otras piezas
-            except IndexError:
-                continue
-
-        return False
+        return bool(self.mapa_ataques().alcance_legal(color) >> (fila * dim + columna) & 1)
 
     def _contar_movimientos(self, color: Color) -> int:
         """
         Cuenta cuántos movimientos legales del color dado hay.
         """
-        generador = Generador_movimientos(self._tablero, self._reglas, color)
-        return generador.contar_movimientos_legales()
+        return self.mapa_ataques().movilidad[indice_color(color)]
     
     def _contar_shields(self, posicion_rey: tuple[int, int], casillas_criticas: list) -> int:
         """
@@ -283,18 +400,10 @@ class Evaluador:
         """
         Cuenta atacantes únicos del conjunto de casillas críticas por parte del color oponente.
         """
-        atacantes = set()
-        piezas_enemigas = self._tablero.listar_piezas_por_color(color_oponente)
-        for pieza in piezas_enemigas:
-            for destino in casillas_criticas:
-                try:
-                    if self._reglas.es_movimiento_legal(pieza, destino):
-                        atacantes.add(id(pieza))  # identificar pieza por id
-                        break
-                # Si reglas falla para una comprobación concreta, ignorarla y continuar
-                except Exception:
-                    continue
-        return len(atacantes)
+        zona = 0
+        for destino in casillas_criticas:
+            zona |= 1 << casilla(int(destino[0]), int(destino[1]))
+        return self.mapa_ataques().contar_atacantes_zona(zona, color_oponente)
 
     def _casillas_criticas_rey(self, posicion_rey: tuple[int, int], dim: int) ->list:
         """
@@ -316,22 +425,36 @@ class Evaluador:
         
         return casillas
     
+    def _recuentos_peones(self) -> list:
+        """
+        Devuelve los recuentos [aislados, doblados, pasados] de cada color para la estructura de peones
+        actual. Se buscan primero en la tabla de peones por la clave de peones del tablero y solo se
+        calculan si no están.
+        """
+        clave = self._tablero.clave_peones
+        recuentos = self._tabla_peones.buscar(clave)
+        if recuentos is None:
+            recuentos = [[0] * NUM_RECUENTOS for _ in range(2)]
+            for color in (Color.BLANCA, Color.NEGRA):
+                # Obtener diccionarios columna -> [filas]
+                peones_propios = self._peones_por_columna(color)
+                peones_oponente = self._peones_por_columna(color.opuesto())
+                recuentos_color = recuentos[indice_color(color)]
+                recuentos_color[AISLADOS] = self._contar_peones_aislados(peones_propios)
+                recuentos_color[DOBLADOS] = self._contar_peones_doblados(peones_propios)
+                recuentos_color[PASADOS] = self._contar_peones_pasados(peones_propios, peones_oponente, color)
+            self._tabla_peones.guardar(clave, recuentos)
+        return recuentos
+
     def _peones_por_columna(self, color: Color) -> dict:
+        """
+        Devuelve columna -> filas de los peones del color, recorriendo su bitboard de peones.
+        """
         columnas: dict[int, list[int]] = {}
-        for pieza in self._tablero.listar_piezas_por_color(color):
-            # Solo consideramos los peones
-            if not isinstance(pieza, Peon):
-                continue
-
-            posicion = pieza.posicion_actual_entera
-            if posicion is None:
-                # Si la pieza no tiene posición saltamos la iteración
-                continue
-            fila, columna = int(posicion[0]), int(posicion[1])
-            # Añadir la fila a la lista de la columna correspondiente
-            columnas.setdefault(columna, []).append(fila)
+        for indice in iterar_casillas(self._tablero.bitboards[indice_color(color)][PEON]):
+            columnas.setdefault(indice & 7, []).append(indice >> 3)
         return columnas
-        
+
     def _contar_peones_doblados(self, columnas_propias: dict) -> int:
         """
         Número de peones doblados (peones extras en la misma columna).
@@ -1,16 +1,28 @@
 from array import array
 
+import ataques
+from bitboards import (ALFIL, BLANCAS, CABALLO, DAMA, PEON, REY, TABLERO_COMPLETO, TORRE,
+                       COLORES, casilla_menos_significativa, indice_color, iterar_casillas)
+from movimiento import (AL_PASO, CORONACION, ENROQUE, PIEZAS_CORONACION, casilla_destino, casilla_origen,
+                        codificar_movimiento, movimiento_desde_casillas, nueva_lista_movimientos,
+                        pieza_coronacion)
 from tablero import Tablero
 from color import Color
 from piezas import *
 from reglas import Reglas
 
+# Fila a la que corona un peón de cada color (indexado por BLANCAS/NEGRAS)
+FILAS_CORONACION = (0xFF << 56, 0xFF)
+
 class Generador_movimientos:
     
     def __init__(self, tablero: Tablero, reglas: Reglas, color: Color):
         self._tablero = tablero
         self._reglas = reglas
         self._color_actual = color
+        self._propio = indice_color(color)      # Índice del color actual en los bitboards
+        # Restricciones del color actual; cada generador corresponde a una posición, así que se calculan una vez
+        self._restricciones = None
 
     def generar_movimiento_para_pieza(self, pieza: Pieza) -> list:
         """
@@ -18,29 +30,283 @@ class Generador_movimientos:
         Returns:
             list[array]: Lista de destinos legales (array de dos enteros [fila, columna]).
         """
-        movimientos_pieza = []
-        for fila in range(self._tablero.DIM_TABLERO):
-            for columna in range(self._tablero.DIM_TABLERO):
-                destino = array('i', [fila, columna])
-                if self.es_movimiento_legal(pieza, destino):
-                    movimientos_pieza.append(destino)
-        return movimientos_pieza
+        # Filtro previo barato: si la pieza no alcanza ninguna casilla (ni la de captura al paso) no tiene
+        # movimientos legales, y no hace falta calcular jaques ni clavadas. El enroque necesita libre la
+        # casilla contigua al rey, que ya sería alcanzable.
+        alcanzables = pieza.generar_destinos(self._tablero)
+        if pieza.TIPO == PEON:
+            alcanzables |= ataques.ATAQUES_PEON[pieza.codigo_color][pieza.casilla] & self._bit_al_paso()
+        if not alcanzables:
+            return []
+        restricciones = self._calcular_restricciones(pieza.codigo_color)
+        destinos = self._destinos_legales(pieza.casilla, pieza.TIPO, pieza.codigo_color, restricciones)
+        return [array('i', [destino >> 3, destino & 7]) for destino in iterar_casillas(destinos)]
     
     def generar_movimientos_legales(self) -> list:
         """
         Genera todos los posibles movimientos legales posibles para el color actual en el tablero.
+        Los jaques y las clavadas se calculan una sola vez por posición, de modo que no hace falta
+        simular ningún movimiento.
         Returns:
             list[tuple[Pieza, array]]: Lista de tuplas donde cada tupla es una pieza y su destino.
         """
         movimientos_legales: list = []
-        piezas_color: list[Pieza] = self._tablero.listar_piezas_por_color(self._color_actual)
-        # Recorre todas las piezas de color del tablero
-        for pieza in piezas_color:
-            for destino in self.generar_movimiento_para_pieza(pieza):
-                    # Si el movimiento es valido lo agrega a la lista de movimientos válidos
-                    movimientos_legales.append((pieza, destino))
+        for _, origen, destinos in self._destinos_por_pieza():
+            pieza = self._tablero.pieza_en(origen >> 3, origen & 7)
+            for destino in iterar_casillas(destinos):
+                movimientos_legales.append((pieza, array('i', [destino >> 3, destino & 7])))
         return movimientos_legales
 
+    def generar_movimientos_codificados(self, lista: array = None) -> array:
+        """
+        Genera los movimientos legales del color actual codificados en 16 bits (ver movimiento.py), con
+        cada coronación expandida en las cuatro piezas posibles empezando por la dama.
+        Args:
+            lista (array): Lista array('H') que se vacía y se rellena, para reutilizarla entre llamadas.
+        Returns:
+            array: La lista de movimientos codificados.
+        """
+        return self._codificar_movimientos(self._destinos_por_pieza(), lista)
+
+    def generar_capturas_codificadas(self, lista: array = None) -> array:
+        """
+        Genera solo las capturas legales (incluidas las capturas al paso) y las coronaciones del color
+        actual, codificadas como en generar_movimientos_codificados. Las máscaras de destino se aplican
+        antes de recorrer las casillas, así que no se enumera ningún movimiento tranquilo.
+        Args:
+            lista (array): Lista array('H') que se vacía y se rellena, para reutilizarla entre llamadas.
+        Returns:
+            array: La lista de movimientos codificados.
+        """
+        capturas = self._tablero.ocupacion[self._propio ^ 1]
+        destinos_por_pieza = self._destinos_por_pieza(
+            capturas, capturas | FILAS_CORONACION[self._propio] | self._bit_al_paso())
+        return self._codificar_movimientos(destinos_por_pieza, lista)
+
+    def generar_tranquilos_codificados(self, lista: array = None) -> array:
+        """
+        Genera los movimientos legales que faltan en generar_capturas_codificadas: los que van a una casilla
+        libre sin coronar ni capturar al paso, incluidos los enroques. Entre las dos listas están todos los
+        movimientos legales, cada uno una sola vez.
+        Args:
+            lista (array): Lista array('H') que se vacía y se rellena, para reutilizarla entre llamadas.
+        Returns:
+            array: La lista de movimientos codificados.
+        """
+        libres = ~self._tablero.ocupacion_total & TABLERO_COMPLETO
+        destinos_por_pieza = self._destinos_por_pieza(
+            libres, libres & ~FILAS_CORONACION[self._propio] & ~self._bit_al_paso())
+        return self._codificar_movimientos(destinos_por_pieza, lista)
+
+    def es_legal_codificado(self, movimiento: int) -> bool:
+        """
+        Comprueba si un movimiento codificado (por ejemplo, el de la tabla de transposición o un killer
+        guardado en otra posición) es legal en la posición actual sin generar el resto de movimientos.
+        """
+        origen, destino = casilla_origen(movimiento), casilla_destino(movimiento)
+        bitboards_propios = self._tablero.bitboards[self._propio]
+        for tipo in (PEON, CABALLO, ALFIL, TORRE, DAMA, REY):
+            if bitboards_propios[tipo] >> origen & 1:
+                break
+        else:
+            return False
+        destinos = self._destinos_legales(origen, tipo, self._propio, self._restricciones_propias())
+        if not destinos >> destino & 1:
+            return False
+        # Las banderas (coronación, al paso, enroque) deben coincidir con las de la posición
+        promocion = pieza_coronacion(movimiento)
+        return movimiento_desde_casillas(self._tablero, origen, destino,
+                                         promocion if promocion is not None else DAMA) == movimiento
+
+    def _codificar_movimientos(self, destinos_por_pieza, lista: array = None) -> array:
+        """
+        Codifica en la lista los movimientos de las tuplas (tipo, origen, destinos) de _destinos_por_pieza.
+        """
+        if lista is None:
+            lista = nueva_lista_movimientos()
+        else:
+            del lista[:]
+        ultima_fila = 7 if self._propio == BLANCAS else 0
+        al_paso = self._tablero.casilla_al_paso
+        casilla_al_paso = al_paso[0] * 8 + al_paso[1] if al_paso is not None else None
+        for tipo, origen, destinos in destinos_por_pieza:
+            for destino in iterar_casillas(destinos):
+                if tipo == PEON:
+                    if destino >> 3 == ultima_fila:
+                        for promocion in PIEZAS_CORONACION:
+                            lista.append(codificar_movimiento(origen, destino, CORONACION, promocion))
+                        continue
+                    if destino == casilla_al_paso and (origen ^ destino) & 7:
+                        lista.append(codificar_movimiento(origen, destino, AL_PASO))
+                        continue
+                elif tipo == REY and abs(destino - origen) == 2:
+                    lista.append(codificar_movimiento(origen, destino, ENROQUE))
+                    continue
+                lista.append(origen | destino << 6)                   # Movimiento NORMAL
+        return lista
+
+    def tiene_movimientos_legales(self) -> bool:
+        """
+        Devuelve True en cuanto encuentra un movimiento legal del color actual, sin generar el resto.
+        Se prueban primero las piezas más baratas de comprobar y el rey al final, ya que sus casillas
+        de destino requieren comprobar ataques.
+        """
+        restricciones = self._restricciones_propias()
+        bitboards_propios = self._tablero.bitboards[self._propio]
+        for tipo in (CABALLO, ALFIL, TORRE, DAMA, PEON, REY):
+            for origen in iterar_casillas(bitboards_propios[tipo]):
+                if self._destinos_legales(origen, tipo, self._propio, restricciones):
+                    return True
+        return False
+
+    def destinos_legales_por_casilla(self) -> dict:
+        """
+        Devuelve los destinos legales de cada pieza del color actual que puede moverse.
+        Returns:
+            dict[int, int]: Casilla de origen (fila * 8 + columna) -> bitboard de destinos legales.
+        """
+        return {origen: destinos for _, origen, destinos in self._destinos_por_pieza()}
+
+    def _destinos_por_pieza(self, objetivos: int = TABLERO_COMPLETO, objetivos_peon: int = None):
+        """
+        Recorre las piezas del color actual devolviendo tuplas (tipo, casilla de origen, bitboard de destinos legales).
+        Args:
+            objetivos (int): Bitboard al que se limitan los destinos, incluidos los enroques.
+            objetivos_peon (int): Bitboard al que se limitan los destinos de los peones (por defecto objetivos),
+                incluida la captura al paso.
+        """
+        restricciones = self._restricciones_propias()
+        bitboards_propios = self._tablero.bitboards[self._propio]
+        if objetivos_peon is None:
+            objetivos_peon = objetivos
+        for tipo in (PEON, CABALLO, ALFIL, TORRE, DAMA, REY):
+            objetivos_tipo = objetivos_peon if tipo == PEON else objetivos
+            for origen in iterar_casillas(bitboards_propios[tipo]):
+                destinos = self._destinos_legales(origen, tipo, self._propio, restricciones, objetivos_tipo)
+                if destinos:
+                    yield tipo, origen, destinos
+
+    def _restricciones_propias(self) -> tuple:
+        """
+        Devuelve las restricciones del color actual, calculándolas la primera vez.
+        """
+        if self._restricciones is None:
+            self._restricciones = self._calcular_restricciones(self._propio)
+        return self._restricciones
+
+    def _bit_al_paso(self) -> int:
+        """
+        Devuelve el bitboard de la casilla de captura al paso (0 si no hay).
+        """
+        al_paso = self._tablero.casilla_al_paso
+        return 1 << (al_paso[0] * 8 + al_paso[1]) if al_paso is not None else 0
+
+    def _calcular_restricciones(self, propio: int) -> tuple:
+        """
+        Calcula una vez por posición la información que limita los movimientos legales del color:
+        - casilla del rey (None si no hay rey),
+        - bitboard de las piezas que dan jaque,
+        - máscara de evasión: casillas a las que deben ir las piezas distintas del rey (todo el tablero
+          sin jaque, la pieza que da jaque y las casillas intermedias con jaque simple, vacía con jaque doble),
+        - diccionario casilla de pieza clavada -> rayo por el que puede moverse.
+        """
+        rival = propio ^ 1
+        bitboards = self._tablero.bitboards
+        ocupacion = self._tablero.ocupacion_total
+        if not bitboards[propio][REY]:
+            return None, 0, TABLERO_COMPLETO, {}
+        casilla_rey = casilla_menos_significativa(bitboards[propio][REY])
+
+        # Jaques
+        jaques = ataques.atacantes(bitboards, casilla_rey, rival, ocupacion)
+        if not jaques:
+            mascara_evasion = TABLERO_COMPLETO
+        elif jaques & (jaques - 1):
+            mascara_evasion = 0                                           # Jaque doble: solo puede mover el rey
+        else:
+            mascara_evasion = jaques | ataques.ENTRE[casilla_rey][casilla_menos_significativa(jaques)]
+
+        # Clavadas: piezas deslizantes rivales que verían al rey si no hubiera piezas propias en medio
+        piezas_rivales = bitboards[rival]
+        ocupacion_rival = self._tablero.ocupacion[rival]
+        clavadoras = ((ataques.ataques_torre(casilla_rey, ocupacion_rival) & (piezas_rivales[TORRE] | piezas_rivales[DAMA]))
+                      | (ataques.ataques_alfil(casilla_rey, ocupacion_rival) & (piezas_rivales[ALFIL] | piezas_rivales[DAMA])))
+        clavadas = {}
+        for clavadora in iterar_casillas(clavadoras):
+            entre = ataques.ENTRE[casilla_rey][clavadora]
+            bloqueadores = entre & ocupacion
+            # Solo hay clavada si entre el rey y la pieza rival hay exactamente una pieza y es propia
+            if bloqueadores and not bloqueadores & (bloqueadores - 1) and bloqueadores & self._tablero.ocupacion[propio]:
+                clavadas[casilla_menos_significativa(bloqueadores)] = entre | (1 << clavadora)
+
+        return casilla_rey, jaques, mascara_evasion, clavadas
+
+    def _destinos_legales(self, origen: int, tipo: int, propio: int, restricciones: tuple,
+                          objetivos: int = TABLERO_COMPLETO) -> int:
+        """
+        Devuelve el bitboard de destinos legales de la pieza del tipo dado situada en la casilla de origen,
+        limitado a los objetivos.
+        """
+        casilla_rey, jaques, mascara_evasion, clavadas = restricciones
+        if tipo == REY:
+            return self._destinos_rey(origen, propio, jaques, objetivos)
+
+        ocupacion = self._tablero.ocupacion
+        destinos = ataques.destinos_pieza(tipo, propio, origen, ocupacion[propio], ocupacion[propio ^ 1])
+        destinos &= mascara_evasion & objetivos
+        if origen in clavadas:
+            destinos &= clavadas[origen]
+
+        # La captura al paso no encaja en las máscaras (la pieza capturada no está en el destino)
+        if tipo == PEON and self._tablero.casilla_al_paso is not None:
+            peon = self._tablero.pieza_en(origen >> 3, origen & 7)
+            if self._reglas.puede_capturar_al_paso(peon):
+                fila_captura, columna_captura = self._tablero.casilla_al_paso
+                destino = fila_captura * 8 + columna_captura
+                if objetivos >> destino & 1 and self._captura_al_paso_legal(origen, destino, propio, casilla_rey, jaques):
+                    destinos |= 1 << destino
+        return destinos
+
+    def _destinos_rey(self, origen: int, propio: int, jaques: int, objetivos: int = TABLERO_COMPLETO) -> int:
+        """
+        Casillas a las que puede ir el rey sin quedar atacado, más los enroques permitidos, dentro de los objetivos.
+        """
+        rival = propio ^ 1
+        bitboards = self._tablero.bitboards
+        # El rey no debe bloquear los rayos que lo atacan al alejarse de ellos
+        ocupacion_sin_rey = self._tablero.ocupacion_total ^ (1 << origen)
+        destinos = 0
+        for destino in iterar_casillas(ataques.ATAQUES_REY[origen] & ~self._tablero.ocupacion[propio] & objetivos):
+            if not ataques.casilla_atacada(bitboards, destino, rival, ocupacion_sin_rey):
+                destinos |= 1 << destino
+
+        if not jaques and origen >= 2:        # Solo se enroca desde la columna e
+            color = COLORES[propio]
+            if objetivos >> (origen + 2) & 1 and self._reglas.puede_enrocar(color, "corto"):
+                destinos |= 1 << (origen + 2)
+            if objetivos >> (origen - 2) & 1 and self._reglas.puede_enrocar(color, "largo"):
+                destinos |= 1 << (origen - 2)
+        return destinos
+
+    def _captura_al_paso_legal(self, origen: int, destino: int, propio: int, casilla_rey, jaques: int) -> bool:
+        """
+        Comprueba con bitboards que la captura al paso no deja al rey en jaque. Desaparecen dos peones
+        de la misma fila, por lo que se recalculan los rayos de las piezas deslizantes rivales.
+        """
+        if casilla_rey is None:
+            return True
+        capturado = (origen & ~7) | (destino & 7)
+        piezas_rivales = self._tablero.bitboards[propio ^ 1]
+        # Un jaque de caballo o de otro peón no se resuelve con la captura al paso
+        if jaques & ~(1 << capturado) & (piezas_rivales[CABALLO] | piezas_rivales[PEON]):
+            return False
+        ocupacion = (self._tablero.ocupacion_total ^ (1 << origen) ^ (1 << capturado)) | (1 << destino)
+        if ataques.ataques_torre(casilla_rey, ocupacion) & (piezas_rivales[TORRE] | piezas_rivales[DAMA]):
+            return False
+        if ataques.ataques_alfil(casilla_rey, ocupacion) & (piezas_rivales[ALFIL] | piezas_rivales[DAMA]):
+            return False
+        return True
+
     def es_movimiento_legal(self, pieza: Pieza, destino: array) -> bool:
         """
         Devuelte Trie si el movimiento es legal según las relgas de ajedrez.
@@ -51,18 +317,18 @@ class Generador_movimientos:
         """
         Genera todos los movimientos legales que son posibles capturas para el color actual.
         Returns:
-            list[tuple[Pieza, array]]: Lista de tuplas (pieza, destino) que son capturas.
+            list[tuple[Pieza, array]]: Lista de tuplas (pieza, destino) que son capturas, incluidas las capturas al paso.
         """
         capturas = []
-        for pieza, destino in self.generar_movimientos_legales():
-            pieza_en_destino: Pieza = self._tablero.matriz_piezas[destino[0]][destino[1]]
-            if pieza_en_destino and pieza_en_destino.color != self._color_actual:
-                capturas.append((pieza, destino))
-        
+        rivales = self._tablero.ocupacion[self._propio ^ 1]
+        for _, origen, destinos in self._destinos_por_pieza(rivales, rivales | self._bit_al_paso()):
+            pieza = self._tablero.pieza_en(origen >> 3, origen & 7)
+            for destino in iterar_casillas(destinos):
+                capturas.append((pieza, array('i', [destino >> 3, destino & 7])))
         return capturas
     
     def contar_movimientos_legales(self) -> int:
         """
         Cuenta todos los movimientos legales del color en el tablero.
         """
-        return len(self.generar_movimientos_legales())
\ No newline at end of file
+        return sum(destinos.bit_count() for _, _, destinos in self._destinos_por_pieza())
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+Evaluación estática de intercambios (SEE): material que gana, en peones, el bando que hace una captura
+si ambos bandos siguen capturando en la casilla de destino, siempre con su pieza de menor valor y solo
+mientras les convenga. Las piezas deslizantes que quedan detrás de otras (rayos X) aparecen al
+recalcular los atacantes con la ocupación actualizada, sin tocar el tablero.
+"""
+from typing import TYPE_CHECKING
+
+import ataques
+from bitboards import BLANCAS, NEGRAS, NUM_TIPOS, PEON, REY
+from color import Color
+from movimiento import AL_PASO, CORONACION, casilla_destino, casilla_origen, pieza_coronacion, tipo_movimiento
+from tablero import TIPO_POR_CLASE
+
+if TYPE_CHECKING:
+    from tablero import Tablero
+
+VALOR_REY = 100     # El rey solo captura si no lo pueden recapturar: su valor debe superar cualquier intercambio
+
+# Valor de cada tipo de pieza (índices de bitboards), tomado de valor_relativo
+VALORES_PIEZAS = [0] * NUM_TIPOS
+for _clase, _tipo in TIPO_POR_CLASE.items():
+    VALORES_PIEZAS[_tipo] = _clase(Color.BLANCA).valor_relativo
+VALORES_PIEZAS[REY] = VALOR_REY
+VALORES_PIEZAS = tuple(VALORES_PIEZAS)
+
+
+def _tipo_en(piezas: list, mascara: int):
+    """
+    Devuelve el tipo de la pieza de piezas ([tipo] -> bitboard de un color) en la casilla de la máscara, o None.
+    """
+    for tipo in range(NUM_TIPOS):
+        if piezas[tipo] & mascara:
+            return tipo
+    return None
+
+
+def evaluar_intercambio(tablero: "Tablero", movimiento: int) -> int:
+    """
+    Devuelve la ganancia de material (en peones) del movimiento tras la secuencia de recapturas en su
+    casilla de destino. Un movimiento que no captura vale 0 salvo que sea una coronación o que la pieza
+    quede en una casilla atacada en la que se pierde.
+    Args:
+        tablero (Tablero): Posición antes del movimiento.
+        movimiento (int): Movimiento codificado (ver movimiento.py).
+    Returns:
+        int: Ganancia para el bando que mueve; negativa si el intercambio pierde material.
+    """
+    origen, destino = casilla_origen(movimiento), casilla_destino(movimiento)
+    bitboards = tablero.bitboards
+    mascara_origen = 1 << origen
+    lado = BLANCAS if tablero.ocupacion[BLANCAS] & mascara_origen else NEGRAS
+    ocupacion = tablero.ocupacion_total ^ mascara_origen
+    tipo = tipo_movimiento(movimiento)
+
+    if tipo == AL_PASO:
+        ganancia = VALORES_PIEZAS[PEON]
+        ocupacion ^= 1 << ((origen & ~7) | (destino & 7))
+    else:
+        capturada = _tipo_en(bitboards[lado ^ 1], 1 << destino)
+        ganancia = VALORES_PIEZAS[capturada] if capturada is not None else 0
+    valor_en_destino = VALORES_PIEZAS[_tipo_en(bitboards[lado], mascara_origen)]
+    if tipo == CORONACION:
+        promocion = VALORES_PIEZAS[pieza_coronacion(movimiento)]
+        ganancia += promocion - VALORES_PIEZAS[PEON]
+        valor_en_destino = promocion
+
+    # ganancias[i]: material del bando que hace la captura i si el rival no recaptura
+    ganancias = [ganancia]
+    while True:
+        siguiente = valor_en_destino - ganancias[-1]
+        # Ninguno de los dos bandos cambia su decisión aunque el intercambio continúe
+        if max(-ganancias[-1], siguiente) < 0:
+            break
+        lado ^= 1
+        atacantes = ataques.atacantes(bitboards, destino, lado, ocupacion) & ocupacion
+        if not atacantes:
+            break
+        piezas_lado = bitboards[lado]
+        for tipo_atacante in range(NUM_TIPOS):
+            candidatos = atacantes & piezas_lado[tipo_atacante]
+            if candidatos:
+                break
+        ganancias.append(siguiente)
+        valor_en_destino = VALORES_PIEZAS[tipo_atacante]
+        ocupacion ^= candidatos & -candidatos
+
+    # Cada bando puede dejar de capturar: se resuelve desde la última captura hacia atrás
+    for indice in range(len(ganancias) - 1, 0, -1):
+        ganancias[indice - 1] = -max(-ganancias[indice - 1], ganancias[indice])
+    return ganancias[0]
@@ -1,9 +1,28 @@
 from tablero import Tablero
 from reglas import Reglas
 from generador_movimiento import Generador_movimientos
+from busqueda import Buscador, ResultadoBusqueda
+from movimiento import notacion_movimiento
 from utils import config
 import piezas
 
 
-def main_engine():
-    pass
\ No newline at end of file
+def main_engine(tablero: Tablero = None, profundidad_maxima: int = 3, limite_nodos: int = None,
+                limite_tiempo: float = None) -> ResultadoBusqueda:
+    """
+    Busca el mejor movimiento para el color al que le toca mover en el tablero dado (la posición
+    inicial si no se indica ninguno) y muestra el resultado de la búsqueda.
+    """
+    tablero = tablero if tablero is not None else Tablero()
+    buscador = Buscador(tablero, Reglas(tablero))
+    resultado = buscador.buscar(profundidad_maxima, limite_nodos, limite_tiempo)
+    mejor_movimiento = notacion_movimiento(resultado.mejor_movimiento) if resultado.mejor_movimiento is not None else None
+    print(f"Mejor movimiento: {mejor_movimiento}  puntuación: {resultado.puntuacion:.3f}  "
+          f"profundidad: {resultado.profundidad}  nodos: {resultado.nodos}  "
+          f"nodos/s: {resultado.nodos_por_segundo:.0f}")
+    print(f"Variante principal: {' '.join(notacion_movimiento(codigo) for codigo in resultado.variante_principal)}")
+    return resultado
+
+
+if __name__ == "__main__":
+    main_engine()
@@ -0,0 +1,93 @@
+"""
+Mapa de ataques y movilidad de una posición. Se calcula una sola vez por posición y lo comparten
+todos los términos del Evaluador, que antes repetían por su cuenta la generación de movimientos y
+las comprobaciones de legalidad casilla a casilla.
+"""
+import ataques
+from bitboards import BLANCAS, NEGRAS, NUM_TIPOS, indice_color, iterar_casillas
+from color import Color
+from generador_movimiento import Generador_movimientos
+from reglas import Reglas
+from tablero import Tablero
+
+
+class MapaAtaques:
+    """
+    Para cada color (índices BLANCAS y NEGRAS) guarda:
+    - ataques_por_pieza: casilla de la pieza -> bitboard de casillas que ataca,
+    - destinos_legales: casilla de la pieza -> bitboard de destinos legales,
+    - movilidad: número total de movimientos legales.
+    La unión de casillas atacadas y el número de atacantes por casilla se derivan de ataques_por_pieza
+    solo cuando algún término los pide (ataques y atacantes_por_casilla).
+    """
+
+    def __init__(self, tablero: Tablero, reglas: Reglas):
+        self.clave_hash = tablero.clave_hash
+        self.ataques_por_pieza: list[dict] = [{}, {}]
+        self._atacantes_por_casilla: list = [None, None]
+        self.destinos_legales: list[dict] = [{}, {}]
+        self.movilidad: list[int] = [0, 0]
+
+        bitboards = tablero.bitboards
+        ocupacion = tablero.ocupacion_total
+        for color in (Color.BLANCA, Color.NEGRA):
+            indice = indice_color(color)
+            ataques_por_pieza = self.ataques_por_pieza[indice]
+            for tipo in range(NUM_TIPOS):
+                for origen in iterar_casillas(bitboards[indice][tipo]):
+                    ataques_por_pieza[origen] = ataques.ataques_pieza(tipo, indice, origen, ocupacion)
+
+            destinos = Generador_movimientos(tablero, reglas, color).destinos_legales_por_casilla()
+            self.destinos_legales[indice] = destinos
+            self.movilidad[indice] = sum(bitboard.bit_count() for bitboard in destinos.values())
+
+    def __repr__(self) -> str:
+        return (f"MapaAtaques (movilidad blancas={self.movilidad[BLANCAS]}, "
+                f"movilidad negras={self.movilidad[NEGRAS]})")
+
+    def ataques(self, color: Color) -> int:
+        """
+        Devuelve el bitboard de casillas atacadas por alguna pieza del color.
+        """
+        union = 0
+        for atacadas in self.ataques_por_pieza[indice_color(color)].values():
+            union |= atacadas
+        return union
+
+    def atacantes_por_casilla(self, color: Color) -> list:
+        """
+        Devuelve el número de piezas del color que atacan cada casilla (lista de 64). Se calcula la
+        primera vez que se pide y se guarda.
+        """
+        indice = indice_color(color)
+        atacantes = self._atacantes_por_casilla[indice]
+        if atacantes is None:
+            atacantes = [0] * 64
+            for atacadas in self.ataques_por_pieza[indice].values():
+                for destino in iterar_casillas(atacadas):
+                    atacantes[destino] += 1
+            self._atacantes_por_casilla[indice] = atacantes
+        return atacantes
+
+    def movimientos_por_pieza(self, color: Color) -> dict:
+        """
+        Devuelve el número de movimientos legales de cada pieza del color que puede moverse.
+        Returns:
+            dict[int, int]: Casilla de la pieza -> número de movimientos legales.
+        """
+        return {origen: destinos.bit_count() for origen, destinos in self.destinos_legales[indice_color(color)].items()}
+
+    def alcance_legal(self, color: Color) -> int:
+        """
+        Devuelve el bitboard de casillas a las que alguna pieza del color puede mover legalmente.
+        """
+        alcance = 0
+        for destinos in self.destinos_legales[indice_color(color)].values():
+            alcance |= destinos
+        return alcance
+
+    def contar_atacantes_zona(self, zona: int, color: Color) -> int:
+        """
+        Cuenta las piezas distintas del color que atacan al menos una casilla de la zona (bitboard).
+        """
+        return sum(1 for atacadas in self.ataques_por_pieza[indice_color(color)].values() if atacadas & zona)
@@ -0,0 +1,171 @@
+"""
+Movimientos codificados en 16 bits, para guardarlos en listas array('H') o arrays uint16 de NumPy
+sin crear un objeto por movimiento ni depender de las piezas de un tablero concreto:
+- bits 0-5: casilla de origen (fila * 8 + columna),
+- bits 6-11: casilla de destino,
+- bits 12-13: pieza de coronación (tipo - CABALLO), solo en las coronaciones,
+- bits 14-15: tipo de movimiento (NORMAL, CORONACION, AL_PASO o ENROQUE).
+El código 0 (a1a1) no es ningún movimiento y se usa como SIN_MOVIMIENTO.
+
+Para el agente, cada movimiento tiene además un índice de acción en [0, NUM_ACCIONES): origen * 64 +
+destino para todos los movimientos salvo las coronaciones a torre, alfil o caballo, que van después
+según el sentido del avance, la columna de origen, la columna de destino y la pieza.
+"""
+from array import array
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from bitboards import ALFIL, BLANCAS, CABALLO, DAMA, NEGRAS, NUM_CASILLAS, PEON, REY, TORRE
+
+if TYPE_CHECKING:
+    from tablero import Tablero
+
+# Tipos de movimiento
+NORMAL = 0
+CORONACION = 1
+AL_PASO = 2
+ENROQUE = 3
+
+SIN_MOVIMIENTO = 0
+
+# Piezas de coronación, en el orden en que las genera el generador de movimientos
+PIEZAS_CORONACION = (DAMA, TORRE, ALFIL, CABALLO)
+_SUBPROMOCIONES = (TORRE, ALFIL, CABALLO)
+_LETRA_CORONACION = {DAMA: "q", TORRE: "r", ALFIL: "b", CABALLO: "n"}
+
+# Índices de acción: origen * 64 + destino y, después, las subpromociones por sentido (2), columna de
+# origen (8), desplazamiento de columna (3) y pieza (3)
+NUM_ACCIONES_ORIGEN_DESTINO = NUM_CASILLAS * NUM_CASILLAS
+NUM_ACCIONES = NUM_ACCIONES_ORIGEN_DESTINO + 2 * 8 * 3 * len(_SUBPROMOCIONES)
+# Bits de pieza de coronación (tipo - CABALLO) -> índice en _SUBPROMOCIONES (la dama no se usa)
+_INDICE_SUBPROMOCION = np.array([_SUBPROMOCIONES.index(tipo) if tipo in _SUBPROMOCIONES else 0
+                                 for tipo in range(CABALLO, DAMA + 1)])
+
+
+def codificar_movimiento(origen: int, destino: int, tipo: int = NORMAL, promocion: int = DAMA) -> int:
+    """
+    Codifica un movimiento. La pieza de coronación (tipo de bitboards) solo se guarda si el tipo es CORONACION.
+    """
+    if tipo == CORONACION:
+        return origen | destino << 6 | (promocion - CABALLO) << 12 | CORONACION << 14
+    return origen | destino << 6 | tipo << 14
+
+
+def casilla_origen(movimiento: int) -> int:
+    """
+    Devuelve la casilla de origen del movimiento.
+    """
+    return movimiento & 0x3F
+
+
+def casilla_destino(movimiento: int) -> int:
+    """
+    Devuelve la casilla de destino del movimiento.
+    """
+    return movimiento >> 6 & 0x3F
+
+
+def tipo_movimiento(movimiento: int) -> int:
+    """
+    Devuelve el tipo del movimiento (NORMAL, CORONACION, AL_PASO o ENROQUE).
+    """
+    return movimiento >> 14
+
+
+def pieza_coronacion(movimiento: int) -> Optional[int]:
+    """
+    Devuelve el tipo de pieza a la que se corona, o None si el movimiento no es una coronación.
+    """
+    if movimiento >> 14 != CORONACION:
+        return None
+    return (movimiento >> 12 & 3) + CABALLO
+
+
+def nueva_lista_movimientos() -> array:
+    """
+    Devuelve una lista vacía de movimientos codificados. Se puede ver como array de NumPy sin copiarla
+    con np.frombuffer(lista, dtype=np.uint16).
+    """
+    return array('H')
+
+
+def notacion_movimiento(movimiento: int) -> str:
+    """
+    Devuelve el movimiento en notación algebraica larga, por ejemplo "e2e4" o "e7e8q".
+    """
+    origen, destino = casilla_origen(movimiento), casilla_destino(movimiento)
+    texto = f"{chr(ord('a') + (origen & 7))}{(origen >> 3) + 1}{chr(ord('a') + (destino & 7))}{(destino >> 3) + 1}"
+    promocion = pieza_coronacion(movimiento)
+    return texto + _LETRA_CORONACION[promocion] if promocion is not None else texto
+
+
+def movimiento_desde_casillas(tablero: "Tablero", origen: int, destino: int, promocion: int = DAMA) -> int:
+    """
+    Codifica el movimiento de la pieza que hay en la casilla de origen, deduciendo de la posición si es
+    una coronación, una captura al paso o un enroque. No comprueba que sea legal.
+    """
+    bitboards = tablero.bitboards
+    mascara_origen = 1 << origen
+    if (bitboards[BLANCAS][PEON] | bitboards[NEGRAS][PEON]) & mascara_origen:
+        if destino >> 3 in (0, 7):
+            return codificar_movimiento(origen, destino, CORONACION, promocion)
+        al_paso = tablero.casilla_al_paso
+        if al_paso is not None and destino == al_paso[0] * 8 + al_paso[1] and (origen ^ destino) & 7:
+            return codificar_movimiento(origen, destino, AL_PASO)
+    elif (bitboards[BLANCAS][REY] | bitboards[NEGRAS][REY]) & mascara_origen and abs(destino - origen) == 2:
+        return codificar_movimiento(origen, destino, ENROQUE)
+    return codificar_movimiento(origen, destino)
+
+
+def movimiento_a_accion(movimiento: int) -> int:
+    """
+    Devuelve el índice de acción del movimiento en [0, NUM_ACCIONES).
+    """
+    origen, destino = casilla_origen(movimiento), casilla_destino(movimiento)
+    promocion = pieza_coronacion(movimiento)
+    if promocion is None or promocion == DAMA:
+        return origen * NUM_CASILLAS + destino
+    sentido = 0 if destino > origen else 1
+    desplazamiento = (destino & 7) - (origen & 7) + 1
+    return (NUM_ACCIONES_ORIGEN_DESTINO
+            + ((sentido * 8 + (origen & 7)) * 3 + desplazamiento) * len(_SUBPROMOCIONES)
+            + _SUBPROMOCIONES.index(promocion))
+
+
+def accion_a_movimiento(accion: int, tablero: "Tablero") -> int:
+    """
+    Inversa de movimiento_a_accion. El tipo de movimiento (coronación, al paso o enroque) se deduce de la posición.
+    """
+    if not 0 <= accion < NUM_ACCIONES:
+        raise ValueError(f"Error, índice de acción fuera de rango: {accion}")
+    if accion < NUM_ACCIONES_ORIGEN_DESTINO:
+        return movimiento_desde_casillas(tablero, accion // NUM_CASILLAS, accion % NUM_CASILLAS)
+    resto, pieza = divmod(accion - NUM_ACCIONES_ORIGEN_DESTINO, len(_SUBPROMOCIONES))
+    resto, desplazamiento = divmod(resto, 3)
+    sentido, columna = divmod(resto, 8)
+    origen = (48 if sentido == 0 else 8) + columna
+    destino = origen + (8 if sentido == 0 else -8) + desplazamiento - 1
+    return codificar_movimiento(origen, destino, CORONACION, _SUBPROMOCIONES[pieza])
+
+
+def movimientos_a_acciones(movimientos: array) -> np.ndarray:
+    """
+    Versión vectorizada de movimiento_a_accion para una lista de movimientos (array('H') o uint16).
+    Returns:
+        np.ndarray: Índice de acción (int64) de cada movimiento.
+    """
+    codigos = np.frombuffer(movimientos, dtype=np.uint16) if isinstance(movimientos, array) else np.asarray(movimientos)
+    codigos = codigos.astype(np.int64)
+    origen, destino = codigos & 0x3F, codigos >> 6 & 0x3F
+    acciones = origen * NUM_CASILLAS + destino
+    # Las subpromociones tienen tipo CORONACION y bits de pieza distintos de los de la dama
+    subpromocion = (codigos >> 14 == CORONACION) & ((codigos >> 12 & 3) != DAMA - CABALLO)
+    if subpromocion.any():
+        sentido = (destino < origen).astype(np.int64)
+        desplazamiento = (destino & 7) - (origen & 7) + 1
+        pieza = _INDICE_SUBPROMOCION[codigos >> 12 & 3]
+        subacciones = (NUM_ACCIONES_ORIGEN_DESTINO
+                       + ((sentido * 8 + (origen & 7)) * 3 + desplazamiento) * len(_SUBPROMOCIONES) + pieza)
+        acciones = np.where(subpromocion, subacciones, acciones)
+    return acciones
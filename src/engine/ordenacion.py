@@ -0,0 +1,187 @@
+"""
+Ordenación de movimientos para la búsqueda alfa-beta. TablasOrdenacion guarda lo aprendido durante la
+búsqueda (killers por ply, historia de tipo butterfly por color, origen y destino, y respuestas a cada
+movimiento rival) y SelectorMovimientos entrega los movimientos de una posición por etapas:
+1. el movimiento de la tabla de transposición,
+2. las capturas y coronaciones que no pierden material, por MVV-LVA,
+3. los killers y la respuesta al movimiento anterior,
+4. el resto de movimientos tranquilos, por historia,
+5. las capturas que pierden material según la evaluación de intercambios.
+Cada lista se genera solo cuando se llega a su etapa, así que un corte con el movimiento de la tabla
+o con una captura ahorra generar los movimientos tranquilos.
+"""
+from array import array
+from typing import TYPE_CHECKING
+
+from bitboards import PEON, indice_color
+from generador_movimiento import Generador_movimientos
+from intercambio import VALORES_PIEZAS, evaluar_intercambio
+from movimiento import (AL_PASO, CORONACION, SIN_MOVIMIENTO, casilla_destino, casilla_origen,
+                        nueva_lista_movimientos, pieza_coronacion, tipo_movimiento)
+
+if TYPE_CHECKING:
+    from reglas import Reglas
+    from tablero import Tablero
+
+NUM_KILLERS = 2
+MAX_HISTORIA = 1 << 20          # Cota de la historia en valor absoluto (actualización por gravedad)
+_MASCARA_CASILLAS = 0xFFF       # Bits de origen y destino de un movimiento codificado
+_RANGO_MVV = 128                # Mayor que el valor de cualquier atacante, para que mande la víctima
+
+
+def es_tranquilo(tablero: "Tablero", movimiento: int) -> bool:
+    """
+    Devuelve True si el movimiento no captura ni corona (los enroques son tranquilos).
+    """
+    tipo = tipo_movimiento(movimiento)
+    if tipo == CORONACION or tipo == AL_PASO:
+        return False
+    return not tablero.ocupacion_total >> casilla_destino(movimiento) & 1
+
+
+def valores_captura(tablero: "Tablero", movimiento: int) -> tuple[int, int]:
+    """
+    Devuelve (valor ganado, valor del atacante) de una captura o coronación. El valor ganado es el de la
+    pieza capturada más lo que gana la pieza de coronación sobre el peón.
+    """
+    origen, destino = casilla_origen(movimiento), casilla_destino(movimiento)
+    atacante = tablero.pieza_en(origen >> 3, origen & 7)
+    victima = tablero.pieza_en(destino >> 3, destino & 7)
+    ganado = VALORES_PIEZAS[victima.TIPO] if victima is not None else 0
+    if tipo_movimiento(movimiento) == AL_PASO:
+        ganado = VALORES_PIEZAS[PEON]
+    promocion = pieza_coronacion(movimiento)
+    if promocion is not None:
+        ganado += VALORES_PIEZAS[promocion] - VALORES_PIEZAS[PEON]
+    return ganado, VALORES_PIEZAS[atacante.TIPO]
+
+
+class TablasOrdenacion:
+    """
+    Killers, historia y respuestas que se actualizan en cada corte beta de la búsqueda.
+    """
+
+    def __init__(self, ply_maximo: int):
+        self.killers = [[SIN_MOVIMIENTO] * NUM_KILLERS for _ in range(ply_maximo + 1)]
+        # Índices [color << 12 | origen | destino << 6], es decir, [color][destino][origen]
+        self.historia = array('i', bytes(4 * 2 * 4096))
+        self.respuestas = array('H', bytes(2 * 2 * 4096))
+
+    def __repr__(self) -> str:
+        return f"TablasOrdenacion (killers={len(self.killers)} plies)"
+
+    def nueva_busqueda(self) -> None:
+        """
+        Borra los killers, que dependen del ply, y reduce la historia a la mitad para que pesen más los
+        cortes de la búsqueda nueva.
+        """
+        for killers in self.killers:
+            killers[:] = [SIN_MOVIMIENTO] * NUM_KILLERS
+        self._dividir_historia()
+
+    def _dividir_historia(self) -> None:
+        historia = self.historia
+        for indice in range(len(historia)):
+            historia[indice] >>= 1
+
+    def respuesta(self, color: int, movimiento_previo: int) -> int:
+        """
+        Devuelve la respuesta guardada del color al movimiento previo del rival, o SIN_MOVIMIENTO.
+        """
+        if movimiento_previo == SIN_MOVIMIENTO:
+            return SIN_MOVIMIENTO
+        return self.respuestas[color << 12 | movimiento_previo & _MASCARA_CASILLAS]
+
+    def registrar_corte(self, movimiento: int, color: int, ply: int, profundidad: int,
+                        movimiento_previo: int, tranquilos_probados: list) -> None:
+        """
+        Actualiza las tablas tras un corte beta producido por un movimiento tranquilo.
+        Args:
+            movimiento (int): Movimiento que ha producido el corte.
+            color (int): Color que lo ha jugado (BLANCAS o NEGRAS).
+            ply (int): Distancia a la raíz.
+            profundidad (int): Profundidad restante del nodo; el bono de historia es su cuadrado.
+            movimiento_previo (int): Movimiento del rival que llevó a la posición (SIN_MOVIMIENTO en la raíz).
+            tranquilos_probados (list): Movimientos tranquilos buscados antes sin corte, que se penalizan.
+        """
+        killers = self.killers[ply]
+        if killers[0] != movimiento:
+            killers[1] = killers[0]
+            killers[0] = movimiento
+        base = color << 12
+        if movimiento_previo != SIN_MOVIMIENTO:
+            self.respuestas[base | movimiento_previo & _MASCARA_CASILLAS] = movimiento
+
+        # Gravedad: cada bono o penalización se reduce según lo cerca que esté la entrada de la cota, de
+        # modo que ambos signos quedan en [-MAX_HISTORIA, MAX_HISTORIA] sin desbordar el array('i')
+        bono = profundidad * profundidad
+        historia = self.historia
+        indice = base | movimiento & _MASCARA_CASILLAS
+        historia[indice] += bono - historia[indice] * bono // MAX_HISTORIA
+        for probado in tranquilos_probados:
+            indice = base | probado & _MASCARA_CASILLAS
+            historia[indice] -= bono + historia[indice] * bono // MAX_HISTORIA
+
+
+class SelectorMovimientos:
+    """
+    Recorre por etapas los movimientos legales de la posición del tablero (ver el docstring del módulo).
+    El tablero debe estar en la misma posición cada vez que se pide el siguiente movimiento, es decir,
+    cada movimiento entregado se deshace antes de continuar.
+    """
+
+    def __init__(self, tablero: "Tablero", reglas: "Reglas", tablas: TablasOrdenacion, ply: int,
+                 movimiento_tabla: int = SIN_MOVIMIENTO, movimiento_previo: int = SIN_MOVIMIENTO,
+                 lista_capturas: array = None, lista_tranquilos: array = None):
+        self._tablero = tablero
+        self._generador = Generador_movimientos(tablero, reglas, tablero.turno)
+        self._tablas = tablas
+        self._ply = ply
+        self._movimiento_tabla = movimiento_tabla
+        self._movimiento_previo = movimiento_previo
+        self._lista_capturas = lista_capturas if lista_capturas is not None else nueva_lista_movimientos()
+        self._lista_tranquilos = lista_tranquilos if lista_tranquilos is not None else nueva_lista_movimientos()
+        self._color = indice_color(tablero.turno)
+
+    def __iter__(self):
+        tablero = self._tablero
+        generador = self._generador
+        movimiento_tabla = self._movimiento_tabla
+        if movimiento_tabla != SIN_MOVIMIENTO and generador.es_legal_codificado(movimiento_tabla):
+            yield movimiento_tabla
+        else:
+            movimiento_tabla = SIN_MOVIMIENTO
+
+        # Capturas y coronaciones por MVV-LVA (primero la víctima más valiosa y, a igualdad, el atacante
+        # menos valioso); las que pierden material, al final
+        capturas = generador.generar_capturas_codificadas(self._lista_capturas)
+        puntuadas = []
+        for codigo in capturas:
+            if codigo != movimiento_tabla:
+                ganado, valor_atacante = valores_captura(tablero, codigo)
+                puntuadas.append((ganado * _RANGO_MVV - valor_atacante, ganado < valor_atacante, codigo))
+        puntuadas.sort(reverse=True)
+        malas = []
+        for _, puede_perder, codigo in puntuadas:
+            # Solo hace falta la evaluación de intercambios si el atacante vale más de lo que se gana
+            if puede_perder and evaluar_intercambio(tablero, codigo) < 0:
+                malas.append(codigo)
+            else:
+                yield codigo
+
+        # Killers y respuesta al movimiento anterior, si son tranquilos y legales aquí
+        especiales = []
+        for codigo in (*self._tablas.killers[self._ply], self._tablas.respuesta(self._color, self._movimiento_previo)):
+            if (codigo != SIN_MOVIMIENTO and codigo != movimiento_tabla and codigo not in especiales
+                    and es_tranquilo(tablero, codigo) and generador.es_legal_codificado(codigo)):
+                especiales.append(codigo)
+                yield codigo
+
+        # Resto de movimientos tranquilos por historia
+        tranquilos = generador.generar_tranquilos_codificados(self._lista_tranquilos)
+        historia = self._tablas.historia
+        base = self._color << 12
+        ordenados = sorted((codigo for codigo in tranquilos if codigo != movimiento_tabla and codigo not in especiales),
+                           key=lambda codigo: historia[base | codigo & _MASCARA_CASILLAS], reverse=True)
+        yield from ordenados
+        yield from malas
@@ -0,0 +1,181 @@
+"""
+Perft: cuenta los nodos del árbol de movimientos legales hasta una profundidad fija. Sirve para
+validar el generador de movimientos comparando con los recuentos de referencia publicados y para
+medir su rendimiento en nodos por segundo.
+
+Uso:
+    python perft.py                                  # Comprueba todas las posiciones de referencia
+    python perft.py --posicion kiwipete -p 3 --dividir
+    python perft.py --fen "<FEN>" -p 4 --procesos 4
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from array import array
+
+from generador_movimiento import Generador_movimientos
+from movimiento import notacion_movimiento
+from reglas import Reglas
+from tablero import FEN_INICIAL, Tablero
+
+
+class PosicionReferencia(NamedTuple):
+    fen: str
+    nodos: dict                 # Profundidad -> número de nodos esperado
+
+
+# Posiciones de referencia de la Chess Programming Wiki
+POSICIONES_REFERENCIA = {
+    "inicial": PosicionReferencia(FEN_INICIAL, {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    "kiwipete": PosicionReferencia(
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    "posicion3": PosicionReferencia(
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    "posicion4": PosicionReferencia(
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    "posicion5": PosicionReferencia(
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    "posicion6": PosicionReferencia(
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+}
+
+# Profundidad usada por defecto al comprobar todas las posiciones desde la línea de comandos
+PROFUNDIDAD_COMPROBACION = 3
+
+
+def _movimientos(tablero: Tablero, reglas: Reglas) -> array:
+    """
+    Devuelve los movimientos legales codificados del color al que le toca mover. Cada coronación
+    cuenta como cuatro movimientos, uno por pieza.
+    """
+    return Generador_movimientos(tablero, reglas, tablero.turno).generar_movimientos_codificados()
+
+
+def _perft(tablero: Tablero, reglas: Reglas, profundidad: int) -> int:
+    """
+    Recorrido recursivo con hacer/deshacer movimiento. En el último nivel solo se cuentan los movimientos.
+    """
+    movimientos = _movimientos(tablero, reglas)
+    if profundidad == 1:
+        return len(movimientos)
+    nodos = 0
+    for movimiento in movimientos:
+        tablero.hacer_movimiento_codificado(movimiento)
+        nodos += _perft(tablero, reglas, profundidad - 1)
+        tablero.deshacer_movimiento()
+    return nodos
+
+
+def perft(tablero: Tablero, profundidad: int, reglas: Reglas = None) -> int:
+    """
+    Cuenta los nodos hoja del árbol de movimientos legales a la profundidad dada desde la posición del tablero.
+    El tablero queda en la misma posición al terminar.
+    Args:
+        tablero (Tablero): Posición de partida.
+        profundidad (int): Profundidad en medios movimientos.
+        reglas (Reglas): Reglas asociadas al tablero (se crean si no se indican).
+    Returns:
+        int: Número de nodos hoja.
+    """
+    if profundidad <= 0:
+        return 1
+    return _perft(tablero, reglas if reglas is not None else Reglas(tablero), profundidad)
+
+
+def _perft_tras_movimiento(argumentos: tuple) -> int:
+    """
+    Tarea de un proceso del pool: reconstruye la posición desde la FEN, hace el movimiento y cuenta.
+    """
+    fen, movimiento, profundidad = argumentos
+    tablero = Tablero.desde_fen(fen)
+    tablero.hacer_movimiento_codificado(movimiento)
+    return perft(tablero, profundidad)
+
+
+def dividir(tablero: Tablero, profundidad: int, procesos: int = 1) -> dict:
+    """
+    Cuenta los nodos a la profundidad dada por separado para cada movimiento de la raíz.
+    Args:
+        tablero (Tablero): Posición de partida.
+        profundidad (int): Profundidad en medios movimientos (al menos 1).
+        procesos (int): Número de procesos entre los que repartir los movimientos de la raíz.
+    Returns:
+        dict: Notación del movimiento -> número de nodos hoja bajo él.
+    """
+    if profundidad < 1:
+        raise ValueError(f"Error, profundidad inválida para dividir: {profundidad}")
+    reglas = Reglas(tablero)
+    movimientos = _movimientos(tablero, reglas)
+    notaciones = [notacion_movimiento(movimiento) for movimiento in movimientos]
+
+    if procesos > 1 and profundidad > 1:
+        fen = tablero.a_fen()
+        tareas = [(fen, movimiento, profundidad - 1) for movimiento in movimientos]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            nodos = list(pool.map(_perft_tras_movimiento, tareas))
+        return dict(zip(notaciones, nodos))
+
+    resultado = {}
+    for notacion, movimiento in zip(notaciones, movimientos):
+        tablero.hacer_movimiento_codificado(movimiento)
+        resultado[notacion] = perft(tablero, profundidad - 1, reglas)
+        tablero.deshacer_movimiento()
+    return resultado
+
+
+def _medir(tablero: Tablero, profundidad: int, procesos: int, mostrar_division: bool) -> tuple:
+    """
+    Ejecuta perft (dividido por movimientos de la raíz) y devuelve (nodos, segundos).
+    """
+    inicio = time.perf_counter()
+    division = dividir(tablero, profundidad, procesos)
+    segundos = time.perf_counter() - inicio
+    if mostrar_division:
+        for notacion, nodos in sorted(division.items()):
+            print(f"{notacion}: {nodos}")
+    return sum(division.values()), segundos
+
+
+def main(argumentos: list = None) -> int:
+    """
+    Punto de entrada de la línea de comandos. Devuelve 1 si algún recuento no coincide con la referencia.
+    """
+    parser = argparse.ArgumentParser(description="Perft del generador de movimientos")
+    parser.add_argument("--fen", help="Posición en notación FEN")
+    parser.add_argument("--posicion", choices=sorted(POSICIONES_REFERENCIA), help="Posición de referencia")
+    parser.add_argument("-p", "--profundidad", type=int, default=PROFUNDIDAD_COMPROBACION,
+                        help="Profundidad en medios movimientos")
+    parser.add_argument("--dividir", action="store_true", help="Muestra los nodos de cada movimiento de la raíz")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos entre los que repartir la raíz")
+    args = parser.parse_args(argumentos)
+
+    if args.fen:
+        posiciones = {"fen": PosicionReferencia(args.fen, {})}
+    elif args.posicion:
+        posiciones = {args.posicion: POSICIONES_REFERENCIA[args.posicion]}
+    else:
+        posiciones = POSICIONES_REFERENCIA
+
+    errores = 0
+    for nombre, (fen, referencia) in posiciones.items():
+        profundidad = args.profundidad
+        nodos, segundos = _medir(Tablero.desde_fen(fen), profundidad, args.procesos, args.dividir)
+        esperado = referencia.get(profundidad)
+        estado = "" if esperado is None else (" OK" if nodos == esperado else f" ERROR (esperado {esperado})")
+        errores += esperado is not None and nodos != esperado
+        nodos_por_segundo = nodos / segundos if segundos > 0 else 0.0
+        print(f"{nombre} profundidad {profundidad}: {nodos} nodos en {segundos:.2f} s "
+              f"({nodos_por_segundo:.0f} nodos/s){estado}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
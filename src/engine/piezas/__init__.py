@@ -1,7 +1,7 @@
+from .pieza import Pieza
 from .alfil import Alfil
 from .caballo import Caballo
+from .torre import Torre
 from .dama import Dama
 from .peon import Peon
-from .pieza import Pieza
-from .rey import Rey
-from .torre import Torre
\ No newline at end of file
+from .rey import Rey
\ No newline at end of file
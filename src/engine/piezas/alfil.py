@@ -1,10 +1,13 @@
 import numpy as np
 from array import array
 
+from bitboards import ALFIL
 from color import Color
 from piezas import Pieza
 
 class Alfil(Pieza):
+    __slots__ = ()
+    TIPO = ALFIL
 
     def __init__(self, color: Color):
         """
@@ -38,4 +41,4 @@ class Alfil(Pieza):
             fila += paso_fila
             columna += paso_columna
 
-        return True
\ No newline at end of file
+        return True
@@ -1,10 +1,13 @@
 import numpy as np
 from array import array
 
+from bitboards import CABALLO
 from color import Color
 from piezas import  Pieza
 
 class Caballo(Pieza):
+    __slots__ = ()
+    TIPO = CABALLO
 
     def __init__(self, color: Color):
         """
@@ -32,4 +35,4 @@ class Caballo(Pieza):
             if (abs(fila_destino - fila_actual) == 1):
                 return True
 
-        return False
\ No newline at end of file
+        return False
@@ -1,10 +1,14 @@
 import numpy as np
 from array import array 
 
+from bitboards import DAMA
 from color import Color
 from piezas import Alfil, Pieza, Torre
 
 class Dama(Pieza):
+    __slots__ = ()
+    TIPO = DAMA
+
     def __init__(self, color: Color):
         """
         Inicializa una dama con su color.
@@ -25,4 +29,4 @@ class Dama(Pieza):
         return (
             torre.comprobar_movimiento_valido(movimiento, tablero) or
             alfil.comprobar_movimiento_valido(movimiento, tablero)
-        )
\ No newline at end of file
+        )
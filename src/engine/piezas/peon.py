@@ -1,10 +1,13 @@
 from array import array
 import numpy as np
 
+from bitboards import BLANCAS, PEON
 from color import Color
 from piezas import Alfil, Caballo, Dama, Pieza, Torre
 
 class Peon(Pieza):
+    __slots__ = ()
+    TIPO = PEON
 
     def __init__(self, color: Color):
         """
@@ -23,8 +26,9 @@ class Peon(Pieza):
         fila_actual, columna_actual = self.posicion_actual_entera
         fila_destino, columna_destino = movimiento
 
-        direccion = 1 if self.color == Color.BLANCA else -1
-        fila_inicial = 1 if self.color == Color.BLANCA else 6
+        es_blanca = self.codigo_color == BLANCAS
+        direccion = 1 if es_blanca else -1
+        fila_inicial = 1 if es_blanca else 6
 
         casilla_destino = tablero[fila_destino, columna_destino]
         destino_esta_ocupado = casilla_destino != 0
@@ -55,11 +59,8 @@ class Peon(Pieza):
             fila_destino == fila_actual + direccion
         )
         if es_diagonal:
-            es_enemigo = (
-                (self.color == Color.BLANCA and casilla_destino == -1) or
-                (self.color == Color.NEGRA and casilla_destino == 1)
-            )
-            if es_enemigo:
+            # El rival ocupa la casilla con el valor opuesto al propio (1 blancas, -1 negras)
+            if casilla_destino == -direccion:
                 return True
 
         return False
@@ -71,30 +72,19 @@ class Peon(Pieza):
             bool: True si puede transformarse, False en caso contrario.
         """
         fila_actual, _ = self.posicion_actual_entera
-        return ((self.color == Color.BLANCA and fila_actual == 7) or
-                (self.color == Color.NEGRA and fila_actual == 0))
+        return fila_actual == (7 if self.codigo_color == BLANCAS else 0)
 
-    def transformarse(self):
+    def transformarse(self, promocion: type = Dama):
         """
-        Permite al usuario elegir la pieza a la que se transforma el peón.
+        Devuelve la pieza en la que se transforma el peón al llegar a la última fila. La pieza elegida forma
+        parte del movimiento (ver movimiento.py), así que no se pregunta al usuario.
+        Args:
+            promocion (type): Clase de la pieza elegida: Dama, Torre, Alfil o Caballo.
         Returns:
-            Pieza: Nueva pieza elegida por el usuario.
+            Pieza: Nueva pieza, o None si el peón no está en la última fila.
         """
         if not self.puede_transformarse():
             return None
-
-        print("En qué pieza quieres transformar el peón.")
-        print("1. Dama\n2. Torre\n3. Alfil\n4. Caballo")
-        opcion = input("Introduce el número de la pieza: ")
-
-        if opcion == "1":
-            return Dama(self.color)
-        if opcion == "2":
-            return Torre(self.color)
-        if opcion == "3":
-            return Alfil(self.color)
-        if opcion == "4":
-            return Caballo(self.color)
-
-        print("Opción no válida. Se transforma a Dama por defecto.")
-        return Dama(self.color)
\ No newline at end of file
+        if promocion not in (Dama, Torre, Alfil, Caballo):
+            raise ValueError(f"Error, pieza de coronación inválida: {promocion}")
+        return promocion(self.color)
@@ -2,12 +2,20 @@
 Archivo que define las clases de las piezas de Ajedrez así como sus métodos.
 """
 from array import array
+from typing import TYPE_CHECKING
 import numpy as np
 
+import ataques
+from bitboards import BLANCAS, NEGRAS
 from color import Color
 
+if TYPE_CHECKING:
+    from tablero import Tablero
+
 class Pieza:
-    posicion_actual_entera: array
+    # Sin __dict__: las piezas se crean y se copian con cada tablero
+    __slots__ = ("color", "codigo_color", "casilla", "valor_relativo")
+    TIPO: int = None            # Índice del tipo de pieza en los bitboards (PEON..REY), lo fija cada subclase
 
     def __init__(self, color: Color):
         """
@@ -16,9 +24,33 @@ class Pieza:
         if not isinstance(color, Color):
             raise ValueError(f"Error, color inválido: {color}. Solo se permite BLANCA o NEGRA")
         self.color: Color = color
-        self.posicion_actual_entera: array = array('i', [0, 0])
+        self.codigo_color: int = BLANCAS if color == Color.BLANCA else NEGRAS     # Para comparar con enteros
+        self.casilla: int = 0               # Índice fila * 8 + columna de la posición de la pieza
         self.valor_relativo: int = 0
 
+    @property
+    def posicion_actual_entera(self) -> array:
+        """
+        Devuelve la posición de la pieza como array de enteros [fila, columna]. Es una copia: para mover
+        la pieza hay que asignar la posición completa.
+        """
+        return array('i', divmod(self.casilla, 8))
+
+    @posicion_actual_entera.setter
+    def posicion_actual_entera(self, posicion) -> None:
+        self.casilla = int(posicion[0]) * 8 + int(posicion[1])
+
+    def copiar(self) -> "Pieza":
+        """
+        Devuelve una copia de la pieza sin pasar por deepcopy.
+        """
+        copia = object.__new__(type(self))
+        copia.color = self.color
+        copia.codigo_color = self.codigo_color
+        copia.casilla = self.casilla
+        copia.valor_relativo = self.valor_relativo
+        return copia
+
     @staticmethod
     def transformar_estandar_a_entero(posicion: list) -> array:
         """
@@ -39,6 +71,22 @@ class Pieza:
         posicion_transformada[1] = int(posicion[1]) - 1
         return posicion_transformada
 
+    def generar_destinos(self, tablero: "Tablero") -> int:
+        """
+        Genera las casillas alcanzables por la pieza sin tener en cuenta si el rey propio queda en jaque.
+        Usa las tablas de ataques de ataques.py, las mismas del generador de movimientos; el enroque y la
+        captura al paso los añade el generador tras comprobarlos con las reglas.
+
+        Args:
+            tablero (Tablero): Tablero en el que está la pieza.
+
+        Returns:
+            int: Bitboard de destinos (bit fila * 8 + columna).
+        """
+        ocupacion = tablero.ocupacion
+        return ataques.destinos_pieza(self.TIPO, self.codigo_color, self.casilla,
+                                      ocupacion[self.codigo_color], ocupacion[self.codigo_color ^ 1])
+
     def esta_dentro_tablero(self, movimiento: array) -> bool:
         """
         Comprueba si el movimiento está dentro de los límites del tablero.
@@ -50,10 +98,7 @@ class Pieza:
         Comprueba que la casilla de destino no está ocupada por una pieza del mismo color.
         """
         fila_destino, columna_destino = movimiento
-        casilla_destino = tablero[fila_destino, columna_destino]
-        if (self.color == Color.BLANCA and casilla_destino == 1) or (self.color == Color.NEGRA and casilla_destino == -1):
-            return False
-        return True
+        return tablero[fila_destino, columna_destino] != 1 - 2 * self.codigo_color
 
     def comprobar_movimiento_valido(self, movimiento: array, tablero: np.ndarray) -> bool:
         """
@@ -81,8 +126,7 @@ class Pieza:
         if self.comprobar_movimiento_valido(movimiento_transformado, tablero):
             tablero[self.posicion_actual_entera[0], self.posicion_actual_entera[1]] = 0
             tablero[movimiento_transformado[0], movimiento_transformado[1]] = self
-            self.posicion_actual_entera[0] = movimiento_transformado[0]
-            self.posicion_actual_entera[1] = movimiento_transformado[1]
+            self.posicion_actual_entera = movimiento_transformado
 
     def capturar(self) -> int:
         """
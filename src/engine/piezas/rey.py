@@ -1,10 +1,14 @@
 import numpy as np
 from array import array
 
+from bitboards import REY
 from color import Color
 from piezas import Pieza
 
 class Rey(Pieza):
+    __slots__ = ("se_ha_movido",)
+    TIPO = REY
+
     def __init__(self, color: Color):
         """
         Inicializa un rey con su color.
@@ -12,6 +16,14 @@ class Rey(Pieza):
         super().__init__(color)
         self.se_ha_movido = False       # Se usa para comprobar si se puede enrocar 
 
+    def copiar(self) -> Pieza:
+        """
+        Devuelve una copia de la pieza, incluido si se ha movido.
+        """
+        copia = super().copiar()
+        copia.se_ha_movido = self.se_ha_movido
+        return copia
+
     def comprobar_movimiento_valido(self, movimiento: array, tablero: np.ndarray) -> bool:
         """
         Comprueba si el movimiento es válido para un rey (una casilla en cualquier dirección).
@@ -25,4 +37,4 @@ class Rey(Pieza):
         if (abs(fila_destino - fila_actual) <= 1) and (abs(columna_destino - columna_actual) <= 1):
             return True
 
-        return False
\ No newline at end of file
+        return False
@@ -1,10 +1,13 @@
 import numpy as np
 from array import array
 
+from bitboards import TORRE
 from color import Color
 from piezas import Pieza
 
 class Torre(Pieza):
+    __slots__ = ("se_ha_movido",)
+    TIPO = TORRE
 
     def __init__(self, color: Color):
         """
@@ -14,6 +17,14 @@ class Torre(Pieza):
         self.valor_relativo = 5
         self.se_ha_movido = False        # Se usa para comprobar si se puede enrocar
 
+    def copiar(self) -> Pieza:
+        """
+        Devuelve una copia de la pieza, incluido si se ha movido.
+        """
+        copia = super().copiar()
+        copia.se_ha_movido = self.se_ha_movido
+        return copia
+
     def comprobar_movimiento_valido(self, movimiento: array, tablero: np.ndarray) -> bool:
         """
         Comprueba si el movimiento es válido para una torre.
@@ -38,4 +49,4 @@ class Torre(Pieza):
                 return False
             fila += paso_fila
             columna += paso_columna
-        return True
\ No newline at end of file
+        return True
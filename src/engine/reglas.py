@@ -1,110 +1,136 @@
 from array import array
-from copy import deepcopy
+from enum import Enum
 
+import ataques
+from bitboards import ALFIL, CABALLO, DAMA, PEON, TORRE, casilla, indice_color
 from color import Color
 from piezas import Alfil, Caballo, Rey, Pieza, Peon, Torre
-from tablero import Tablero
+from tablero import ENROQUE_CORTO_BLANCAS, ENROQUE_CORTO_NEGRAS, ENROQUE_LARGO_BLANCAS, ENROQUE_LARGO_NEGRAS, Tablero
+
+class EstadoPartida(Enum):
+    EN_JUEGO = 0
+    JAQUE_MATE = 1          # El color al que le toca mover ha recibido jaque mate
+    AHOGADO = 2             # El color al que le toca mover no tiene movimientos legales y no está en jaque
+    TABLAS = 3              # Regla de los 50 movimientos, triple repetición o material insuficiente
+
+# Número máximo de posiciones guardadas en la caché de estados antes de vaciarla
+MAX_ESTADOS_CACHE = 1 << 16
 
 class Reglas:
     def __init__(self, tablero: Tablero):
         self.tablero = tablero
+        self._cache_estados: dict[tuple, EstadoPartida] = {}       # (clave Zobrist, color) -> estado según los movimientos y el material
+
+    def estado_partida(self, color: Color = None) -> EstadoPartida:
+        """
+        Devuelve el estado de la partida para el color que mueve (por defecto, el del turno del tablero).
+        Solo busca un movimiento legal y se detiene en cuanto lo encuentra, de modo que en las posiciones
+        que no son terminales el coste es muy bajo. La parte que depende únicamente de la posición (mate,
+        ahogado y material insuficiente) se guarda por clave Zobrist; la regla de los 50 movimientos y la
+        repetición dependen del historial y se comprueban siempre.
+        """
+        if color is None:
+            color = self.tablero.turno
+        clave = (self.tablero.clave_hash, color)
+        estado = self._cache_estados.get(clave)
+        if estado is None:
+            if not self._tiene_movimientos_legales(color):
+                estado = EstadoPartida.JAQUE_MATE if self.es_jaque(color) else EstadoPartida.AHOGADO
+            elif self.es_material_insuficiente():
+                estado = EstadoPartida.TABLAS
+            else:
+                estado = EstadoPartida.EN_JUEGO
+            if len(self._cache_estados) >= MAX_ESTADOS_CACHE:
+                self._cache_estados.clear()
+            self._cache_estados[clave] = estado
+
+        if estado == EstadoPartida.EN_JUEGO and (self.tablero.reloj_medio_movimientos >= 100
+                                                 or self.tablero.es_repeticion(3)):
+            return EstadoPartida.TABLAS
+        return estado
+
+    def _tiene_movimientos_legales(self, color: Color) -> bool:
+        """
+        Devuelve True si el color tiene al menos un movimiento legal.
+        """
+        # Importación diferida: generador_movimiento importa este módulo
+        from generador_movimiento import Generador_movimientos
+        return Generador_movimientos(self.tablero, self, color).tiene_movimientos_legales()
 
     def es_jaque(self, color: Color) -> bool:
         """
         Devuelve True si el rey del color dado está en jaque, , False en caso contrario.
         """
-        rey: Rey = self.tablero.buscar_rey(color)
-        if not rey:
+        casilla_rey = self.tablero.casilla_rey(color)
+        if casilla_rey is None:
             return False  # No hay rey del color especificado en el tablero
 
-        posicion_rey = rey.posicion_actual_entera
-        piezas_oponentes = self.tablero.listar_piezas_por_color(Color.NEGRA if color == Color.BLANCA else Color.BLANCA)
-        #Comprueba que las piezas tienen un movimiento valido en la posición del rey
-        for pieza in piezas_oponentes:
-            if pieza.comprobar_movimiento_valido(posicion_rey, self.tablero.matriz_piezas):
-                return True
-        return False
+        # El rey está en jaque si alguna pieza del oponente ataca su casilla
+        return self.casilla_atacada(casilla_rey, color.opuesto())
+
+    def casilla_atacada(self, indice_casilla: int, color: Color) -> bool:
+        """
+        Devuelve True si alguna pieza del color dado ataca la casilla (índice fila * 8 + columna),
+        usando las tablas de ataques precalculadas.
+        """
+        return ataques.casilla_atacada(self.tablero.bitboards, indice_casilla, indice_color(color),
+                                       self.tablero.ocupacion_total)
     
     def es_jaque_mate(self, color: Color) -> bool:
         """
         Devuelve True si el rey del color está en jaque mate, False en caso contrario.
         """
-        # Comprueba si el rey del color está en jaque.
-        if (not self.es_jaque(color)):
-            return False
-        
-        # Comprueba si todas las piezas del color tienen las casillas de los movimientos validos del rey en objetivo
-        piezas_propias = self.tablero.listar_piezas_por_color(color)
-        for pieza in piezas_propias:
-            # Prueba todos los movimientos posibles para todas las piezas del color dado
-            for fila in range(self.tablero.DIM_TABLERO):
-                for columna in range(self.tablero.DIM_TABLERO):
-                    destino = array('i', [fila, columna])
-                    # Si el movimiento es legal y tras simularlo el rey no está en jaque, no es jaque mate
-                    es_valido = pieza.comprobar_movimiento_valido(destino, self.tablero.matriz_piezas)
-                    if not es_valido:
-                        continue
-                    tablero_simulado = self.simular_movimiento(pieza, destino)
-                    reglas_simuladas = Reglas(tablero_simulado)
-                    if not reglas_simuladas.es_jaque(color):
-                        return False
-                    
-        return True
+        return self.es_jaque(color) and not self._tiene_movimientos_legales(color)
         
     def es_ahogado(self, color: Color) -> bool:
         """
         Devuelve True si el jugador del color dado está ahogado (no tiene movimientos legales y no está en jaque).
         """
-        if self.es_jaque(color):
-            return False
-        # Comprueba exhaustivamente todos los movimientos validos de todas las piezas del color dado
-        piezas_propias = self.tablero.listar_piezas_por_color(color)
-        for pieza in piezas_propias:
-            for fila in range(self.tablero.DIM_TABLERO):
-                for columna in range(self.tablero.DIM_TABLERO):
-                    destino = array('i', [fila, columna])
-                    es_valido = pieza.comprobar_movimiento_valido(destino, self.tablero.matriz_piezas)
-                    if not es_valido:
-                        continue
-                    tablero_simulado = self.simular_movimiento(pieza, destino)
-                    reglas_simuladas = Reglas(tablero_simulado)
-                    if not reglas_simuladas.es_jaque(color):
-                        return False
-                    
-        return True
+        return not self.es_jaque(color) and not self._tiene_movimientos_legales(color)
 
     def es_tablas(self) -> bool:
         """
-        Devuelve True si la partida es tablas (ahogado o material insuficiente).
+        Devuelve True si la partida es tablas (ahogado, regla de los 50 movimientos, triple repetición
+        o material insuficiente).
         """
         # Tablas si los dos jugadores están ahogados
         if self.es_ahogado(Color.BLANCA) or self.es_ahogado(Color.NEGRA):
             return True
 
-        # Tablas por material insuficiente
-        piezas = [pieza for fila in self.tablero.matriz_piezas for pieza in fila if pieza is not None]
-        if all(isinstance(pieza, (Rey, Alfil, Caballo)) for pieza in piezas):
-            # Solo reyes
-            if all(isinstance(pieza, Rey) for pieza in piezas):
-                return True
-            # Rey vs rey + alfil o rey vs rey + caballo
-            if len(piezas) == 3 and any(isinstance(pieza, (Alfil, Caballo)) for pieza in piezas):
-                return True
-        return False
-        # TODO Añadir comprobacion de la regla de los 50 movimientos y repetición de posición
+        # Regla de los 50 movimientos: 100 medios movimientos sin capturas ni movimientos de peón
+        if self.tablero.reloj_medio_movimientos >= 100:
+            return True
+
+        # Triple repetición de la posición, detectada con las claves Zobrist
+        if self.tablero.es_repeticion(3):
+            return True
+
+        return self.es_material_insuficiente()
+
+    def es_material_insuficiente(self) -> bool:
+        """
+        Devuelve True si ningún jugador tiene material para dar mate: solo reyes, o rey contra
+        rey y una pieza menor.
+        """
+        contador = self.tablero.contador_piezas
+        menores = 0
+        for piezas_color in contador:
+            if piezas_color[PEON] or piezas_color[TORRE] or piezas_color[DAMA]:
+                return False
+            menores += piezas_color[ALFIL] + piezas_color[CABALLO]
+        # Solo reyes, o rey vs rey + alfil o rey vs rey + caballo
+        return menores <= 1
 
     def es_movimiento_legal(self, pieza: Pieza, destino: array) -> bool:
         """
         Devuelve True si el movimiento es legal según las reglas.
         """
         # Comprueba si el movimiento de la pieza en particular es valido
-        if not pieza.comprobar_movimiento_valido(destino, self.tablero.matriz_piezas):
+        if not pieza.comprobar_movimiento_valido(destino, self.tablero.obtener_estado_matriz()):
             return False
         
         # Si es valido, comprueba si es legal, es decir que sale del jaque
-        tablero_simulado = self.simular_movimiento(pieza, destino)
-        reglas_simuladas = Reglas(tablero_simulado)
-        if reglas_simuladas.es_jaque(pieza.color):
+        if self.deja_rey_en_jaque(pieza, destino):
             return False
         
         return True
@@ -114,19 +140,26 @@ class Reglas:
         Devuelve True si el jugador del color dado puede enrocar en el lado especificado ('corto' o 'largo').
         """
         # Busca el rey y las torres
-        rey :Rey = self.tablero.buscar_rey(color)
-        if not rey or rey.se_ha_movido:
+        casilla_rey = self.tablero.buscar_rey(color)
+        if not casilla_rey:
+            return False
+        rey: Rey = self.tablero.pieza_en(*casilla_rey)
+        if rey.se_ha_movido:
             return False
 
         fila = rey.posicion_actual_entera[0]
         if lado == "corto":
             torre_col = 7
             cols_entre = [5, 6]
+            derecho = ENROQUE_CORTO_BLANCAS if color == Color.BLANCA else ENROQUE_CORTO_NEGRAS
         elif lado == "largo":
             torre_col = 0
             cols_entre = [1, 2, 3]
+            derecho = ENROQUE_LARGO_BLANCAS if color == Color.BLANCA else ENROQUE_LARGO_NEGRAS
         else:
             return False
+        if not self.tablero.derechos_enroque & derecho:
+            return False
 
         torre :Torre = self.tablero.matriz_piezas[fila][torre_col]
         if not torre or not isinstance(torre, Torre) or torre.se_ha_movido:
@@ -138,10 +171,9 @@ class Reglas:
                 return False
 
         # Comprobar que el rey no está en jaque, ni pasa por ni termina en jaque
-        for col in ([4] + cols_entre if lado == "largo" else [4, 5, 6]):
-            tablero_simulado = self.simular_movimiento(rey, array('i', [fila, col]))
-            reglas_simuladas = Reglas(tablero_simulado)
-            if reglas_simuladas.es_jaque(color):
+        color_oponente = color.opuesto()
+        for col in ([4, 3, 2] if lado == "largo" else [4, 5, 6]):
+            if self.casilla_atacada(casilla(fila, col), color_oponente):
                 return False
 
         return True
@@ -150,58 +182,48 @@ class Reglas:
         """
         Devuelve True si el peón puede capturar al paso según el estado actual del tablero.
         """
-        # Comprobar que hay historial suficiente
-        if not hasattr(self.tablero, "historial") or not self.tablero.historial:
+        # La casilla de captura al paso la fija el tablero tras el avance doble de un peón rival
+        if self.tablero.casilla_al_paso is None:
             return False
-        
-        ultimo_mov = self.tablero.historial[-1]
-        pieza_movida, origen, destino = ultimo_mov  # origen y destino son arrays [fila, columna]
+        fila_captura, col_captura = self.tablero.casilla_al_paso
 
-        # El último movimiento debe ser de un peón que avanza dos casillas
-        if not isinstance(pieza_movida, Peon):
-            return False
-        if pieza_movida.color == peon.color:
-            return False
-
-        # El peón rival debe estar en la columna adyacente y en la misma fila que el peón actual
+        # El peón debe poder avanzar en diagonal hasta la casilla de captura
         fila_peon, col_peon = peon.posicion_actual_entera
-        fila_destino, col_destino = destino
-
-        # El peón rival debe haber avanzado dos filas en un solo movimiento
-        if abs(fila_destino - origen[0]) != 2:
-            return False
-
-        # El peón rival debe estar en la misma fila que el peón actual
-        if fila_destino != fila_peon:
+        direccion = 1 if peon.color == Color.BLANCA else -1
+        if fila_peon + direccion != fila_captura:
             return False
 
         # Deben estar en columnas adyacentes
-        if abs(col_destino - col_peon) != 1:
+        if abs(col_captura - col_peon) != 1:
             return False
 
-        # La casilla de captura al paso debe estar vacía y dentro del tablero
-        direccion = 1 if peon.color == Color.BLANCA else -1
-        fila_captura = fila_peon + direccion
-        if not (0 <= fila_captura < self.tablero.DIM_TABLERO):
-            return False
-        if self.tablero.matriz_piezas[fila_captura][col_destino] is not None:
-            return False
+        # El peón rival que avanzó dos casillas debe estar junto al peón actual
+        peon_rival = self.tablero.pieza_en(fila_peon, col_captura)
+        return isinstance(peon_rival, Peon) and peon_rival.color != peon.color
 
-        return True
+    def deja_rey_en_jaque(self, pieza: Pieza, destino: array) -> bool:
+        """
+        Hace el movimiento sobre el propio tablero, comprueba si el rey del color de la pieza queda
+        en jaque y deshace el movimiento. No comprueba que el movimiento sea válido para la pieza.
+        """
+        self.tablero.hacer_movimiento(pieza.posicion_actual_entera, destino)
+        en_jaque = self.es_jaque(pieza.color)
+        self.tablero.deshacer_movimiento()
+        return en_jaque
 
     def simular_movimiento(self, pieza: Pieza, destino: array) -> Tablero:
         """
         Devuelve una copia del tablero tras simular el movimiento de la pieza al destino.
         Al ser una copia, no modifica el tablero original.
         """
-        tablero_copia = deepcopy(self.tablero)
+        tablero_copia = self.tablero.clonar()
         origen = array('i', pieza.posicion_actual_entera)
 
         # Elimina la pieza de la posición original
         tablero_copia.matriz_piezas[origen[0]][origen[1]] = None
 
         # Crea una copia de la pieza, actualiza su posición y colócala en el destino
-        pieza_copiada = deepcopy(pieza)
+        pieza_copiada = pieza.copiar()
         pieza_copiada.posicion_actual_entera = array('i', [destino[0], destino[1]])
         tablero_copia.matriz_piezas[destino[0]][destino[1]] = pieza_copiada
 
@@ -0,0 +1,73 @@
+"""
+Tabla de la estructura de peones.
+
+La estructura de peones cambia muy poco entre nodos hermanos de la búsqueda, así que los recuentos
+de peones aislados, doblados y pasados de ambos colores se guardan indexados por la clave Zobrist
+de los peones (Tablero.clave_peones). La tabla tiene un número fijo de entradas reservadas en arrays
+de NumPy y cada entrada se sobrescribe siempre.
+"""
+from typing import Optional
+
+import numpy as np
+
+from utils import config
+
+# Índices de los recuentos guardados por color
+AISLADOS = 0
+DOBLADOS = 1
+PASADOS = 2
+NUM_RECUENTOS = 3
+
+
+class TablaPeones:
+
+    def __init__(self, entradas: int = config.ENTRADAS_TABLA_PEONES):
+        """
+        Reserva la tabla con el número de entradas indicado.
+        Args:
+            entradas (int): Número de estructuras de peones que caben en la tabla.
+        """
+        if entradas <= 0:
+            raise ValueError(f"Error, número de entradas inválido para la tabla de peones: {entradas}")
+        self._claves = np.zeros(entradas, dtype=np.uint64)
+        # Las entradas vacías tienen clave 0 y recuentos 0, que es justo el resultado sin peones (clave 0)
+        self._recuentos = np.zeros((entradas, 2, NUM_RECUENTOS), dtype=np.int8)
+        self._num_entradas = entradas
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self) -> int:
+        return self._num_entradas
+
+    def __repr__(self) -> str:
+        return f"TablaPeones (entradas={self._num_entradas}, aciertos={self.aciertos}, fallos={self.fallos})"
+
+    def limpiar(self) -> None:
+        """
+        Vacía la tabla y reinicia los contadores.
+        """
+        self._claves.fill(0)
+        self._recuentos.fill(0)
+        self.aciertos = 0
+        self.fallos = 0
+
+    def buscar(self, clave: int) -> Optional[list]:
+        """
+        Busca la estructura de peones en la tabla.
+        Returns:
+            list | None: Recuentos [[aislados, doblados, pasados] de blancas, [...] de negras] si está guardada.
+        """
+        indice = clave % self._num_entradas
+        if self._claves[indice] == clave:
+            self.aciertos += 1
+            return self._recuentos[indice].tolist()
+        self.fallos += 1
+        return None
+
+    def guardar(self, clave: int, recuentos: list) -> None:
+        """
+        Guarda los recuentos de ambos colores de la estructura de peones, reemplazando la entrada anterior.
+        """
+        indice = clave % self._num_entradas
+        self._claves[indice] = clave
+        self._recuentos[indice] = recuentos
@@ -0,0 +1,229 @@
+"""
+Tabla de transposición de la búsqueda.
+
+Las entradas se guardan en un array estructurado de NumPy reservado de antemano con el tamaño
+indicado en MB, de modo que la memoria es fija durante toda la búsqueda y no se crean objetos
+de Python por cada posición. El cubo de una posición es su clave Zobrist módulo el número de
+cubos, y cada cubo tiene dos entradas:
+- la entrada 0 se reemplaza solo por búsquedas de igual o mayor profundidad (o de búsquedas anteriores),
+- la entrada 1 se reemplaza siempre.
+
+La tabla se puede crear en memoria compartida (multiprocessing.shared_memory) para que la usen a la
+vez varios procesos de la búsqueda paralela sin cerrojos. Los 8 bytes de datos de una entrada
+(movimiento, puntuación, profundidad y tipo) forman un entero de 64 bits y en el campo clave se guarda
+la clave XOR los datos: si dos procesos escriben la misma entrada a la vez y queda mezclada, la
+comprobación de la clave falla y la entrada se trata como vacía.
+"""
+import struct
+import sys
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from utils import config
+
+# Tipos de cota de la puntuación guardada
+COTA_EXACTA = 0
+COTA_INFERIOR = 1       # La puntuación real es mayor o igual (corte beta)
+COTA_SUPERIOR = 2       # La puntuación real es menor o igual (ningún movimiento superó alfa)
+
+ENTRADAS_POR_CUBO = 2
+RANURA_PROFUNDIDAD = 0
+RANURA_SIEMPRE = 1
+
+TIPO_ENTRADA = np.dtype([
+    ("clave", np.uint64),           # Clave Zobrist completa para verificar la posición
+    ("movimiento", np.uint16),      # Mejor movimiento codificado en 16 bits (0 si no hay)
+    ("puntuacion", np.float32),
+    ("profundidad", np.int8),
+    ("tipo", np.uint8),
+    ("edad", np.uint8),             # Búsqueda en la que se escribió la entrada
+])
+# La misma entrada vista como clave, datos (movimiento..tipo como un entero) y edad
+_TIPO_VERIFICACION = np.dtype({"names": ["clave", "datos", "edad"], "formats": [np.uint64, np.uint64, np.uint8],
+                               "offsets": [0, 8, 16], "itemsize": TIPO_ENTRADA.itemsize})
+_DATOS = struct.Struct("=Hfbb")
+
+
+class TablaTransposicion:
+
+    def __init__(self, tamano_mb: float = config.TAMANO_TABLA_TRANSPOSICION_MB):
+        """
+        Reserva la tabla con el mayor número de cubos que cabe en el tamaño indicado en MB.
+        Args:
+            tamano_mb (float): Memoria máxima de la tabla en MB.
+        """
+        self._comprobar_tamano(tamano_mb)
+        self._inicializar(np.zeros((self.numero_cubos(tamano_mb), ENTRADAS_POR_CUBO), dtype=TIPO_ENTRADA))
+
+    @classmethod
+    def compartida(cls, tamano_mb: float = config.TAMANO_TABLA_TRANSPOSICION_MB) -> "TablaTransposicion":
+        """
+        Crea la tabla en un bloque nuevo de memoria compartida, que otros procesos pueden abrir con
+        abrir_compartida(tabla.nombre_memoria, tabla.num_cubos). Quien la crea debe llamar a cerrar()
+        para eliminar el bloque.
+        """
+        cls._comprobar_tamano(tamano_mb)
+        num_cubos = cls.numero_cubos(tamano_mb)
+        memoria = shared_memory.SharedMemory(create=True, size=num_cubos * ENTRADAS_POR_CUBO * TIPO_ENTRADA.itemsize)
+        tabla = cls.__new__(cls)
+        entradas = np.ndarray((num_cubos, ENTRADAS_POR_CUBO), dtype=TIPO_ENTRADA, buffer=memoria.buf)
+        entradas.fill(0)
+        tabla._inicializar(entradas, memoria, propietaria=True)
+        return tabla
+
+    @classmethod
+    def abrir_compartida(cls, nombre_memoria: str, num_cubos: int, edad: int = 0) -> "TablaTransposicion":
+        """
+        Abre desde otro proceso una tabla creada con compartida().
+        Args:
+            nombre_memoria (str): Nombre del bloque de memoria compartida.
+            num_cubos (int): Número de cubos de la tabla (el bloque puede ser algo mayor).
+            edad (int): Edad actual de la tabla en el proceso que la creó.
+        """
+        memoria = shared_memory.SharedMemory(name=nombre_memoria)
+        tabla = cls.__new__(cls)
+        tabla._inicializar(np.ndarray((num_cubos, ENTRADAS_POR_CUBO), dtype=TIPO_ENTRADA, buffer=memoria.buf), memoria)
+        tabla._edad = edad
+        return tabla
+
+    @staticmethod
+    def _comprobar_tamano(tamano_mb: float) -> None:
+        if tamano_mb <= 0:
+            raise ValueError(f"Error, tamaño inválido para la tabla de transposición: {tamano_mb} MB")
+
+    def _inicializar(self, entradas: np.ndarray, memoria: shared_memory.SharedMemory = None,
+                     propietaria: bool = False) -> None:
+        self._memoria = memoria
+        self._propietaria = propietaria
+        self._entradas = entradas
+        self._num_cubos = len(self._entradas)
+        # Vistas por campo para no construir la entrada completa en cada consulta
+        self._claves = self._entradas["clave"]
+        self._datos = self._entradas.view(_TIPO_VERIFICACION)["datos"]
+        self._profundidades = self._entradas["profundidad"]
+        self._edades = self._entradas["edad"]
+        self._edad = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+
+    def __len__(self) -> int:
+        return self._entradas.size
+
+    def __repr__(self) -> str:
+        return f"TablaTransposicion (cubos={len(self._entradas)}, MB={self.tamano_bytes / 2**20:.1f})"
+
+    @staticmethod
+    def numero_cubos(tamano_mb: float) -> int:
+        """
+        Devuelve el mayor número de cubos que cabe en el tamaño indicado.
+        """
+        bytes_por_cubo = TIPO_ENTRADA.itemsize * ENTRADAS_POR_CUBO
+        return max(1, int(tamano_mb * 2**20) // bytes_por_cubo)
+
+    @property
+    def num_cubos(self) -> int:
+        return self._num_cubos
+
+    @property
+    def edad(self) -> int:
+        return self._edad
+
+    @property
+    def nombre_memoria(self) -> Optional[str]:
+        """
+        Nombre del bloque de memoria compartida, o None si la tabla es local al proceso.
+        """
+        return self._memoria.name if self._memoria is not None else None
+
+    def cerrar(self) -> None:
+        """
+        Suelta el bloque de memoria compartida y, si esta tabla lo creó, lo elimina. La tabla no se puede
+        usar después. En una tabla local no hace nada.
+        """
+        if self._memoria is None:
+            return
+        # Las vistas de NumPy sobre el bloque deben desaparecer antes de cerrarlo
+        self._entradas = self._claves = self._datos = self._profundidades = self._edades = None
+        self._memoria.close()
+        if self._propietaria:
+            self._memoria.unlink()
+        self._memoria = None
+
+    @property
+    def tamano_bytes(self) -> int:
+        """
+        Memoria ocupada por las entradas de la tabla.
+        """
+        return self._entradas.nbytes
+
+    def nueva_busqueda(self) -> None:
+        """
+        Avanza la edad de la tabla para que las entradas de búsquedas anteriores se reemplacen antes.
+        """
+        self._edad = (self._edad + 1) & 0xFF
+
+    def limpiar(self) -> None:
+        """
+        Vacía la tabla y reinicia los contadores sin liberar la memoria reservada.
+        """
+        self._entradas.fill(0)
+        self._edad = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+
+    def buscar(self, clave: int) -> Optional[tuple]:
+        """
+        Busca la posición en la tabla.
+        Returns:
+            tuple | None: (movimiento, puntuacion, profundidad, tipo) si la posición está guardada.
+        """
+        indice = clave % self._num_cubos
+        for ranura in range(ENTRADAS_POR_CUBO):
+            datos = self._leer(indice, ranura, clave)
+            if datos is not None:
+                self.aciertos += 1
+                return _DATOS.unpack(datos.to_bytes(_DATOS.size, sys.byteorder))
+        self.fallos += 1
+        return None
+
+    def _leer(self, indice: int, ranura: int, clave: int) -> Optional[int]:
+        """
+        Devuelve los datos de la ranura como entero de 64 bits si pertenecen a la clave, o None. Los campos
+        se sacan de este entero ya comprobado y no de la tabla, que otro proceso puede estar escribiendo.
+        """
+        datos = int(self._datos[indice, ranura])
+        return datos if int(self._claves[indice, ranura]) ^ datos == clave else None
+
+    def guardar(self, clave: int, profundidad: int, tipo: int, puntuacion: float, movimiento: int = 0) -> None:
+        """
+        Guarda el resultado de la búsqueda de una posición usando el esquema de reemplazo por cubos:
+        la ranura preferente por profundidad se sobrescribe si la nueva búsqueda es al menos igual de
+        profunda, si la entrada es de una búsqueda anterior o si es la misma posición; en otro caso se
+        usa la ranura de reemplazo siempre.
+        """
+        indice = clave % self._num_cubos
+        datos_previos = self._leer(indice, RANURA_PROFUNDIDAD, clave)
+        if (datos_previos is not None
+                or profundidad >= self._profundidades[indice, RANURA_PROFUNDIDAD]
+                or self._edades[indice, RANURA_PROFUNDIDAD] != self._edad):
+            ranura = RANURA_PROFUNDIDAD
+            # Conserva el mejor movimiento conocido si la nueva entrada no aporta ninguno
+            if movimiento == 0 and datos_previos is not None:
+                movimiento = _DATOS.unpack(datos_previos.to_bytes(_DATOS.size, sys.byteorder))[0]
+        else:
+            ranura = RANURA_SIEMPRE
+        datos = int.from_bytes(_DATOS.pack(movimiento, puntuacion, profundidad, tipo), sys.byteorder)
+        self._entradas[indice, ranura] = (clave ^ datos, movimiento, puntuacion, profundidad, tipo, self._edad)
+        self.escrituras += 1
+
+    def ocupacion_por_mil(self, muestra: int = 1000) -> int:
+        """
+        Estima qué fracción (por mil) de las entradas de la muestra pertenecen a la búsqueda actual.
+        """
+        muestra_entradas = self._entradas[:max(1, muestra // ENTRADAS_POR_CUBO)]
+        ocupadas = np.count_nonzero((muestra_entradas["clave"] != 0) & (muestra_entradas["edad"] == self._edad))
+        return int(1000 * ocupadas // muestra_entradas.size)
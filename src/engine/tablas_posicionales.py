@@ -0,0 +1,101 @@
+"""
+Tablas posicionales (piece-square tables): bonificación en centipeones de cada tipo de pieza según
+la casilla que ocupa. Los valores son los de la "Simplified Evaluation Function" de Tomasz
+Michniewski. Se guardan en centipeones enteros para que el tablero pueda sumarlos y restarlos de
+forma incremental sin acumular errores de redondeo.
+"""
+import numpy as np
+
+from bitboards import NUM_CASILLAS, NUM_TIPOS
+
+# Tablas escritas como se ve el tablero desde el lado de las blancas: la primera fila es la octava
+_PEON = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+     50,  50,  50,  50,  50,  50,  50,  50,
+     10,  10,  20,  30,  30,  20,  10,  10,
+      5,   5,  10,  25,  25,  10,   5,   5,
+      0,   0,   0,  20,  20,   0,   0,   0,
+      5,  -5, -10,   0,   0, -10,  -5,   5,
+      5,  10,  10, -20, -20,  10,  10,   5,
+      0,   0,   0,   0,   0,   0,   0,   0,
+)
+_CABALLO = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20,   0,   0,   0,   0, -20, -40,
+    -30,   0,  10,  15,  15,  10,   0, -30,
+    -30,   5,  15,  20,  20,  15,   5, -30,
+    -30,   0,  15,  20,  20,  15,   0, -30,
+    -30,   5,  10,  15,  15,  10,   5, -30,
+    -40, -20,   0,   5,   5,   0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+_ALFIL = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,  10,  10,   5,   0, -10,
+    -10,   5,   5,  10,  10,   5,   5, -10,
+    -10,   0,  10,  10,  10,  10,   0, -10,
+    -10,  10,  10,  10,  10,  10,  10, -10,
+    -10,   5,   0,   0,   0,   0,   5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+_TORRE = (
+      0,   0,   0,   0,   0,   0,   0,   0,
+      5,  10,  10,  10,  10,  10,  10,   5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+     -5,   0,   0,   0,   0,   0,   0,  -5,
+      0,   0,   0,   5,   5,   0,   0,   0,
+)
+_DAMA = (
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+    -10,   0,   0,   0,   0,   0,   0, -10,
+    -10,   0,   5,   5,   5,   5,   0, -10,
+     -5,   0,   5,   5,   5,   5,   0,  -5,
+      0,   0,   5,   5,   5,   5,   0,  -5,
+    -10,   5,   5,   5,   5,   5,   0, -10,
+    -10,   0,   5,   0,   0,   0,   0, -10,
+    -20, -10, -10,  -5,  -5, -10, -10, -20,
+)
+_REY = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+     20,  20,   0,   0,   0,   0,  20,  20,
+     20,  30,  10,   0,   0,  10,  30,  20,
+)
+
+
+def _construir_tablas() -> np.ndarray:
+    """
+    Devuelve el array (color, tipo, casilla) con las casillas indexadas como fila * 8 + columna.
+    Las blancas invierten el orden de las filas de las tablas escritas y las negras las usan tal cual,
+    ya que para ellas la octava fila es la primera.
+    """
+    vistas = np.array([_PEON, _CABALLO, _ALFIL, _TORRE, _DAMA, _REY], dtype=np.int16).reshape(NUM_TIPOS, 8, 8)
+    blancas = vistas[:, ::-1, :].reshape(NUM_TIPOS, NUM_CASILLAS)
+    negras = vistas.reshape(NUM_TIPOS, NUM_CASILLAS)
+    tablas = np.stack([blancas, negras])
+    tablas.flags.writeable = False
+    return tablas
+
+
+# TABLAS_POSICIONALES[color][tipo][casilla] en centipeones
+TABLAS_POSICIONALES: np.ndarray = _construir_tablas()
+# Copia en listas de Python para las actualizaciones incrementales, donde indexar NumPy elemento a elemento es lento
+VALORES_POSICIONALES: list = TABLAS_POSICIONALES.tolist()
+
+
+def calcular_puntuacion_posicional(bitboards: list) -> list:
+    """
+    Calcula desde cero la puntuación posicional (centipeones) de cada color a partir de los bitboards
+    indexados por [color][tipo]. Se usa para comprobar la puntuación incremental del tablero.
+    """
+    planos = np.array(bitboards, dtype="<u8").view(np.uint8)
+    bits = np.unpackbits(planos, bitorder="little").reshape(2, NUM_TIPOS, NUM_CASILLAS)
+    return [int(valor) for valor in (bits * TABLAS_POSICIONALES).sum(axis=(1, 2))]
@@ -5,24 +5,145 @@ distribución como la vista del tablero, la gestión de las piezas.
 from enum import Enum
 from array import array
 import numpy as np
-import copy
+from typing import NamedTuple, Optional
 
 from color import Color
 from piezas import Alfil, Caballo, Dama, Peon, Pieza, Rey, Torre
+import zobrist
+from tablas_posicionales import VALORES_POSICIONALES
+from bitboards import (ALFIL, BLANCAS, CABALLO, DAMA, NEGRAS, NUM_TIPOS, PEON, REY, TORRE, indice_color,
+                       iterar_casillas)
+from movimiento import casilla_destino, casilla_origen, pieza_coronacion
+
+# Relación entre las clases de las piezas y su índice de tipo en los bitboards
+TIPO_POR_CLASE = {clase: clase.TIPO for clase in (Peon, Caballo, Alfil, Torre, Dama, Rey)}
+CLASE_POR_TIPO = {tipo: clase for clase, tipo in TIPO_POR_CLASE.items()}
+
+# Derechos de enroque codificados como máscara de bits
+ENROQUE_CORTO_BLANCAS = 1
+ENROQUE_LARGO_BLANCAS = 2
+ENROQUE_CORTO_NEGRAS = 4
+ENROQUE_LARGO_NEGRAS = 8
+TODOS_LOS_ENROQUES = 15
+
+# Derechos de enroque que se pierden cuando se mueve o se captura en cada casilla (rey y torres iniciales)
+_PERDIDA_ENROQUE = [0] * 64
+_PERDIDA_ENROQUE[0] = ENROQUE_LARGO_BLANCAS
+_PERDIDA_ENROQUE[4] = ENROQUE_CORTO_BLANCAS | ENROQUE_LARGO_BLANCAS
+_PERDIDA_ENROQUE[7] = ENROQUE_CORTO_BLANCAS
+_PERDIDA_ENROQUE[56] = ENROQUE_LARGO_NEGRAS
+_PERDIDA_ENROQUE[60] = ENROQUE_CORTO_NEGRAS | ENROQUE_LARGO_NEGRAS
+_PERDIDA_ENROQUE[63] = ENROQUE_CORTO_NEGRAS
+
+# Notación FEN
+FEN_INICIAL = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+_CLASE_POR_LETRA = {"p": Peon, "n": Caballo, "b": Alfil, "r": Torre, "q": Dama, "k": Rey}
+_LETRA_POR_CLASE = {clase: letra for letra, clase in _CLASE_POR_LETRA.items()}
+# Letra FEN de cada enroque con las casillas (índices) del rey y la torre que lo hacen posible
+_ENROQUES_FEN = ((ENROQUE_CORTO_BLANCAS, "K", 4, 7), (ENROQUE_LARGO_BLANCAS, "Q", 4, 0),
+                 (ENROQUE_CORTO_NEGRAS, "k", 60, 63), (ENROQUE_LARGO_NEGRAS, "q", 60, 56))
+
+class RegistroMovimiento(NamedTuple):
+    """
+    Información necesaria para deshacer un movimiento hecho con Tablero.hacer_movimiento.
+    """
+    pieza: Pieza                            # Pieza que se ha movido
+    origen: tuple                           # (fila, columna) de origen
+    destino: tuple                          # (fila, columna) de destino
+    capturada: Optional[Pieza]              # Pieza capturada, si la hay
+    casilla_capturada: Optional[tuple]      # Casilla de la pieza capturada (distinta del destino en la captura al paso)
+    promocionada: Optional[Pieza]           # Pieza que sustituye al peón al coronar
+    enroque: Optional[tuple]                # (torre, origen, destino) de la torre si el movimiento es un enroque
+    derechos_enroque: int                   # Derechos de enroque antes del movimiento
+    casilla_al_paso: Optional[tuple]        # Casilla de captura al paso antes del movimiento
+    se_ha_movido: Optional[bool]            # Valor previo de se_ha_movido para reyes y torres
+    clave_hash: int                         # Clave Zobrist antes del movimiento
+    reloj_medio_movimientos: int            # Reloj de la regla de los 50 movimientos antes del movimiento
 
 class EstadoCasilla(Enum):
     LIBRE = 0
     OCUPADA_BLANCA = 1
     OCUPADA_NEGRA = -1    
 
+class _FilaPiezas:
+    """
+    Vista de una fila del tablero. La lectura y la escritura se redirigen al tablero para
+    que los bitboards se mantengan sincronizados.
+    """
+    __slots__ = ("_tablero", "_fila")
+
+    def __init__(self, tablero: "Tablero", fila: int):
+        self._tablero = tablero
+        self._fila = fila
+
+    def __len__(self) -> int:
+        return self._tablero.DIM_TABLERO
+
+    def __getitem__(self, columna: int):
+        if columna < 0:
+            columna += self._tablero.DIM_TABLERO
+        return self._tablero.pieza_en(self._fila, columna)
+
+    def __setitem__(self, columna: int, pieza) -> None:
+        if columna < 0:
+            columna += self._tablero.DIM_TABLERO
+        if pieza is None:
+            self._tablero.quitar_pieza(self._fila, columna)
+        else:
+            self._tablero.colocar_pieza(self._fila, columna, pieza)
+
+    def __iter__(self):
+        inicio = self._fila * self._tablero.DIM_TABLERO
+        return iter(self._tablero._casillas[inicio:inicio + self._tablero.DIM_TABLERO])
+
+class _MatrizPiezas:
+    """
+    Vista 8x8 de las piezas del tablero construida sobre los bitboards. Permite seguir usando
+    la sintaxis matriz_piezas[fila][columna] tanto para leer como para escribir.
+    """
+    __slots__ = ("_tablero",)
+
+    def __init__(self, tablero: "Tablero"):
+        self._tablero = tablero
+
+    def __len__(self) -> int:
+        return self._tablero.DIM_TABLERO
+
+    def __getitem__(self, fila: int) -> _FilaPiezas:
+        if fila < 0:
+            fila += self._tablero.DIM_TABLERO
+        if not 0 <= fila < self._tablero.DIM_TABLERO:
+            raise IndexError(f"Fila fuera del tablero: {fila}")
+        return _FilaPiezas(self._tablero, fila)
+
+    def __iter__(self):
+        for fila in range(self._tablero.DIM_TABLERO):
+            yield _FilaPiezas(self._tablero, fila)
+
 class Tablero:
     DIM_TABLERO = 8                          # Dimensión del tablero estándar 8x8
     matriz_coordenadas_estandar: list[list]  # Coordenadas estándar ej: ['A', 2]
     matriz_coordenadas_enteras: np.ndarray   # Representación con coordenadas enteras para la lógica
 
     def __init__(self):     
-        self.matriz_piezas = [[None for _ in range(self.DIM_TABLERO)] for _ in range(self.DIM_TABLERO)]  # Matriz de referencias a las piezas
+        self._casillas: list = [None] * (self.DIM_TABLERO * self.DIM_TABLERO)                             # Referencias a las piezas por índice de casilla
+        self.bitboards: list[list[int]] = [[0] * NUM_TIPOS for _ in range(2)]                             # Un bitboard por color y tipo de pieza
+        self.ocupacion: list[int] = [0, 0]                                                                # Casillas ocupadas por cada color
+        self.contador_piezas: list[list[int]] = [[0] * NUM_TIPOS for _ in range(2)]                       # Número de piezas por color y tipo
+        self.material: list[int] = [0, 0]                                                                 # Suma de valor_relativo de las piezas de cada color
+        self.puntuacion_posicional: list[int] = [0, 0]                                                    # Suma de las tablas posicionales de cada color (centipeones)
+        self._casillas_rey: list = [None, None]                                                           # Casilla (índice) del rey de cada color
         self.historial: list[tuple[Pieza, array, array]] = []                                             # Lista del historial de los movimientos de las piezas      
+        self.turno: Color = Color.BLANCA                                                                  # Color al que le toca mover
+        self.derechos_enroque: int = TODOS_LOS_ENROQUES                                                   # Máscara con los enroques aún disponibles
+        self.casilla_al_paso: Optional[tuple] = None                                                      # Casilla donde se puede capturar al paso
+        self._pila_deshacer: list[RegistroMovimiento] = []                                                # Registros para deshacer los movimientos hechos
+        self.clave_hash: int = 0                                                                          # Clave Zobrist de la posición, actualizada de forma incremental
+        self.clave_peones: int = 0                                                                        # Clave Zobrist de la estructura de peones
+        self.reloj_medio_movimientos: int = 0                                                             # Medios movimientos desde la última captura o movimiento de peón
+        self.historial_claves: list[int] = []                                                             # Claves de las posiciones anteriores de la partida
+        self._repeticiones: dict[int, int] = {}                                                           # Número de veces que ha aparecido cada clave
+        self._medios_movimientos_iniciales: int = 0                                                       # Medios movimientos jugados antes de la posición inicial (FEN)
         # Peones
         for col in range(self.DIM_TABLERO):
             peon_blanco = Peon(Color.BLANCA)
@@ -80,13 +201,104 @@ class Tablero:
         rey_negro = Rey(Color.NEGRA)
         rey_negro.posicion_actual_entera = array('i', [self.DIM_TABLERO - 1, 4])
         self.matriz_piezas[self.DIM_TABLERO - 1][4] = rey_negro
+
+        # Las piezas ya han actualizado la clave al colocarse; falta añadir los derechos de enroque
+        self.recalcular_clave()
     
     @property
-    def matriz_piezas(self):
+    def matriz_piezas(self) -> _MatrizPiezas:
+        """
+        Método getter que devuelve la matriz de las piezas como una vista sobre los bitboards.
+        """
+        return _MatrizPiezas(self)
+
+    @property
+    def ocupacion_total(self) -> int:
+        """
+        Devuelve el bitboard con todas las casillas ocupadas.
+        """
+        return self.ocupacion[BLANCAS] | self.ocupacion[NEGRAS]
+
+    def pieza_en(self, fila: int, columna: int):
+        """
+        Devuelve la pieza situada en la casilla dada o None si está libre.
+        """
+        return self._casillas[fila * self.DIM_TABLERO + columna]
+
+    def colocar_pieza(self, fila: int, columna: int, pieza: Pieza) -> None:
+        """
+        Coloca la pieza en la casilla dada, sustituyendo a la que hubiera, y actualiza los bitboards,
+        los contadores, el material, la puntuación posicional y la casilla del rey.
+        """
+        indice = fila * self.DIM_TABLERO + columna
+        if self._casillas[indice] is not None:
+            self.quitar_pieza(fila, columna)
+        color = pieza.codigo_color
+        tipo = pieza.TIPO
+        mascara = 1 << indice
+        self.bitboards[color][tipo] |= mascara
+        self.ocupacion[color] |= mascara
+        self._casillas[indice] = pieza
+        self.contador_piezas[color][tipo] += 1
+        self.material[color] += pieza.valor_relativo
+        self.puntuacion_posicional[color] += VALORES_POSICIONALES[color][tipo][indice]
+        self.clave_hash ^= zobrist.CLAVES_PIEZAS[color][tipo][indice]
+        if tipo == REY:
+            self._casillas_rey[color] = indice
+        elif tipo == PEON:
+            self.clave_peones ^= zobrist.CLAVES_PIEZAS[color][PEON][indice]
+        pieza.casilla = indice
+
+    def quitar_pieza(self, fila: int, columna: int):
         """
-        Método getter que devuelve la matriz de las piezas.
+        Retira la pieza de la casilla dada, actualiza los bitboards, los contadores, el material, la
+        puntuación posicional y la casilla del rey, y la devuelve (None si estaba libre).
         """
-        return self.matriz_piezas
+        indice = fila * self.DIM_TABLERO + columna
+        pieza = self._casillas[indice]
+        if pieza is None:
+            return None
+        color = pieza.codigo_color
+        tipo = pieza.TIPO
+        mascara = ~(1 << indice)
+        self.bitboards[color][tipo] &= mascara
+        self.ocupacion[color] &= mascara
+        self._casillas[indice] = None
+        self.contador_piezas[color][tipo] -= 1
+        self.material[color] -= pieza.valor_relativo
+        self.puntuacion_posicional[color] -= VALORES_POSICIONALES[color][tipo][indice]
+        self.clave_hash ^= zobrist.CLAVES_PIEZAS[color][tipo][indice]
+        if tipo == REY and self._casillas_rey[color] == indice:
+            self._casillas_rey[color] = None
+        elif tipo == PEON:
+            self.clave_peones ^= zobrist.CLAVES_PIEZAS[color][PEON][indice]
+        return pieza
+
+    def _trasladar_pieza(self, origen: tuple, destino: tuple) -> None:
+        """
+        Mueve la pieza del origen a la casilla de destino, que debe estar libre. Solo cambian los
+        bitboards, la puntuación posicional, la casilla del rey y la posición de la pieza: los
+        contadores y el material no varían.
+        """
+        indice_origen = origen[0] * self.DIM_TABLERO + origen[1]
+        indice_destino = destino[0] * self.DIM_TABLERO + destino[1]
+        pieza = self._casillas[indice_origen]
+        color = pieza.codigo_color
+        tipo = pieza.TIPO
+        mascara = (1 << indice_origen) | (1 << indice_destino)
+        self.bitboards[color][tipo] ^= mascara
+        self.ocupacion[color] ^= mascara
+        self._casillas[indice_origen] = None
+        self._casillas[indice_destino] = pieza
+        claves = zobrist.CLAVES_PIEZAS[color][tipo]
+        self.clave_hash ^= claves[indice_origen] ^ claves[indice_destino]
+        if tipo == PEON:
+            self.clave_peones ^= claves[indice_origen] ^ claves[indice_destino]
+        valores = VALORES_POSICIONALES[color][tipo]
+        self.puntuacion_posicional[color] += valores[indice_destino] - valores[indice_origen]
+        if tipo == REY:
+            self._casillas_rey[color] = indice_destino
+        pieza.casilla = indice_destino
     
     def mostrar_tablero(self):
         """
@@ -99,45 +311,336 @@ class Tablero:
         """
         Mueve una pieza de la posicion actual a la posicion de destino si el movimiento es válido.
         """
-        pieza: Pieza = self.matriz_piezas[posicion_actual[0]][posicion_actual[1]]
-        if pieza and pieza.comprobar_movimiento_valido(posicion_destino):               # Comprueba si el movimiento es válido
-            self.matriz_piezas[posicion_destino[0]][posicion_destino[1]] = pieza       # Mueve la pieza a la nueva posición
-            self.matriz_piezas[posicion_actual[0]][posicion_actual[1]] = None          # Actualiza la posición de la pieza    
+        pieza: Pieza = self.pieza_en(posicion_actual[0], posicion_actual[1])
+        if pieza and pieza.comprobar_movimiento_valido(posicion_destino, self.obtener_estado_matriz()):   # Comprueba si el movimiento es válido
+            self.quitar_pieza(posicion_destino[0], posicion_destino[1])                                   # Retira la pieza capturada, si la hay
+            self._trasladar_pieza(posicion_actual, posicion_destino)                                      # Mueve la pieza a la nueva posición
             return True
         return False
     
+    def hacer_movimiento(self, origen, destino, promocion: type = Dama) -> RegistroMovimiento:
+        """
+        Hace el movimiento sobre el propio tablero sin comprobar su legalidad, gestionando capturas,
+        captura al paso, enroque y coronación. El movimiento se puede revertir con deshacer_movimiento.
+        Args:
+            origen: (fila, columna) de la pieza a mover.
+            destino: (fila, columna) de destino.
+            promocion (type): Clase de la pieza a la que corona el peón si llega a la última fila.
+        Returns:
+            RegistroMovimiento: Registro apilado con la información para deshacer el movimiento.
+        """
+        fila_origen, columna_origen = int(origen[0]), int(origen[1])
+        fila_destino, columna_destino = int(destino[0]), int(destino[1])
+        pieza: Pieza = self.pieza_en(fila_origen, columna_origen)
+        if pieza is None:
+            raise ValueError(f"No hay ninguna pieza en la casilla de origen: {(fila_origen, columna_origen)}")
+
+        clave_previa = self.clave_hash
+
+        # Captura normal o captura al paso
+        casilla_capturada = (fila_destino, columna_destino)
+        if pieza.TIPO == PEON and casilla_capturada == self.casilla_al_paso:
+            casilla_capturada = (fila_origen, columna_destino)
+        capturada = self.quitar_pieza(*casilla_capturada)
+        if capturada is None:
+            casilla_capturada = None
+
+        # Enroque: el rey se desplaza dos columnas y la torre salta a su lado
+        enroque = None
+        if pieza.TIPO == REY and abs(columna_destino - columna_origen) == 2:
+            columna_torre, columna_torre_destino = (self.DIM_TABLERO - 1, 5) if columna_destino > columna_origen else (0, 3)
+            torre: Torre = self.pieza_en(fila_origen, columna_torre)
+            self._trasladar_pieza((fila_origen, columna_torre), (fila_origen, columna_torre_destino))
+            torre.se_ha_movido = True
+            enroque = (torre, (fila_origen, columna_torre), (fila_origen, columna_torre_destino))
+
+        # Coronación
+        promocionada = None
+        ultima_fila = self.DIM_TABLERO - 1 if pieza.codigo_color == BLANCAS else 0
+        if pieza.TIPO == PEON and fila_destino == ultima_fila:
+            promocionada = promocion(pieza.color)
+            self.quitar_pieza(fila_origen, columna_origen)
+            self.colocar_pieza(fila_destino, columna_destino, promocionada)
+        else:
+            self._trasladar_pieza((fila_origen, columna_origen), (fila_destino, columna_destino))
+
+        se_ha_movido = None
+        if pieza.TIPO == REY or pieza.TIPO == TORRE:
+            se_ha_movido = pieza.se_ha_movido
+            pieza.se_ha_movido = True
+
+        registro = RegistroMovimiento(
+            pieza, (fila_origen, columna_origen), (fila_destino, columna_destino), capturada, casilla_capturada,
+            promocionada, enroque, self.derechos_enroque, self.casilla_al_paso, se_ha_movido,
+            clave_previa, self.reloj_medio_movimientos
+        )
+
+        # Actualiza el estado de la partida y su parte de la clave Zobrist
+        self.historial_claves.append(clave_previa)
+        self.clave_hash ^= zobrist.CLAVES_ENROQUE[self.derechos_enroque]
+        self.derechos_enroque &= ~(_PERDIDA_ENROQUE[fila_origen * self.DIM_TABLERO + columna_origen]
+                                   | _PERDIDA_ENROQUE[fila_destino * self.DIM_TABLERO + columna_destino])
+        self.clave_hash ^= zobrist.CLAVES_ENROQUE[self.derechos_enroque]
+        if self.casilla_al_paso is not None:
+            self.clave_hash ^= zobrist.CLAVES_COLUMNA_AL_PASO[self.casilla_al_paso[1]]
+        self.casilla_al_paso = None
+        if pieza.TIPO == PEON and abs(fila_destino - fila_origen) == 2:
+            self.casilla_al_paso = ((fila_origen + fila_destino) // 2, columna_origen)
+            self.clave_hash ^= zobrist.CLAVES_COLUMNA_AL_PASO[columna_origen]
+        self.turno = self.turno.opuesto()
+        self.clave_hash ^= zobrist.CLAVE_TURNO_NEGRAS
+        if pieza.TIPO == PEON or capturada is not None:
+            self.reloj_medio_movimientos = 0
+        else:
+            self.reloj_medio_movimientos += 1
+        self._repeticiones[self.clave_hash] = self._repeticiones.get(self.clave_hash, 0) + 1
+        self.historial.append((pieza, array('i', [fila_origen, columna_origen]), array('i', [fila_destino, columna_destino])))
+        self._pila_deshacer.append(registro)
+        return registro
+
+    def hacer_movimiento_codificado(self, movimiento: int) -> RegistroMovimiento:
+        """
+        Hace un movimiento codificado en 16 bits (ver movimiento.py); la pieza de coronación forma parte
+        del propio movimiento.
+        """
+        origen, destino = casilla_origen(movimiento), casilla_destino(movimiento)
+        promocion = pieza_coronacion(movimiento)
+        return self.hacer_movimiento((origen >> 3, origen & 7), (destino >> 3, destino & 7),
+                                     CLASE_POR_TIPO[promocion] if promocion is not None else Dama)
+
+    def deshacer_movimiento(self) -> RegistroMovimiento:
+        """
+        Deshace el último movimiento hecho con hacer_movimiento y restaura el estado previo.
+        Returns:
+            RegistroMovimiento: Registro del movimiento deshecho.
+        """
+        if not self._pila_deshacer:
+            raise IndexError("No hay movimientos que deshacer")
+        registro = self._pila_deshacer.pop()
+        self.historial.pop()
+
+        # La posición que se abandona deja de contar para las repeticiones
+        repeticiones = self._repeticiones[self.clave_hash] - 1
+        if repeticiones:
+            self._repeticiones[self.clave_hash] = repeticiones
+        else:
+            del self._repeticiones[self.clave_hash]
+
+        if registro.promocionada is not None:
+            self.quitar_pieza(*registro.destino)
+            self.colocar_pieza(*registro.origen, registro.pieza)
+        else:
+            self._trasladar_pieza(registro.destino, registro.origen)
+        if registro.enroque is not None:
+            torre, origen_torre, destino_torre = registro.enroque
+            self._trasladar_pieza(destino_torre, origen_torre)
+            torre.se_ha_movido = False
+        if registro.capturada is not None:
+            self.colocar_pieza(*registro.casilla_capturada, registro.capturada)
+        if registro.se_ha_movido is not None:
+            registro.pieza.se_ha_movido = registro.se_ha_movido
+
+        # Restaura el estado de la partida
+        self.historial_claves.pop()
+        self.derechos_enroque = registro.derechos_enroque
+        self.casilla_al_paso = registro.casilla_al_paso
+        self.turno = self.turno.opuesto()
+        self.clave_hash = registro.clave_hash
+        self.reloj_medio_movimientos = registro.reloj_medio_movimientos
+        return registro
+
+    def recalcular_clave(self) -> int:
+        """
+        Recalcula desde cero la clave Zobrist y la de los peones, y reinicia el recuento de repeticiones con
+        la posición actual. Debe llamarse tras modificar directamente el turno, los enroques o la casilla de
+        captura al paso.
+        """
+        self.clave_hash = zobrist.calcular_clave(self)
+        self.clave_peones = zobrist.calcular_clave_peones(self)
+        self._repeticiones = {}
+        for clave in self.historial_claves + [self.clave_hash]:
+            self._repeticiones[clave] = self._repeticiones.get(clave, 0) + 1
+        return self.clave_hash
+
+    def es_repeticion(self, veces: int = 3) -> bool:
+        """
+        Devuelve True si la posición actual ha aparecido al menos el número de veces indicado en la partida.
+        """
+        return self._repeticiones.get(self.clave_hash, 0) >= veces
+
     def obtener_estado_matriz(self) -> np.ndarray:
         """
         Devuelve una matriz que representa el estado del tablero.
         0 para casillas libres, 1 para piezas blancas, -1 para piezas negras.
+        Para la entrada de la red, con tipos de pieza y estado de la partida, ver codificacion.codificar_lote.
         """
-        matriz = np.zeros((self.DIM_TABLERO, self.DIM_TABLERO), dtype=int)
-        for fila in range(self.DIM_TABLERO):
-            for col in range(self.DIM_TABLERO):
-                pieza = self.matriz_piezas[fila][col]
-                if pieza:                                                           # Comprueba si hay una pieza en la casilla
-                    matriz[fila][col] = 1 if pieza.color == Color.BLANCA else -1    # 1 para blanca, -1 para negra
-        return matriz
+        ocupacion = np.array(self.ocupacion, dtype="<u8").view(np.uint8)                # 8 bytes por color, un byte por fila
+        bits = np.unpackbits(ocupacion, bitorder="little").reshape(2, self.DIM_TABLERO, self.DIM_TABLERO)
+        return bits[BLANCAS].astype(int) - bits[NEGRAS]                                  # 1 para blanca, -1 para negra
     
     def buscar_rey(self, color: Color):
         """
         Busca la posición del rey del color especificado.
         """
-        for fila in range(self.DIM_TABLERO):
-            for col in range(self.DIM_TABLERO):
-                pieza = self.matriz_piezas[fila][col]
-                if pieza and isinstance(pieza, Rey) and pieza.color == color:
-                    return (fila, col)
-        return None
+        indice = self._casillas_rey[indice_color(color)]
+        if indice is None:
+            return None
+        return (indice // self.DIM_TABLERO, indice % self.DIM_TABLERO)
+
+    def casilla_rey(self, color: Color):
+        """
+        Devuelve el índice de casilla (fila * 8 + columna) del rey del color especificado, o None si no hay rey.
+        """
+        return self._casillas_rey[indice_color(color)]
     
-    def clonar(self):
+    def clonar(self) -> "Tablero":
         """
-        Devuelve una copia profunda del tablero. Esto es útil para simular movimientos sin afectar el estado actual.
+        Devuelve una copia independiente del tablero, incluida la pila para deshacer movimientos. Esto es útil
+        para simular movimientos sin afectar el estado actual. Copia la lista plana de 64 casillas, los
+        bitboards y el resto del estado por listas, y cada pieza con Pieza.copiar, sin recorrerlo con deepcopy.
         """
-        return copy.deepcopy(self)
+        copias: dict = {}                   # id de la pieza original -> su copia, para no duplicar piezas compartidas
+
+        def copiar(pieza: Optional[Pieza]) -> Optional[Pieza]:
+            if pieza is None:
+                return None
+            copia_pieza = copias.get(id(pieza))
+            if copia_pieza is None:
+                copia_pieza = copias[id(pieza)] = pieza.copiar()
+            return copia_pieza
+
+        # Los atributos inmutables (enteros, tuplas, el turno) se comparten; los contenedores se copian
+        copia = object.__new__(type(self))
+        copia.__dict__.update(self.__dict__)
+        copia._casillas = [copiar(pieza) for pieza in self._casillas]
+        copia.bitboards = [bitboards[:] for bitboards in self.bitboards]
+        copia.ocupacion = self.ocupacion[:]
+        copia.contador_piezas = [contadores[:] for contadores in self.contador_piezas]
+        copia.material = self.material[:]
+        copia.puntuacion_posicional = self.puntuacion_posicional[:]
+        copia._casillas_rey = self._casillas_rey[:]
+        copia.historial = [(copiar(pieza), array('i', origen), array('i', destino)) for pieza, origen, destino in self.historial]
+        copia.historial_claves = self.historial_claves[:]
+        copia._repeticiones = self._repeticiones.copy()
+        copia._pila_deshacer = [
+            registro._replace(
+                pieza=copiar(registro.pieza),
+                capturada=copiar(registro.capturada),
+                promocionada=copiar(registro.promocionada),
+                enroque=None if registro.enroque is None else (copiar(registro.enroque[0]),) + registro.enroque[1:],
+            )
+            for registro in self._pila_deshacer
+        ]
+        return copia
     
+    @classmethod
+    def desde_fen(cls, fen: str) -> "Tablero":
+        """
+        Crea un tablero con la posición descrita en notación FEN.
+        """
+        tablero = cls()
+        tablero.cargar_fen(fen)
+        return tablero
+
+    def cargar_fen(self, fen: str) -> None:
+        """
+        Sustituye la posición del tablero por la descrita en notación FEN y reinicia el historial.
+        Args:
+            fen (str): Posición en notación FEN. El reloj de medios movimientos y el número de jugada son opcionales.
+        """
+        campos = fen.split()
+        if len(campos) < 4:
+            raise ValueError(f"Error, FEN inválida: {fen}")
+        filas = campos[0].split("/")
+        if len(filas) != self.DIM_TABLERO:
+            raise ValueError(f"Error, FEN inválida: {fen}")
+
+        for indice in range(self.DIM_TABLERO * self.DIM_TABLERO):
+            if self._casillas[indice] is not None:
+                self.quitar_pieza(indice // self.DIM_TABLERO, indice % self.DIM_TABLERO)
+        # La primera fila de la FEN es la octava del tablero
+        for fila, descripcion in zip(range(self.DIM_TABLERO - 1, -1, -1), filas):
+            columna = 0
+            for caracter in descripcion:
+                if caracter.isdigit():
+                    columna += int(caracter)
+                    continue
+                clase = _CLASE_POR_LETRA.get(caracter.lower())
+                if clase is None or columna >= self.DIM_TABLERO:
+                    raise ValueError(f"Error, FEN inválida: {fen}")
+                pieza = clase(Color.BLANCA if caracter.isupper() else Color.NEGRA)
+                if isinstance(pieza, (Rey, Torre)):
+                    pieza.se_ha_movido = True
+                self.colocar_pieza(fila, columna, pieza)
+                columna += 1
+            if columna != self.DIM_TABLERO:
+                raise ValueError(f"Error, FEN inválida: {fen}")
+
+        self.turno = Color.BLANCA if campos[1] == "w" else Color.NEGRA
+        self.derechos_enroque = 0
+        for derecho, letra, casilla_rey, casilla_torre in _ENROQUES_FEN:
+            if letra in campos[2]:
+                self.derechos_enroque |= derecho
+                # El rey y la torre del enroque disponible no se han movido
+                for indice in (casilla_rey, casilla_torre):
+                    pieza = self._casillas[indice]
+                    if isinstance(pieza, (Rey, Torre)):
+                        pieza.se_ha_movido = False
+        if campos[3] == "-":
+            self.casilla_al_paso = None
+        else:
+            self.casilla_al_paso = (int(campos[3][1]) - 1, ord(campos[3][0]) - ord("a"))
+        self.reloj_medio_movimientos = int(campos[4]) if len(campos) > 4 else 0
+        numero_jugada = int(campos[5]) if len(campos) > 5 else 1
+        self._medios_movimientos_iniciales = 2 * (numero_jugada - 1) + (self.turno == Color.NEGRA)
+
+        self.historial = []
+        self.historial_claves = []
+        self._pila_deshacer = []
+        self.recalcular_clave()
+
+    def a_fen(self) -> str:
+        """
+        Devuelve la posición actual en notación FEN.
+        """
+        filas = []
+        for fila in range(self.DIM_TABLERO - 1, -1, -1):
+            descripcion = ""
+            vacias = 0
+            for columna in range(self.DIM_TABLERO):
+                pieza = self._casillas[fila * self.DIM_TABLERO + columna]
+                if pieza is None:
+                    vacias += 1
+                    continue
+                if vacias:
+                    descripcion += str(vacias)
+                    vacias = 0
+                letra = _LETRA_POR_CLASE[type(pieza)]
+                descripcion += letra.upper() if pieza.color == Color.BLANCA else letra
+            if vacias:
+                descripcion += str(vacias)
+            filas.append(descripcion)
+
+        enroques = "".join(letra for derecho, letra, _, _ in _ENROQUES_FEN if self.derechos_enroque & derecho) or "-"
+        al_paso = "-"
+        if self.casilla_al_paso is not None:
+            fila, columna = self.casilla_al_paso
+            al_paso = f"{chr(ord('a') + columna)}{fila + 1}"
+        numero_jugada = (self._medios_movimientos_iniciales + len(self.historial)) // 2 + 1
+        turno = "w" if self.turno == Color.BLANCA else "b"
+        return f"{'/'.join(filas)} {turno} {enroques} {al_paso} {self.reloj_medio_movimientos} {numero_jugada}"
+
     def listar_piezas_por_color(self, color: Color) -> list[Pieza]:
         """
-        Devuelve una lista de todas las piezas del color especificado en el tablero.
+        Devuelve una lista nueva con las piezas del color especificado, en orden de casilla. Se obtiene
+        de los bitboards de ocupación, así que colocar y quitar piezas no tiene que mantener ninguna
+        lista y el orden no depende de los movimientos hechos.
+        """
+        casillas = self._casillas
+        return [casillas[indice] for indice in iterar_casillas(self.ocupacion[indice_color(color)])]
+
+    def contar_piezas(self, color: Color, tipo_pieza: type) -> int:
+        """
+        Devuelve el número de piezas del color y la clase de pieza especificados.
         """
-        return [pieza for fila in self.matriz_piezas for pieza in fila if isinstance(pieza, Pieza) and pieza.color == color]
\ No newline at end of file
+        return self.contador_piezas[indice_color(color)][TIPO_POR_CLASE[tipo_pieza]]
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Claves Zobrist para identificar posiciones con un entero de 64 bits.
+
+La clave de una posición es el XOR de una clave aleatoria por cada pieza en su casilla, más las
+claves del turno (solo si mueven las negras), de los derechos de enroque y de la columna de
+captura al paso. Como el XOR es su propio inverso, el tablero puede actualizar la clave de forma
+incremental al colocar, quitar o mover piezas.
+"""
+import random
+
+from bitboards import NUM_CASILLAS, NUM_TIPOS, PEON, iterar_casillas
+from color import Color
+
+# Semilla fija: las claves deben ser iguales en todas las ejecuciones y procesos
+_SEMILLA = 0x5A0B1C2D
+_generador = random.Random(_SEMILLA)
+
+
+def _clave_aleatoria() -> int:
+    """
+    Devuelve un entero aleatorio de 64 bits del generador con semilla fija.
+    """
+    return _generador.getrandbits(64)
+
+
+# CLAVES_PIEZAS[color][tipo][casilla]
+CLAVES_PIEZAS = [[[_clave_aleatoria() for _ in range(NUM_CASILLAS)] for _ in range(NUM_TIPOS)] for _ in range(2)]
+CLAVE_TURNO_NEGRAS = _clave_aleatoria()
+# Una clave por cada combinación de derechos de enroque (máscara de 4 bits)
+CLAVES_ENROQUE = [0] + [_clave_aleatoria() for _ in range(15)]
+CLAVES_COLUMNA_AL_PASO = [_clave_aleatoria() for _ in range(8)]
+
+
+def calcular_clave_peones(tablero) -> int:
+    """
+    Calcula desde cero la clave de la estructura de peones: el XOR de las claves de los peones de
+    ambos colores. Solo cambia cuando se mueve, captura o corona un peón.
+    """
+    clave = 0
+    for color in range(2):
+        claves = CLAVES_PIEZAS[color][PEON]
+        for casilla in iterar_casillas(tablero.bitboards[color][PEON]):
+            clave ^= claves[casilla]
+    return clave
+
+
+def calcular_clave(tablero) -> int:
+    """
+    Calcula desde cero la clave Zobrist de la posición del tablero. Se usa al inicializar el
+    tablero o tras modificar su estado directamente; durante la partida la clave se actualiza
+    de forma incremental.
+    """
+    clave = 0
+    for color in range(2):
+        for tipo in range(NUM_TIPOS):
+            claves = CLAVES_PIEZAS[color][tipo]
+            for casilla in iterar_casillas(tablero.bitboards[color][tipo]):
+                clave ^= claves[casilla]
+    if tablero.turno == Color.NEGRA:
+        clave ^= CLAVE_TURNO_NEGRAS
+    clave ^= CLAVES_ENROQUE[tablero.derechos_enroque]
+    if tablero.casilla_al_paso is not None:
+        clave ^= CLAVES_COLUMNA_AL_PASO[tablero.casilla_al_paso[1]]
+    return clave
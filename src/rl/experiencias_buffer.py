@@ -0,0 +1,302 @@
+"""
+Buffer de experiencias del agente: un anillo de capacidad fija en arrays NumPy reservados una sola vez
+(posiciones codificadas, política objetivo, valor y prioridad de cada muestra), sin ningún objeto de
+Python por muestra, de modo que caben millones de muestras. Al llenarse, cada muestra nueva sustituye
+a la más antigua.
+
+La política objetivo se guarda dispersa: las ACCIONES_POLITICA_BUFFER acciones más probables (índices
+de movimiento.py en uint16) y sus probabilidades. Una política densa de NUM_ACCIONES float32 ocuparía
+unos 17 KB por muestra; así son 192 bytes. comprimir_politica y densificar_politica pasan de una
+forma a la otra por lotes. La acción 0 (a1a1) no corresponde a ningún movimiento y sirve de relleno
+con probabilidad 0.
+
+Los lotes se muestrean de forma uniforme o prioritaria (experiencia priorizada: probabilidad
+proporcional a prioridad ** alfa, con pesos de importancia (N * P(i)) ** -beta normalizados por el
+máximo del lote). Las prioridades están en un árbol de sumas sobre un array plano, así que actualizar
+y muestrear cuestan O(log n) por muestra y se hacen para todo el lote a la vez, nivel a nivel.
+Cada campo del lote sale de una sola indexación del array correspondiente.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from utils import config
+
+ACCION_RELLENO = 0      # a1a1: no es ningún movimiento, rellena las acciones sobrantes de la política
+
+
+class Lote(NamedTuple):
+    indices: np.ndarray         # (B,) posiciones en el buffer, para actualizar_prioridades
+    estados: np.ndarray         # (B, *forma_estado)
+    acciones: np.ndarray        # (B, K) uint16, índices de acción de la política objetivo
+    probabilidades: np.ndarray  # (B, K) float32, probabilidad de cada acción (0 en el relleno)
+    valores: np.ndarray         # (B,) float32
+    pesos: np.ndarray           # (B,) float32, pesos de importancia (1 en el muestreo uniforme)
+
+
+def comprimir_politica(politicas: np.ndarray, num_acciones: int = config.ACCIONES_POLITICA_BUFFER
+                       ) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce políticas densas a sus num_acciones acciones más probables, renormalizadas para que sumen 1.
+    Args:
+        politicas (np.ndarray): Array (N, NUM_ACCIONES) de probabilidades (o visitas) por acción.
+        num_acciones (int): Número de acciones que se conservan por política.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Acciones (N, num_acciones) uint16 y probabilidades float32.
+    """
+    politicas = np.asarray(politicas, dtype=np.float32)
+    if politicas.ndim != 2 or politicas.shape[1] > np.iinfo(np.uint16).max + 1:
+        raise ValueError(f"Error, forma de las políticas inválida: {politicas.shape}")
+    num_acciones = min(num_acciones, politicas.shape[1])
+    acciones = np.argpartition(politicas, -num_acciones, axis=1)[:, -num_acciones:]
+    probabilidades = np.take_along_axis(politicas, acciones, axis=1)
+    acciones[probabilidades <= 0] = ACCION_RELLENO
+    probabilidades = np.maximum(probabilidades, 0)
+    totales = probabilidades.sum(axis=1, keepdims=True)
+    np.divide(probabilidades, totales, out=probabilidades, where=totales > 0)
+    return acciones.astype(np.uint16), probabilidades
+
+
+def densificar_politica(acciones: np.ndarray, probabilidades: np.ndarray, num_acciones: int,
+                        salida: np.ndarray = None) -> np.ndarray:
+    """
+    Reconstruye las políticas densas (B, num_acciones) de un lote, por ejemplo para la pérdida de la red.
+    Args:
+        acciones (np.ndarray): Array (B, K) de índices de acción.
+        probabilidades (np.ndarray): Array (B, K) de probabilidades.
+        num_acciones (int): Número total de acciones (movimiento.NUM_ACCIONES).
+        salida (np.ndarray): Buffer (B, num_acciones) que se reutiliza entre lotes (opcional).
+    Returns:
+        np.ndarray: Políticas densas en float32 (o en el tipo de salida).
+    """
+    if salida is None:
+        salida = np.zeros((len(acciones), num_acciones), dtype=np.float32)
+    elif salida.shape != (len(acciones), num_acciones):
+        raise ValueError(f"Error, forma de salida inválida: {salida.shape}")
+    else:
+        salida.fill(0)
+    filas = np.arange(len(acciones))[:, np.newaxis]
+    salida[filas, acciones] = probabilidades
+    # El relleno escribe 0 en la acción 0, que nunca es un movimiento real
+    return salida
+
+
+class ArbolSumas:
+    """
+    Árbol binario completo de sumas en un array plano: el nodo i tiene por hijos 2i y 2i + 1, las hojas
+    (una por posición del buffer) empiezan en el índice hojas y la raíz (índice 1) guarda el total.
+    """
+
+    def __init__(self, capacidad: int):
+        self._hojas = 1 << max(capacidad - 1, 0).bit_length()
+        self._niveles = self._hojas.bit_length() - 1
+        self._nodos = np.zeros(2 * self._hojas, dtype=np.float64)
+
+    def __repr__(self) -> str:
+        return f"ArbolSumas (hojas={self._hojas}, total={self.total:.4g})"
+
+    @property
+    def total(self) -> float:
+        return float(self._nodos[1])
+
+    def prioridades(self, indices: np.ndarray) -> np.ndarray:
+        return self._nodos[self._hojas + indices]
+
+    def actualizar(self, indices: np.ndarray, prioridades: np.ndarray) -> None:
+        """
+        Cambia las prioridades de las hojas dadas y recalcula sus antecesores, un nivel cada vez para
+        todo el lote.
+        """
+        nodos = self._nodos
+        hojas = self._hojas + np.asarray(indices, dtype=np.int64)
+        nodos[hojas] = prioridades
+        padres = np.unique(hojas >> 1)
+        while padres.size and padres[0] >= 1:
+            nodos[padres] = nodos[2 * padres] + nodos[2 * padres + 1]
+            padres = np.unique(padres >> 1)
+
+    def buscar(self, sumas: np.ndarray) -> np.ndarray:
+        """
+        Devuelve, para cada valor de sumas en (0, total], la hoja en la que la suma acumulada de las
+        prioridades alcanza ese valor. Las hojas con prioridad 0 nunca se eligen.
+        """
+        nodos = self._nodos
+        sumas = np.array(sumas, dtype=np.float64)
+        indices = np.ones(len(sumas), dtype=np.int64)
+        for _ in range(self._niveles):
+            indices <<= 1
+            izquierda = nodos[indices]
+            derecha = sumas > izquierda
+            sumas -= izquierda * derecha
+            indices += derecha
+        return indices - self._hojas
+
+
+class BufferExperiencias:
+    """
+    Buffer circular de experiencias con muestreo uniforme y prioritario (ver el docstring del módulo).
+    """
+
+    def __init__(self, forma_estado: tuple, capacidad: int = config.CAPACIDAD_BUFFER_EXPERIENCIAS,
+                 tipo_estado: type = np.uint8, acciones_politica: int = config.ACCIONES_POLITICA_BUFFER,
+                 alfa: float = config.ALFA_PRIORIDADES, epsilon: float = 1e-6, semilla: int = None):
+        """
+        Args:
+            forma_estado (tuple): Forma de una posición codificada, por ejemplo (codificacion.NUM_PLANOS, 8, 8).
+            capacidad (int): Número máximo de muestras.
+            tipo_estado (type): Tipo de los planos guardados (uint8 basta para los de codificacion.py).
+            acciones_politica (int): Acciones de la política objetivo que se guardan por muestra.
+            alfa (float): Exponente de las prioridades (0 equivale al muestreo uniforme).
+            epsilon (float): Se suma al error de cada muestra para que ninguna tenga prioridad 0.
+            semilla (int): Semilla del generador aleatorio del muestreo.
+        """
+        if capacidad < 1:
+            raise ValueError(f"Error, capacidad del buffer inválida: {capacidad}")
+        if acciones_politica < 1:
+            raise ValueError(f"Error, número de acciones de la política inválido: {acciones_politica}")
+        self._capacidad = capacidad
+        self._estados = np.zeros((capacidad, *forma_estado), dtype=tipo_estado)
+        self._acciones = np.zeros((capacidad, acciones_politica), dtype=np.uint16)
+        self._probabilidades = np.zeros((capacidad, acciones_politica), dtype=np.float32)
+        self._valores = np.zeros(capacidad, dtype=np.float32)
+        self._arbol = ArbolSumas(capacidad)
+        self._alfa = alfa
+        self._epsilon = epsilon
+        self._prioridad_maxima = 1.0
+        self._siguiente = 0
+        self._tamano = 0
+        self._generador = np.random.default_rng(semilla)
+
+    def __repr__(self) -> str:
+        return (f"BufferExperiencias (muestras={self._tamano}/{self._capacidad}, "
+                f"estado={self._estados.shape[1:]}, {self.nbytes / 2 ** 20:.1f} MB)")
+
+    def __len__(self) -> int:
+        return self._tamano
+
+    @property
+    def capacidad(self) -> int:
+        return self._capacidad
+
+    @property
+    def nbytes(self) -> int:
+        return (self._estados.nbytes + self._acciones.nbytes + self._probabilidades.nbytes
+                + self._valores.nbytes + self._arbol._nodos.nbytes)
+
+    def _prioridades_desde_errores(self, errores: np.ndarray) -> np.ndarray:
+        return (np.abs(np.asarray(errores, dtype=np.float64)) + self._epsilon) ** self._alfa
+
+    def agregar(self, estado: np.ndarray, acciones: np.ndarray, probabilidades: np.ndarray, valor: float,
+                error: float = None) -> int:
+        """
+        Añade una muestra y devuelve su posición en el buffer (ver agregar_lote).
+        """
+        errores = None if error is None else [error]
+        return int(self.agregar_lote(np.asarray(estado)[np.newaxis], np.asarray(acciones)[np.newaxis],
+                                     np.asarray(probabilidades)[np.newaxis], [valor], errores)[0])
+
+    def agregar_lote(self, estados: np.ndarray, acciones: np.ndarray, probabilidades: np.ndarray,
+                     valores: np.ndarray, errores: np.ndarray = None) -> np.ndarray:
+        """
+        Añade un lote de muestras sobre las más antiguas, copiando cada campo en uno o dos trozos contiguos.
+        Args:
+            estados (np.ndarray): Array (N, *forma_estado) de posiciones codificadas.
+            acciones (np.ndarray): Array (N, k) de índices de acción de la política, con k <= acciones_politica
+                (ver comprimir_politica).
+            probabilidades (np.ndarray): Array (N, k) de probabilidades de esas acciones.
+            valores (np.ndarray): Array (N,) de valores objetivo.
+            errores (np.ndarray): Errores con los que calcular la prioridad inicial; sin ellos, las muestras
+                reciben la prioridad máxima vista, para que se muestreen al menos una vez.
+        Returns:
+            np.ndarray: Posiciones (N,) del buffer en las que se han guardado.
+        """
+        cantidad = len(estados)
+        if acciones.shape != probabilidades.shape or acciones.shape[0] != cantidad or len(valores) != cantidad:
+            raise ValueError(f"Error, tamaños del lote inconsistentes: estados {cantidad}, acciones {acciones.shape}, "
+                             f"probabilidades {probabilidades.shape}, valores {len(valores)}")
+        if acciones.shape[1] > self._acciones.shape[1]:
+            raise ValueError(f"Error, la política tiene {acciones.shape[1]} acciones y el buffer guarda "
+                             f"{self._acciones.shape[1]}")
+        if errores is None:
+            prioridades = np.full(cantidad, self._prioridad_maxima)
+        else:
+            prioridades = self._prioridades_desde_errores(errores)
+            self._prioridad_maxima = max(self._prioridad_maxima, float(prioridades.max(initial=0)))
+
+        # Si el lote no cabe, solo sobreviven sus últimas muestras
+        if cantidad > self._capacidad:
+            recorte = cantidad - self._capacidad
+            estados, acciones, probabilidades = estados[recorte:], acciones[recorte:], probabilidades[recorte:]
+            valores, prioridades = valores[recorte:], prioridades[recorte:]
+            self._siguiente = (self._siguiente + recorte) % self._capacidad
+            cantidad = self._capacidad
+
+        k = acciones.shape[1]
+        inicio = self._siguiente
+        primero = min(cantidad, self._capacidad - inicio)
+        for destino, origen in ((slice(inicio, inicio + primero), slice(0, primero)),
+                                (slice(0, cantidad - primero), slice(primero, cantidad))):
+            self._estados[destino] = estados[origen]
+            self._acciones[destino, :k] = acciones[origen]
+            self._acciones[destino, k:] = ACCION_RELLENO
+            self._probabilidades[destino, :k] = probabilidades[origen]
+            self._probabilidades[destino, k:] = 0
+            self._valores[destino] = valores[origen]
+
+        indices = (inicio + np.arange(cantidad)) % self._capacidad
+        self._arbol.actualizar(indices, prioridades)
+        self._siguiente = (inicio + cantidad) % self._capacidad
+        self._tamano = min(self._tamano + cantidad, self._capacidad)
+        return indices
+
+    def _lote(self, indices: np.ndarray, pesos: np.ndarray) -> Lote:
+        return Lote(indices,
+                    np.take(self._estados, indices, axis=0),
+                    np.take(self._acciones, indices, axis=0),
+                    np.take(self._probabilidades, indices, axis=0),
+                    np.take(self._valores, indices),
+                    pesos)
+
+    def _comprobar_muestreo(self, tamano_lote: int) -> None:
+        if not self._tamano:
+            raise ValueError("Error, no se puede muestrear un buffer vacío")
+        if tamano_lote < 1:
+            raise ValueError(f"Error, tamaño de lote inválido: {tamano_lote}")
+
+    def muestrear_uniforme(self, tamano_lote: int) -> Lote:
+        """
+        Devuelve un lote de muestras elegidas al azar con reemplazo, todas con peso 1.
+        """
+        self._comprobar_muestreo(tamano_lote)
+        indices = self._generador.integers(0, self._tamano, tamano_lote)
+        return self._lote(indices, np.ones(tamano_lote, dtype=np.float32))
+
+    def muestrear_prioritario(self, tamano_lote: int, beta: float = config.BETA_PRIORIDADES) -> Lote:
+        """
+        Devuelve un lote muestreado en proporción a las prioridades, con un valor al azar en cada uno de
+        tamano_lote tramos iguales de la suma total (muestreo estratificado), y sus pesos de importancia.
+        Args:
+            tamano_lote (int): Número de muestras.
+            beta (float): Exponente de los pesos de importancia (1 corrige por completo el sesgo del muestreo).
+        """
+        self._comprobar_muestreo(tamano_lote)
+        total = self._arbol.total
+        tramo = total / tamano_lote
+        sumas = (np.arange(tamano_lote) + self._generador.random(tamano_lote)) * tramo
+        np.clip(sumas, np.nextafter(0, 1), total, out=sumas)
+        # Por redondeo, una suma muy cerca del total podría acabar en una hoja vacía
+        indices = np.minimum(self._arbol.buscar(sumas), self._tamano - 1)
+
+        probabilidades = self._arbol.prioridades(indices) / total
+        pesos = (self._tamano * probabilidades) ** -beta
+        pesos /= pesos.max()
+        return self._lote(indices, pesos.astype(np.float32))
+
+    def actualizar_prioridades(self, indices: np.ndarray, errores: np.ndarray) -> None:
+        """
+        Cambia las prioridades de las muestras de un lote según sus nuevos errores (por ejemplo, la pérdida
+        de cada muestra tras el paso de entrenamiento).
+        """
+        prioridades = self._prioridades_desde_errores(errores)
+        self._prioridad_maxima = max(self._prioridad_maxima, float(prioridades.max(initial=0)))
+        self._arbol.actualizar(indices, prioridades)
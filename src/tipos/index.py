@@ -0,0 +1,15 @@
+class TipoPiezas:
+    # Mismos índices que los bitboards (engine/bitboards.py) y el atributo TIPO de las piezas
+    PEON = 0
+    CABALLO = 1
+    ALFIL = 2
+    TORRE = 3
+    DAMA = 4
+    REINA = DAMA
+    REY = 5
+
+class EstadoJuego:
+    EN_PROGRESO = 'en_progreso'
+    BLANCO_GANO = 'blanco_gano'
+    NEGRO_GANO = 'negro_gano'
+    EMPATE = 'empate'
@@ -1,13 +0,0 @@
-class TipoPiezas:
-    PEON = 'peon'
-    CABALLO = 'caballo'
-    ALFIL = 'alfil'
-    TORRE = 'torre'
-    REINA = 'reina'
-    REY = 'rey'
-
-class EstadoJuego:
-    EN_PROGRESO = 'en_progreso'
-    BLANCO_GANO = 'blanco_gano'
-    NEGRO_GANO = 'negro_gano'
-    EMPATE = 'empate'
@@ -2,10 +2,30 @@ from typing import Final, Dict
 
 PESOS_POR_DEFECTO: Final[Dict[str, float]] = {
     "material": 1.0,
+    "posicional": 1.0,
     "movilidad": 0.05,
     "estructura_peones": 0.2,
     "seguridad_rey": 0.5,
     "control_centro": 0.1,
     "mate": 1e6,
     "max_movilidad": 40.0,
-}
\ No newline at end of file
+}
+
+# Tamaño en MB de la tabla de transposición de la búsqueda
+TAMANO_TABLA_TRANSPOSICION_MB: Final[int] = 64
+
+# Número de entradas de la tabla de estructuras de peones del evaluador
+ENTRADAS_TABLA_PEONES: Final[int] = 1 << 14
+
+# Número máximo de evaluaciones guardadas en la caché de cada evaluador
+CAPACIDAD_CACHE_EVALUACIONES: Final[int] = 1 << 16
+
+# Número máximo de muestras del buffer de experiencias del agente
+CAPACIDAD_BUFFER_EXPERIENCIAS: Final[int] = 1 << 20
+
+# Número de acciones de la política objetivo que se guardan por muestra (las más probables)
+ACCIONES_POLITICA_BUFFER: Final[int] = 32
+
+# Exponentes del muestreo prioritario: alfa para las prioridades y beta para los pesos de importancia
+ALFA_PRIORIDADES: Final[float] = 0.6
+BETA_PRIORIDADES: Final[float] = 0.4